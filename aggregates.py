@@ -0,0 +1,234 @@
+import threading
+import time
+
+from checkouts import checkout_table
+
+
+def _to_number(value, default=0):
+    """Coerce a sheet cell (SheetDB returns strings) to a number"""
+    if value is None or value == '':
+        return default
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return default
+    return int(number) if number.is_integer() else number
+
+
+def _to_bool(value):
+    """Coerce a sheet cell to a bool, treating 'false'/'0'/'' as False"""
+    if isinstance(value, str):
+        return value.strip().lower() not in ('', '0', 'false', 'no', 'nein')
+    return bool(value)
+
+
+class PlayerAggregate:
+    """Running totals for one player, updated one row at a time"""
+
+    __slots__ = ('games', 'total_points', 'total_rounds', 'checkouts',
+                 'checkout_points', 'wins', 'visits_60', 'visits_100',
+                 'visits_140', 'visits_180', 'checkout_opportunities',
+                 'checkouts_taken')
+
+    def __init__(self):
+        self.games = 0
+        self.total_points = 0
+        self.total_rounds = 0
+        self.checkouts = 0
+        self.checkout_points = []
+        self.wins = 0
+        self.visits_60 = 0
+        self.visits_100 = 0
+        self.visits_140 = 0
+        self.visits_180 = 0
+        # Visits started on a finishable score, keyed by fewest darts needed
+        self.checkout_opportunities = {1: 0, 2: 0, 3: 0}
+        self.checkouts_taken = {1: 0, 2: 0, 3: 0}
+
+    def add(self, row):
+        points = _to_number(row.get('points', 0))
+        self.games += 1
+        self.total_points += points
+        self.total_rounds += _to_number(row.get('rounds', 1), 1)
+
+        if _to_bool(row.get('checkout', False)):
+            self.checkouts += 1
+        checkout_points = _to_number(row.get('checkout_points'))
+        if checkout_points:
+            self.checkout_points.append(checkout_points)
+        if _to_bool(row.get('win', False)):
+            self.wins += 1
+
+        if points >= 180:
+            self.visits_180 += 1
+        elif points >= 140:
+            self.visits_140 += 1
+        elif points >= 100:
+            self.visits_100 += 1
+        elif points >= 60:
+            self.visits_60 += 1
+
+        self._add_checkout_opportunity(row)
+
+    def _add_checkout_opportunity(self, row):
+        """Count visits (sheet rows with a rest) that started on a checkout"""
+        if row.get('rest') in (None, ''):
+            return
+        rest = _to_number(row.get('rest'), -1)
+        bust = _to_bool(row.get('bust', False))
+        remaining = rest if bust else rest + _to_number(row.get('score', 0))
+        darts = checkout_table().min_darts(remaining)
+        if darts is None:
+            return
+        self.checkout_opportunities[darts] += 1
+        if rest == 0 and not bust:
+            self.checkouts_taken[darts] += 1
+
+    def to_stats(self):
+        games = self.games
+        return {
+            "ppr": round(self.total_points / self.total_rounds, 2) if self.total_rounds > 0 else 0,
+            "checkout_percentage": round((self.checkouts / games) * 100, 2) if games else 0,
+            "checkout_points": list(self.checkout_points),
+            "win_rate": round((self.wins / games) * 100, 2) if games else 0,
+            "visits_buckets": {
+                "60+": self.visits_60,
+                "100+": self.visits_100,
+                "140+": self.visits_140,
+                "180": self.visits_180
+            },
+            "total_games": games,
+            "checkout_opportunities": self._checkout_opportunity_stats()
+        }
+
+    def _checkout_opportunity_stats(self):
+        opportunities = sum(self.checkout_opportunities.values())
+        taken = sum(self.checkouts_taken.values())
+        return {
+            "opportunities": opportunities,
+            "taken": taken,
+            "conversion": round(taken / opportunities * 100, 2) if opportunities else 0,
+            "by_darts_needed": {
+                str(darts): {
+                    "opportunities": self.checkout_opportunities[darts],
+                    "taken": self.checkouts_taken[darts]
+                }
+                for darts in self.checkout_opportunities
+            }
+        }
+
+
+class AggregateStore:
+    """Materialized per-player aggregates.
+
+    Players are materialized from their source rows on first use (or all at
+    once by rebuild) and then kept current by apply_rows, so a stats lookup
+    never rescans a player's history. Entries expire after ttl seconds so
+    rows edited directly in the sheet show up again. A load whose rows were
+    fetched before a write to the same player is answered from but not
+    kept, since its rows may miss that write.
+    """
+
+    entry_class = PlayerAggregate
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self.version = 0       # bumped by every apply_rows
+        self._players = {}     # name -> entry
+        self._loaded_at = {}   # name -> monotonic load time
+        self._written = {}     # name -> version of the last write touching the player
+        self._complete_at = None
+        self._lock = threading.Lock()
+
+    def _fresh(self, player_name, now):
+        if player_name in self._players:
+            loaded_at = self._loaded_at[player_name]
+        elif self._complete_at is not None:
+            loaded_at = self._complete_at  # after a rebuild, unknown players have no rows
+        else:
+            return False
+        return self.ttl is None or now - loaded_at <= self.ttl
+
+    def _materialize(self, player_names, loader):
+        """Entries for the stale players among player_names, built from loader(stale names)"""
+        with self._lock:
+            now = time.monotonic()
+            stale = [name for name in player_names if not self._fresh(name, now)]
+            stamp = self.version
+        if not stale:
+            return {}
+
+        loaded = {name: self.entry_class() for name in stale}
+        for row in loader(stale):
+            entry = loaded.get(row.get('player'))
+            if entry is not None:
+                entry.add(row)
+        with self._lock:
+            now = time.monotonic()
+            for name, entry in loaded.items():
+                if self._written.get(name, 0) <= stamp:
+                    self._players[name] = entry
+                    self._loaded_at[name] = now
+                else:
+                    # Written to since the fetch: drop any older entry so the next lookup reloads
+                    self._players.pop(name, None)
+                    self._loaded_at.pop(name, None)
+        return loaded
+
+    def _entry(self, player_name, loaded):
+        return loaded.get(player_name) or self._players.get(player_name) or self.entry_class()
+
+    def stats(self, player_names, loader):
+        """{name: stats} for several players, loading stale ones with one loader(names) call"""
+        loaded = self._materialize(player_names, loader)
+        with self._lock:
+            return {name: self._entry(name, loaded).to_stats() for name in player_names}
+
+    def apply_rows(self, rows):
+        """Fold newly written rows into the players that are materialized"""
+        with self._lock:
+            self.version += 1
+            for row in rows:
+                player_name = row.get('player')
+                if not player_name:
+                    continue
+                self._written[player_name] = self.version
+                entry = self._players.get(player_name)
+                if entry is None:
+                    if self._complete_at is None:
+                        continue
+                    entry = self._players[player_name] = self.entry_class()
+                    self._loaded_at[player_name] = self._complete_at
+                entry.add(row)
+
+    def rebuild(self, rows, stamp=None):
+        """Recompute every player from the complete source row list.
+
+        stamp is the version read before the rows were fetched; players
+        written to since then are left out and loaded again on demand.
+        """
+        players = {}
+        for row in rows:
+            player_name = row.get('player')
+            if not player_name:
+                continue
+            entry = players.get(player_name)
+            if entry is None:
+                entry = players[player_name] = self.entry_class()
+            entry.add(row)
+        with self._lock:
+            now = time.monotonic()
+            written = {name for name, version in self._written.items() if stamp is not None and version > stamp}
+            self._players = {name: entry for name, entry in players.items() if name not in written}
+            self._loaded_at = dict.fromkeys(self._players, now)
+            # Complete only if no write could be missing from rows
+            self._complete_at = None if written else now
+        return len(players)
+
+    def clear(self):
+        with self._lock:
+            self._players = {}
+            self._loaded_at = {}
+            self._complete_at = None
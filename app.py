@@ -1,35 +1,235 @@
 from flask_cors import CORS
-from flask import Flask, request, jsonify, flash, redirect, url_for
-import requests
+from flask import Flask, request, jsonify, flash, redirect, url_for, Response, stream_with_context
 import os
 import json
-from datetime import datetime
+import re
+import uuid
+import hashlib
+import itertools
+import atexit
+from datetime import date, datetime
 from werkzeug.utils import secure_filename
 from ui import ui_bp   # Import Blueprint
+from cache import TTLCache
+from aggregates import AggregateStore, PlayerAggregate
+from jobs import JobQueue, QueueFull, job_events
+from uploads import UploadRequest, ExtractionCache, upload_digest
+from integrations import IntegrationClient, CircuitBreaker, get_openai_client
+from dart_notation import parse_visits, parse_throw
+from stats_engine import compute_advanced_stats
+from bulk_import import UploadLimitExceeded, iter_upload_files, run_bulk_import
+from storage import create_storage, StorageError, SheetDBBackend, SQLiteBackend
+from training import MODEL as TRAINING_MODEL, build_messages, plan_cache_key, parse_plan, sse_event
+from features import build_digest, recent_legs
+from ratelimit import TokenBucket
+from training_batch import BatchStore, batch_summary, run_training_batch
+from notion_export import NotionExporter, NotionError, export_plans
+from checkouts import MIN_CHECKOUT, MAX_CHECKOUT, MAX_DARTS, checkout_table, parse_doubles
+from simulator import PlayerModel, simulate, summarize, head_to_head
+from preprocess import PreparedUpload, prepare_upload
+from export import FORMATS as EXPORT_FORMATS, export_chunks, parquet_available
+from metrics import Metrics, instrument_app, metrics_response
+from serving import gevent_active, run_cpu_bound
+from player_index import PlayerIndex, SORT_ORDERS
+from trends import TrendStore, UNITS as TREND_UNITS
+from httpcache import DataVersion, StaticVersion, enable_compression, versioned
+from live import BoardFull, LiveBoard, LiveError, WriteBehind, live_events
 
 app = Flask(__name__)
+app.request_class = UploadRequest  # uploads stay in memory and are hashed while parsed
 CORS(app)
 app.secret_key = 'your-secret-key-here'
 
 # API Configuration
-PARSEEXTRACT_API_URL = "https://api.parseextract.com/v1/data-extract"
+PARSEEXTRACT_API_URL = os.getenv("PARSEEXTRACT_API_URL", "https://api.parseextract.com/v1/data-extract")
 PARSEEXTRACT_API_KEY = os.getenv("PARSEEXTRACT_API_KEY", "TjHTQf68b6017f2a1e42312f494130ecOXsT")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 NOTION_API_KEY = os.getenv("NOTION_API_KEY")
 NOTION_DATABASE_ID = os.getenv("NOTION_DATABASE_ID")
+NOTION_API_URL = os.getenv("NOTION_API_URL", "https://api.notion.com/v1")
 SHEETSDB_URL = os.getenv("SHEETSDB_URL")
 
+# Outbound integrations: pooled keep-alive sessions with retry and circuit breakers
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = int(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+OPENAI_TIMEOUT = int(os.getenv("OPENAI_TIMEOUT", "60"))
+
+# Instrumentation: Prometheus metrics on /metrics; requests slower than
+# SLOW_REQUEST_MS are logged with a per-phase breakdown (0 = off)
+SLOW_REQUEST_MS = int(os.getenv("SLOW_REQUEST_MS", "0"))
+metrics = Metrics()
+instrument_app(app, metrics, slow_request_ms=SLOW_REQUEST_MS)
+
+# HTTP caching: gzip/brotli for responses from COMPRESS_MIN_BYTES up, ETags on
+# read endpoints from the data version (rolled over every HTTP_ETAG_REFRESH
+# seconds to pick up edits made outside the app) and cached UI page renders
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))
+HTTP_ETAG_REFRESH = int(os.getenv("HTTP_ETAG_REFRESH", os.getenv("SHEETS_CACHE_TTL", "60")))
+app.config['UI_CACHE_MAX_AGE'] = int(os.getenv("UI_CACHE_MAX_AGE", "300"))
+data_version = DataVersion()
+# Responses that never change with stored data (the checkout table)
+static_version = StaticVersion()
+enable_compression(app, min_bytes=COMPRESS_MIN_BYTES, level=COMPRESS_LEVEL)
+
+def _integration(name, connect_timeout, read_timeout):
+    return IntegrationClient(
+        name,
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        retries=HTTP_RETRIES,
+        pool_size=HTTP_POOL_SIZE,
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=CIRCUIT_RESET_TIMEOUT,
+        metrics=metrics
+    )
+
+sheetdb = _integration("SheetDB", 5, 30)
+parseextract = _integration("ParseExtract", 10, 120)
+notion = _integration("Notion", 5, 30)
+openai_breaker = CircuitBreaker("OpenAI", CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT)
+
+# Per-provider request pacing shared by every thread of this process
+OPENAI_REQUESTS_PER_SECOND = float(os.getenv("OPENAI_REQUESTS_PER_SECOND", "1"))
+OPENAI_BURST = int(os.getenv("OPENAI_BURST", "3"))
+NOTION_REQUESTS_PER_SECOND = float(os.getenv("NOTION_REQUESTS_PER_SECOND", "3"))
+openai_limiter = TokenBucket(OPENAI_REQUESTS_PER_SECOND, capacity=OPENAI_BURST)
+notion_limiter = TokenBucket(NOTION_REQUESTS_PER_SECOND)
+
+# Notion pages: content split into valid blocks, paced by notion_limiter, 429s retried
+NOTION_MAX_RETRIES = int(os.getenv("NOTION_MAX_RETRIES", "5"))
+NOTION_EXPORT_WORKERS = int(os.getenv("NOTION_EXPORT_WORKERS", "3"))
+MAX_NOTION_EXPORT_PLANS = int(os.getenv("MAX_NOTION_EXPORT_PLANS", "500"))
+notion_exporter = NotionExporter(notion, NOTION_API_KEY, NOTION_DATABASE_ID, notion_limiter,
+                                 max_retries=NOTION_MAX_RETRIES, base_url=NOTION_API_URL)
+
+# Read cache for SheetDB queries (invalidated on every write)
+SHEETS_CACHE_SIZE = int(os.getenv("SHEETS_CACHE_SIZE", "256"))
+SHEETS_CACHE_TTL = int(os.getenv("SHEETS_CACHE_TTL", "60"))
+sheet_cache = TTLCache(maxsize=SHEETS_CACHE_SIZE, default_ttl=SHEETS_CACHE_TTL)
+
+# Player directory: built once from storage, updated on every write and
+# fully reloaded after PLAYER_INDEX_TTL seconds to pick up external edits
+PLAYER_INDEX_TTL = int(os.getenv("PLAYER_INDEX_TTL", os.getenv("PLAYERS_CACHE_TTL", "900")))
+MAX_PLAYER_SEARCH_LIMIT = int(os.getenv("MAX_PLAYER_SEARCH_LIMIT", "100"))
+player_index = PlayerIndex()
+
+MAX_BATCH_PLAYERS = int(os.getenv("MAX_BATCH_PLAYERS", "20"))
+
+# Streaming exports read storage one page at a time
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "1000"))
+
+# Checkout routes for 2-170, built once per preferred-doubles setting
+PREFERRED_DOUBLES = parse_doubles(os.getenv("PREFERRED_DOUBLES", ""))
+checkout_table(PREFERRED_DOUBLES)
+
+# Monte Carlo leg simulation; SIMULATION_WORKERS > 1 fans out over a process pool
+SIMULATION_LEGS = int(os.getenv("SIMULATION_LEGS", "20000"))
+SIMULATION_MAX_LEGS = int(os.getenv("SIMULATION_MAX_LEGS", "200000"))
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", "0"))
+
+# Training plans are built from a feature digest of the player's last TRAINING_LEGS legs
+TRAINING_LEGS = int(os.getenv("TRAINING_LEGS", "50"))
+TRAINING_ROWS_PER_LEG = int(os.getenv("TRAINING_ROWS_PER_LEG", "20"))
+TRAINING_TOKEN_BUDGET = int(os.getenv("TRAINING_TOKEN_BUDGET", "800"))
+
+# Generated training plans, keyed by player + feature digest + prompt version
+TRAINING_PLAN_CACHE_TTL = int(os.getenv("TRAINING_PLAN_CACHE_TTL", str(6 * 3600)))
+training_plan_cache = TTLCache(maxsize=512, default_ttl=TRAINING_PLAN_CACHE_TTL)
+
+# Materialized per-player stats and trend prefix sums, kept current as rows are
+# saved through the app. Each reload rescans a player's whole history, so the
+# TTL is long: rows edited directly in the sheet show up after AGGREGATE_TTL
+# seconds, or right away after POST /api/aggregates/rebuild. 0 never expires
+AGGREGATE_TTL = int(os.getenv("AGGREGATE_TTL", str(6 * 3600)))
+aggregate_store = AggregateStore(ttl=AGGREGATE_TTL or None)
+trend_store = TrendStore(ttl=AGGREGATE_TTL or None)
+
+# Rolling trend series: default window and the most points one response carries
+TREND_DEFAULT_WINDOW = int(os.getenv("TREND_DEFAULT_WINDOW", "20"))
+MAX_TREND_POINTS = int(os.getenv("MAX_TREND_POINTS", "500"))
+
+# Game row storage: the Google Sheet via SheetDB (default) or a local SQLite mirror.
+# With SHEETSDB_URL set, the SQLite backend writes through to the sheet
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sheetdb")
+SQLITE_PATH = os.getenv("SQLITE_PATH", "/tmp/dartcoach.sqlite3")
+storage = create_storage(STORAGE_BACKEND, sheetdb_url=SHEETSDB_URL, sheetdb_client=sheetdb, sqlite_path=SQLITE_PATH)
+
+def storage_not_configured():
+    message = SheetDBBackend.not_configured_error if STORAGE_BACKEND == "sheetdb" else "Datenspeicher nicht konfiguriert"
+    return jsonify({"error": message}), 500
+
 # Upload Configuration
-UPLOAD_FOLDER = '/tmp/uploads'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf', 'docx', 'doc'}
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+EXTRACTION_PROMPT = "Extract dart game statistics including player names, scores, rounds, throws, checkout percentages, and PPR (Points Per Round) from this document. Format as structured data."
+
+# Size limits: per request (bulk ZIPs included) and per uploaded file
+MAX_REQUEST_MB = int(os.getenv("MAX_REQUEST_MB", "100"))
+MAX_UPLOAD_MB = int(os.getenv("MAX_UPLOAD_MB", "20"))
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_MB * 1024 * 1024
+
+# Images and PDFs are downscaled, grayscaled and recompressed for OCR before
+# they go to ParseExtract; files under UPLOAD_PREPROCESS_MIN_KB are sent as-is
+UPLOAD_PREPROCESS = os.getenv("UPLOAD_PREPROCESS", "1") != "0"
+UPLOAD_MAX_SIDE = int(os.getenv("UPLOAD_MAX_SIDE", "2000"))
+UPLOAD_JPEG_QUALITY = int(os.getenv("UPLOAD_JPEG_QUALITY", "80"))
+UPLOAD_GRAYSCALE = os.getenv("UPLOAD_GRAYSCALE", "1") != "0"
+UPLOAD_PREPROCESS_MIN_KB = int(os.getenv("UPLOAD_PREPROCESS_MIN_KB", "256"))
+UPLOAD_PDF_DPI = int(os.getenv("UPLOAD_PDF_DPI", "150"))
+UPLOAD_MAX_PDF_PAGES = int(os.getenv("UPLOAD_MAX_PDF_PAGES", "20"))
+upload_bytes_saved = metrics.counter("dartcoach_upload_bytes_saved_total", "Bytes removed by upload preprocessing", ("action",))
+
+# Background extraction jobs
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "2"))
+EXTRACTION_QUEUE_SIZE = int(os.getenv("EXTRACTION_QUEUE_SIZE", "16"))
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", "3600"))
+job_queue = JobQueue(workers=EXTRACTION_WORKERS, max_queue=EXTRACTION_QUEUE_SIZE, retention=JOB_RETENTION)
+
+# Bulk import: concurrent extraction, rows written to SheetDB in capped batches.
+# MAX_BULK_MB caps the unpacked size of all files of one import
+BULK_EXTRACTION_WORKERS = int(os.getenv("BULK_EXTRACTION_WORKERS", "4"))
+MAX_BULK_FILES = int(os.getenv("MAX_BULK_FILES", "200"))
+MAX_BULK_MB = int(os.getenv("MAX_BULK_MB", "200"))
+SHEETS_WRITE_BATCH_SIZE = int(os.getenv("SHEETS_WRITE_BATCH_SIZE", "100"))
+SHEETS_WRITE_MAX_PENDING = int(os.getenv("SHEETS_WRITE_MAX_PENDING", "4"))
+
+# Live scoring: legs held in memory, visit rows written behind in batches of
+# LIVE_WRITE_BATCH_SIZE or every LIVE_FLUSH_INTERVAL seconds. Visits are
+# refused while LIVE_MAX_PENDING_ROWS rows wait for storage
+LIVE_MAX_LEGS = int(os.getenv("LIVE_MAX_LEGS", "200"))
+LIVE_LEG_RETENTION = int(os.getenv("LIVE_LEG_RETENTION", "3600"))
+LIVE_WRITE_BATCH_SIZE = int(os.getenv("LIVE_WRITE_BATCH_SIZE", str(SHEETS_WRITE_BATCH_SIZE)))
+LIVE_FLUSH_INTERVAL = float(os.getenv("LIVE_FLUSH_INTERVAL", "5"))
+LIVE_MAX_PENDING_ROWS = int(os.getenv("LIVE_MAX_PENDING_ROWS", "5000"))
+live_board = LiveBoard(max_legs=LIVE_MAX_LEGS, retention=LIVE_LEG_RETENTION)
+live_writer = WriteBehind(lambda rows: store_rows(rows), batch_size=LIVE_WRITE_BATCH_SIZE, interval=LIVE_FLUSH_INTERVAL,
+                          max_pending=LIVE_MAX_PENDING_ROWS)
+atexit.register(live_writer.close)
+live_pending_rows = metrics.gauge("dartcoach_live_pending_rows", "Live visit rows waiting to be written")
+live_write_failures = metrics.gauge("dartcoach_live_write_failures", "Failed live row write attempts since start")
+
+# Team-wide training plan batches, resumable from their state files. They and
+# Notion exports run on their own queue so they never hold up scoresheet uploads
+TRAINING_BATCH_WORKERS = int(os.getenv("TRAINING_BATCH_WORKERS", "4"))
+BATCH_JOB_WORKERS = int(os.getenv("BATCH_JOB_WORKERS", "1"))
+BATCH_JOB_QUEUE_SIZE = int(os.getenv("BATCH_JOB_QUEUE_SIZE", "4"))
+batch_queue = JobQueue(workers=BATCH_JOB_WORKERS, max_queue=BATCH_JOB_QUEUE_SIZE, retention=JOB_RETENTION)
+TRAINING_BATCH_DIR = os.getenv("TRAINING_BATCH_DIR", "/tmp/training-batches")
+training_batches = BatchStore(TRAINING_BATCH_DIR)
+
+# Extraction results keyed by upload content hash + prompt
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", "/tmp/extraction-cache")
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+extraction_cache = ExtractionCache(EXTRACTION_CACHE_DIR, max_bytes=EXTRACTION_CACHE_MAX_BYTES)
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 @app.route("/api/upload-statistics", methods=["POST"])
 def upload_statistics():
-    """Upload and process dart statistics files via ParseExtract API"""
+    """Accept a dart statistics file and queue its ParseExtract extraction"""
     if 'file' not in request.files:
         return jsonify({"error": "Keine Datei hochgeladen"}), 400
     
@@ -40,48 +240,228 @@ def upload_statistics():
     if not allowed_file(file.filename):
         return jsonify({"error": "Dateityp nicht erlaubt"}), 400
     
+    content = file.read()
+    if len(content) > MAX_UPLOAD_MB * 1024 * 1024:
+        return jsonify({"error": f"Datei zu groß (maximal {MAX_UPLOAD_MB} MB)"}), 413
+    
     try:
-        # Save uploaded file temporarily
         filename = secure_filename(file.filename)
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
-        
-        # Process with ParseExtract API
-        headers = {"Authorization": f"Bearer {PARSEEXTRACT_API_KEY}"}
+        cache_key = extraction_cache.key(upload_digest(file), EXTRACTION_PROMPT)
         
-        with open(filepath, 'rb') as f:
-            files = {"file": (filename, f, file.mimetype)}
-            data = {"prompt": "Extract dart game statistics including player names, scores, rounds, throws, checkout percentages, and PPR (Points Per Round) from this document. Format as structured data."}
-            
-            response = requests.post(PARSEEXTRACT_API_URL, files=files, data=data, headers=headers, timeout=(10,120))
-        
-        # Clean up temporary file
-        os.remove(filepath)
-        
-        if response.status_code == 200:
-            extracted_data = response.json()
+        # Same file and prompt as an earlier upload: answer immediately
+        cached = extraction_cache.get(cache_key)
+        if cached is not None:
             return jsonify({
                 "success": True,
-                "data": extracted_data,
+                "data": cached,
+                "cached": True,
                 "message": "Statistiken erfolgreich extrahiert"
             })
-        else:
-            return jsonify({
-                "error": f"ParseExtract API Fehler: {response.status_code}"
-            }), 500
+        
+        try:
+            job = job_queue.submit("extraction", extract_statistics, content, filename, file.mimetype, cache_key)
+        except QueueFull:
+            return jsonify({"error": "Zu viele Uploads in Bearbeitung, bitte später erneut versuchen"}), 503
+        
+        return jsonify({
+            "success": True,
+            "job_id": job.id,
+            "status_url": url_for('get_job', job_id=job.id),
+            "events_url": url_for('job_event_stream', job_id=job.id),
+            "message": "Datei wird verarbeitet"
+        }), 202
             
     except Exception as e:
-        # Clean up temporary file on error
-        if 'filepath' in locals() and os.path.exists(filepath):
-            os.remove(filepath)
         return jsonify({"error": f"Verarbeitungsfehler: {str(e)}"}), 500
 
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify({"error": f"Anfrage zu groß (maximal {MAX_REQUEST_MB} MB)"}), 413
+
+def prepare_for_extraction(content, filename, mimetype):
+    """Shrink images and PDFs for OCR according to the UPLOAD_* settings"""
+    if not UPLOAD_PREPROCESS:
+        return PreparedUpload(content, filename, mimetype, len(content))
+    with metrics.phase("preprocess"):
+        prepared = run_cpu_bound(
+            prepare_upload, content, filename, mimetype,
+            max_side=UPLOAD_MAX_SIDE,
+            quality=UPLOAD_JPEG_QUALITY,
+            grayscale=UPLOAD_GRAYSCALE,
+            min_bytes=UPLOAD_PREPROCESS_MIN_KB * 1024,
+            pdf_dpi=UPLOAD_PDF_DPI,
+            max_pdf_pages=UPLOAD_MAX_PDF_PAGES
+        )
+    if prepared.action != "unchanged":
+        upload_bytes_saved.inc(prepared.original_bytes - len(prepared.content), action=prepared.action)
+    return prepared
+
+def extract_statistics(job, content, filename, mimetype, cache_key):
+    """Background job: shrink an uploaded file for OCR and send it to ParseExtract.
+    
+    The result holds the extracted data and what preprocessing did (bytes saved, time spent).
+    """
+    job.update(progress=5, message="Datei wird für die Texterkennung vorbereitet")
+    prepared = prepare_for_extraction(content, filename, mimetype)
+    job.update(progress=10, message="Datei wird an ParseExtract gesendet")
+    extracted_data = request_extraction(prepared.content, prepared.filename, prepared.mimetype)
+    extraction_cache.put(cache_key, extracted_data)
+    job.update(progress=90, message="Statistiken erfolgreich extrahiert")
+    return {"data": extracted_data, "preprocessing": prepared.to_dict()}
+
+def request_extraction(content, filename, mimetype):
+    """Send file content to ParseExtract and return the extracted data"""
+    headers = {"Authorization": f"Bearer {PARSEEXTRACT_API_KEY}"}
+    files = {"file": (filename, content, mimetype)}
+    data = {"prompt": EXTRACTION_PROMPT}
+    
+    response = parseextract.post(PARSEEXTRACT_API_URL, files=files, data=data, headers=headers)
+    
+    if response.status_code != 200:
+        raise Exception(f"ParseExtract API Fehler: {response.status_code}")
+    
+    return response.json()
+
+def extract_cached(content, filename, mimetype):
+    """Extract file content, using the content-addressed cache.
+    
+    Returns (data, cached, preprocessing); preprocessing is None for a cache hit.
+    """
+    cache_key = extraction_cache.key(hashlib.sha256(content).hexdigest(), EXTRACTION_PROMPT)
+    cached = extraction_cache.get(cache_key)
+    if cached is not None:
+        return cached, True, None
+    
+    prepared = prepare_for_extraction(content, filename, mimetype)
+    extracted_data = request_extraction(prepared.content, prepared.filename, prepared.mimetype)
+    extraction_cache.put(cache_key, extracted_data)
+    return extracted_data, False, prepared.to_dict()
+
+@app.route("/api/bulk-import", methods=["POST"])
+def bulk_import():
+    """Import many scoresheets (or ZIP archives of them) straight into Google Sheets"""
+    if storage is None:
+        return storage_not_configured()
+    
+    uploads = [f for f in request.files.getlist('files') if f.filename]
+    if not uploads:
+        return jsonify({"error": "Keine Datei hochgeladen"}), 400
+    
+    try:
+        try:
+            files = list(iter_upload_files(
+                uploads,
+                allowed_file,
+                max_bytes=MAX_UPLOAD_MB * 1024 * 1024,
+                max_files=MAX_BULK_FILES,
+                max_total_bytes=MAX_BULK_MB * 1024 * 1024
+            ))
+        except UploadLimitExceeded as e:
+            return jsonify({"error": str(e)}), 400
+        
+        resume = parse_bulk_resume(request.form.get('resume'), len(files))
+        if resume is False:
+            return jsonify({"error": "resume passt nicht zu den hochgeladenen Dateien"}), 400
+        
+        try:
+            job = job_queue.submit(
+                "bulk-import",
+                run_bulk_import,
+                files,
+                extract_cached,
+                transform_to_sheet_format,
+                store_rows,
+                new_import_id,
+                resume=resume,
+                workers=BULK_EXTRACTION_WORKERS,
+                batch_size=SHEETS_WRITE_BATCH_SIZE,
+                max_pending=SHEETS_WRITE_MAX_PENDING
+            )
+        except QueueFull:
+            return jsonify({"error": "Zu viele Uploads in Bearbeitung, bitte später erneut versuchen"}), 503
+        
+        return jsonify({
+            "success": True,
+            "job_id": job.id,
+            "status_url": url_for('get_job', job_id=job.id),
+            "events_url": url_for('job_event_stream', job_id=job.id),
+            "message": f"{len(files)} Dateien werden importiert"
+        }), 202
+        
+    except Exception as e:
+        return jsonify({"error": f"Verarbeitungsfehler: {str(e)}"}), 500
+
+def parse_bulk_resume(raw, file_count):
+    """The resume list of a bulk import retry: None without one, False if malformed.
+    
+    It holds one entry per file of the earlier run's summary, either null
+    or {"import_id", "start"} as reported there (start = rows_written).
+    """
+    if not raw:
+        return None
+    try:
+        resume = json.loads(raw)
+    except ValueError:
+        return False
+    if not isinstance(resume, list) or len(resume) != file_count:
+        return False
+    for entry in resume:
+        if entry is None:
+            continue
+        if (not isinstance(entry, dict) or not IMPORT_ID_PATTERN.fullmatch(str(entry.get('import_id')))
+                or not isinstance(entry.get('start'), int) or entry['start'] < 0):
+            return False
+    return resume
+
+def find_job(job_id):
+    return job_queue.get(job_id) or batch_queue.get(job_id)
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """Get status, progress and result of a background job"""
+    job = find_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job nicht gefunden"}), 404
+    
+    return jsonify({
+        "success": True,
+        "job": job.to_dict()
+    })
+
+@app.route("/api/jobs/<job_id>/events", methods=["GET"])
+def job_event_stream(job_id):
+    """Stream job progress as Server-Sent Events until it finishes"""
+    job = find_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job nicht gefunden"}), 404
+    
+    return Response(
+        stream_with_context(job_events(job)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.route("/api/save-to-sheets", methods=["POST"])
 def save_to_sheets():
-    """Save extracted data to Google Sheets via sheetsdb.io"""
-    if not SHEETSDB_URL:
-        return jsonify({"error": "Google Sheets URL nicht konfiguriert"}), 500
+    """Save extracted data to the configured storage (Google Sheets via sheetsdb.io)
+    
+    Rows are written in batches, so a failure can leave the first ones
+    stored. The error then carries the import_id and the rows written; a
+    retry passing both as ?import_id=...&start=... rebuilds the same game
+    ids and writes only the rest.
+    """
+    if storage is None:
+        return storage_not_configured()
+    
+    import_id = request.args.get('import_id') or new_import_id()
+    if not IMPORT_ID_PATTERN.fullmatch(import_id):
+        return jsonify({"error": "Ungültige import_id"}), 400
+    try:
+        start = max(int(request.args.get('start', 0)), 0)
+    except ValueError:
+        return jsonify({"error": "start muss eine Zahl sein"}), 400
     
+    created = 0
     try:
         raw_data = request.json
         if not raw_data:
@@ -89,38 +469,42 @@ def save_to_sheets():
         
         # Transform data to SheetDB.io format
         # The API expects data in this format: {"data": [{"column1": "value1", ...}]}
-        sheet_data = transform_to_sheet_format(raw_data)
+        with metrics.phase("transform"):
+            sheet_data = transform_to_sheet_format(raw_data, import_id)
         
-        # Send to sheetsdb.io with proper headers
-        headers = {
-            'Content-Type': 'application/json'
-        }
+        # Send to sheetsdb.io in size-capped batches
+        rows = sheet_data["data"]
+        for offset in range(start, len(rows), SHEETS_WRITE_BATCH_SIZE):
+            batch = rows[offset:offset + SHEETS_WRITE_BATCH_SIZE]
+            store_rows(batch)
+            created += len(batch)
         
-        response = requests.post(
-            SHEETSDB_URL, 
-            json=sheet_data, 
-            headers=headers,
-            timeout=30
-        )
-        
-        if response.status_code in [200, 201]:
-            result = response.json()
-            return jsonify({
-                "success": True,
-                "message": f"Daten erfolgreich in Google Sheets gespeichert ({result.get('created', '?')} Zeilen erstellt)"
-            })
-        else:
-            error_text = response.text
-            return jsonify({
-                "error": f"Google Sheets Fehler: {response.status_code} - {error_text}"
-            }), 500
+        return jsonify({
+            "success": True,
+            "import_id": import_id,
+            "rows_written": start + created,
+            "message": f"Daten erfolgreich in {storage.destination} gespeichert ({created} Zeilen erstellt)"
+        })
             
     except Exception as e:
-        return jsonify({"error": f"Fehler beim Speichern: {str(e)}"}), 500
+        message = str(e) if isinstance(e, StorageError) else f"Fehler beim Speichern: {str(e)}"
+        return jsonify({"error": message, "import_id": import_id, "rows_written": start + created}), 500
+
+def store_rows(rows):
+    """Append rows to storage and update caches; returns the created count"""
+    created = storage.append_rows(rows)
+    sheet_cache.invalidate()
+    data_version.bump()
+    aggregate_store.apply_rows(rows)
+    trend_store.apply_rows(rows)
+    player_index.apply_rows(rows)
+    return created
 
-def transform_to_sheet_format(extracted_data):
+def transform_to_sheet_format(extracted_data, import_id=None):
     """Transform ParseExtract response to Google Sheets format with specific columns:
     game_id, mode, legType, date, duration, player, round, throw1, throw2, throw3, score, rest, bust
+    
+    Game ids derive from import_id when given, so the same data always maps to the same rows.
     """
     rows = []
     current_timestamp = datetime.now()
@@ -129,7 +513,7 @@ def transform_to_sheet_format(extracted_data):
     # Parse extracted data and create rows matching your Google Sheets structure
     try:
         # Try to extract dart game information from the AI response
-        dart_data = parse_dart_data(extracted_data)
+        dart_data = parse_dart_data(extracted_data, import_id)
         
         for entry in dart_data:
             row = {
@@ -175,57 +559,40 @@ def transform_to_sheet_format(extracted_data):
     
     return {"data": rows}
 
-def parse_dart_data(extracted_data):
+def new_import_id():
+    # Unique per import so files processed in the same second keep separate legs
+    return f"imported_{int(datetime.now().timestamp())}_{uuid.uuid4().hex[:6]}"
+
+IMPORT_ID_PATTERN = re.compile(r"imported_\d+_[0-9a-f]{6}")
+
+def parse_dart_data(extracted_data, import_id=None):
     """Parse extracted data to find dart game information"""
     entries = []
+    game_id = import_id or new_import_id()
     
-    # Convert to string if it's not already
-    if not isinstance(extracted_data, str):
-        data_str = json.dumps(extracted_data) if isinstance(extracted_data, (dict, list)) else str(extracted_data)
-    else:
-        data_str = extracted_data
-    
-    # Look for common dart patterns in the extracted text
-    import re
-    
-    # Try to find player names (common patterns: PLAYER123, Name123, etc.)
-    player_matches = re.findall(r'([A-Z][A-Z0-9]+|\w+\d+)', data_str)
-    
-    # Try to find scores and throws (T20, D16, 180, etc.)
-    throw_matches = re.findall(r'(T\d+|D\d+|S\d+|\b\d{1,3}\b)', data_str)
-    
-    # Try to find round information
-    round_matches = re.findall(r'(?:round|runde|leg)\s*(\d+)', data_str.lower())
-    
-    # Create entries based on found data
-    if player_matches:
-        for i, player in enumerate(player_matches[:5]):  # Max 5 players
-            entry = {
-                'player': player,
-                'round': str(i + 1),
-                'game_id': f"imported_{int(datetime.now().timestamp())}_{i}"
-            }
-            
-            # Try to assign throws if available
-            start_idx = i * 3
-            if len(throw_matches) > start_idx:
-                entry['throw1'] = throw_matches[start_idx] if start_idx < len(throw_matches) else ''
-                entry['throw2'] = throw_matches[start_idx + 1] if start_idx + 1 < len(throw_matches) else ''
-                entry['throw3'] = throw_matches[start_idx + 2] if start_idx + 2 < len(throw_matches) else ''
-                
-                # Calculate score from throws
-                score = calculate_throw_score(entry.get('throw1', ''), entry.get('throw2', ''), entry.get('throw3', ''))
-                entry['score'] = str(score)
-                entry['rest'] = str(501 - score)  # Assuming 501 game
-            
-            entries.append(entry)
+    # Single pass over the extracted structure: tokens -> typed throws -> scored visits
+    for visit in parse_visits(extracted_data):
+        entry = {
+            'player': visit['player'],
+            'round': str(visit['round']),
+            'game_id': f"{game_id}_{visit['leg']}"
+        }
+        
+        if visit['throws']:
+            notations = [throw.notation for throw in visit['throws']] + ['', '', '']
+            entry['throw1'], entry['throw2'], entry['throw3'] = notations[:3]
+            entry['score'] = str(visit['score'])
+            entry['rest'] = str(visit['rest'])
+            entry['bust'] = 'true' if visit['bust'] else 'false'
+        
+        entries.append(entry)
     
     # If no structured data found, create at least one entry
     if not entries:
         entries.append({
             'player': 'Imported_Player',
             'round': '1',
-            'game_id': f"imported_{int(datetime.now().timestamp())}"
+            'game_id': game_id
         })
     
     return entries
@@ -254,20 +621,9 @@ def calculate_throw_score(throw1, throw2, throw3):
     total = 0
     
     for throw in [throw1, throw2, throw3]:
-        if not throw:
-            continue
-            
-        try:
-            if throw.startswith('T'):  # Triple
-                total += int(throw[1:]) * 3
-            elif throw.startswith('D'):  # Double  
-                total += int(throw[1:]) * 2
-            elif throw.startswith('S'):  # Single
-                total += int(throw[1:])
-            elif throw.isdigit():  # Direct number
-                total += int(throw)
-        except (ValueError, IndexError):
-            continue
+        parsed = parse_throw(throw) if throw else None
+        if parsed is not None:
+            total += parsed.points
     
     return total
 
@@ -296,108 +652,391 @@ def flatten_data(data_item):
     return flattened
 
 @app.route("/api/get-players", methods=["GET"])
+@versioned(data_version, HTTP_ETAG_REFRESH)
 def get_players():
     """Get list of players from Google Sheets"""
-    if not SHEETSDB_URL:
-        return jsonify({"error": "Google Sheets URL nicht konfiguriert"}), 500
+    if storage is None:
+        return storage_not_configured()
     
     try:
-        # Fetch data from sheets to extract player names
-        response = requests.get(f"{SHEETSDB_URL}?select=player", timeout=30)
-        
-        if response.status_code == 200:
-            data = response.json()
-            # Extract unique player names
-            players = list(set([row.get('player', '') for row in data if row.get('player')]))
-            players.sort()
-            
-            return jsonify({
-                "success": True,
-                "players": players
-            })
-        else:
-            return jsonify({
-                "error": f"Google Sheets Fehler: {response.status_code}"
-            }), 500
-            
+        players = load_player_index().names()
+        
+        return jsonify({
+            "success": True,
+            "players": players
+        })
+        
+    except StorageError as e:
+        return jsonify({"error": str(e)}), 500
     except Exception as e:
         return jsonify({"error": f"Fehler beim Abrufen der Spieler: {str(e)}"}), 500
 
+@app.route("/api/players/search", methods=["GET"])
+@versioned(data_version, HTTP_ETAG_REFRESH)
+def search_players():
+    """Page through players by name prefix (then substring/fuzzy), with game counts and last-played dates"""
+    if storage is None:
+        return storage_not_configured()
+    
+    query = request.args.get('q', '')
+    sort = request.args.get('sort', 'name')
+    fuzzy = request.args.get('fuzzy', '1') not in ('0', 'false')
+    try:
+        offset = int(request.args.get('offset', 0))
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        return jsonify({"error": "Ungültige Seitenangabe"}), 400
+    if offset < 0 or not 1 <= limit <= MAX_PLAYER_SEARCH_LIMIT:
+        return jsonify({"error": f"limit muss zwischen 1 und {MAX_PLAYER_SEARCH_LIMIT} liegen"}), 400
+    if sort not in SORT_ORDERS:
+        return jsonify({"error": f"Unbekannte Sortierung: {sort}"}), 400
+    
+    try:
+        total, players = load_player_index().search(query, offset, limit, sort=sort, fuzzy=fuzzy)
+        
+        return jsonify({
+            "success": True,
+            "players": players,
+            "total": total,
+            "offset": offset,
+            "limit": limit
+        })
+        
+    except StorageError as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": f"Fehler bei der Spielersuche: {str(e)}"}), 500
+
+def load_player_index():
+    """The player index, built from storage on first use and refreshed after PLAYER_INDEX_TTL"""
+    player_index.ensure(storage.player_activity, ttl=PLAYER_INDEX_TTL)
+    return player_index
+
 @app.route("/api/player-stats/<player_name>", methods=["GET"])
+@versioned(data_version, HTTP_ETAG_REFRESH)
 def get_player_stats(player_name):
     """Get statistics for a specific player"""
-    if not SHEETSDB_URL:
-        return jsonify({"error": "Google Sheets URL nicht konfiguriert"}), 500
+    if storage is None:
+        return storage_not_configured()
     
     try:
-        # Fetch player data from sheets
-        response = requests.get(f"{SHEETSDB_URL}?player={player_name}", timeout=30)
+        # Materialize the player from sheets, then serve from the store until it expires
+        stats = aggregate_store.stats([player_name], load_player_rows)[player_name]
         
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Calculate KPIs
-            stats = calculate_player_stats(data, player_name)
-            
-            return jsonify({
-                "success": True,
-                "stats": stats
-            })
-        else:
-            return jsonify({
-                "error": f"Google Sheets Fehler: {response.status_code}"
-            }), 500
-            
+        return jsonify({
+            "success": True,
+            "stats": stats
+        })
+        
+    except StorageError as e:
+        return jsonify({"error": str(e)}), 500
     except Exception as e:
         return jsonify({"error": f"Fehler beim Abrufen der Statistiken: {str(e)}"}), 500
 
-def calculate_player_stats(data, player_name):
-    """Calculate player statistics from game data"""
-    player_games = [game for game in data if game.get('player') == player_name]
-    
-    if not player_games:
-        return {
-            "ppr": 0,
-            "checkout_percentage": 0,
-            "checkout_points": [],
-            "win_rate": 0,
-            "visits_buckets": {"60+": 0, "100+": 0, "140+": 0, "180": 0},
-            "total_games": 0
+def load_player_rows(player_names):
+    """Rows of the given players through the sheet cache.
+    
+    Players not cached yet are fetched together in one rows_for_players
+    query and then cached one by one.
+    """
+    if len(player_names) == 1:
+        player_name, = player_names
+        return sheet_cache.get_or_load(f"player-rows:{player_name}", lambda: storage.player_rows(player_name))
+    
+    def load(keys):
+        grouped = {key[len("player-rows:"):]: [] for key in keys}
+        for row in storage.rows_for_players(list(grouped)):
+            if row.get('player') in grouped:
+                grouped[row['player']].append(row)
+        return {f"player-rows:{name}": rows for name, rows in grouped.items()}
+    
+    cached = sheet_cache.get_or_load_many([f"player-rows:{name}" for name in player_names], load)
+    return [row for rows in cached.values() for row in rows]
+
+@app.route("/api/player-stats/<player_name>/trend", methods=["GET"])
+@versioned(data_version, HTTP_ETAG_REFRESH)
+def get_player_trend(player_name):
+    """Rolling PPR, checkout conversion and 100+/140+/180 rates over the last N legs or days"""
+    if storage is None:
+        return storage_not_configured()
+    
+    unit = request.args.get('unit', 'legs')
+    try:
+        window = int(request.args.get('window', TREND_DEFAULT_WINDOW))
+        points = int(request.args.get('points', 100))
+    except ValueError:
+        return jsonify({"error": "window und points müssen ganze Zahlen sein"}), 400
+    if unit not in TREND_UNITS:
+        return jsonify({"error": f"Unbekannte Einheit: {unit}"}), 400
+    if window < 1 or not 1 <= points <= MAX_TREND_POINTS:
+        return jsonify({"error": f"window muss positiv sein, points zwischen 1 und {MAX_TREND_POINTS} liegen"}), 400
+    
+    try:
+        legs, series = trend_store.series(player_name, load_player_rows, window, unit, points)
+        
+        return jsonify({
+            "success": True,
+            "player": player_name,
+            "unit": unit,
+            "window": window,
+            "legs": legs,
+            "series": series
+        })
+        
+    except StorageError as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": f"Fehler beim Abrufen des Verlaufs: {str(e)}"}), 500
+
+@app.route("/api/player-stats/<player_name>/advanced", methods=["GET"])
+@versioned(data_version, HTTP_ETAG_REFRESH)
+def get_player_stats_advanced(player_name):
+    """Get detailed KPIs (first 9, checkout per double, percentiles, legs) for a player"""
+    if storage is None:
+        return storage_not_configured()
+    
+    try:
+        def compute():
+            data = sheet_cache.get_or_load(
+                f"player-rows:{player_name}",
+                lambda: storage.player_rows(player_name)
+            )
+            with metrics.phase("advanced_stats"):
+                return run_cpu_bound(compute_advanced_stats, [row for row in data if row.get('player') == player_name])
+        
+        stats = sheet_cache.get_or_load(f"advanced-stats:{player_name}", compute)
+        
+        return jsonify({
+            "success": True,
+            "stats": stats
+        })
+        
+    except StorageError as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": f"Fehler beim Abrufen der Statistiken: {str(e)}"}), 500
+
+@app.route("/api/player-stats/batch", methods=["POST"])
+def get_player_stats_batch():
+    """Get statistics for several players with at most one upstream fetch"""
+    if storage is None:
+        return storage_not_configured()
+    
+    data = request.get_json(silent=True)
+    players = data.get('players') if isinstance(data, dict) else None
+    if not isinstance(players, list) or not all(isinstance(name, str) for name in players):
+        return jsonify({"error": "players muss eine Liste von Spielernamen sein"}), 400
+    player_names = list(dict.fromkeys(name for name in players if name))  # dedupe, keep order
+    
+    if not player_names:
+        return jsonify({"error": "Spielernamen erforderlich"}), 400
+    if len(player_names) > MAX_BATCH_PLAYERS:
+        return jsonify({"error": f"Maximal {MAX_BATCH_PLAYERS} Spieler pro Anfrage"}), 400
+    
+    try:
+        return jsonify({
+            "success": True,
+            "stats": aggregate_store.stats(player_names, load_player_rows)
+        })
+        
+    except StorageError as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": f"Fehler beim Abrufen der Statistiken: {str(e)}"}), 500
+
+@app.route("/api/checkout/<int:score>", methods=["GET"])
+@versioned(static_version, cache_control="public, max-age=3600")
+def get_checkout(score):
+    """Suggested double-out route for a remaining score"""
+    if not MIN_CHECKOUT <= score <= MAX_CHECKOUT:
+        return jsonify({"error": f"Restpunktzahl muss zwischen {MIN_CHECKOUT} und {MAX_CHECKOUT} liegen"}), 400
+    
+    darts_left = request.args.get('darts', MAX_DARTS, type=int)
+    if not 1 <= darts_left <= MAX_DARTS:
+        return jsonify({"error": f"Darts muss zwischen 1 und {MAX_DARTS} liegen"}), 400
+    
+    table = checkout_table(parse_doubles(request.args.get('doubles')) or PREFERRED_DOUBLES)
+    route = table.suggest(score, darts_left)
+    
+    return jsonify({
+        "success": True,
+        "score": score,
+        "checkout": route is not None,
+        "route": route,
+        "routes": table.routes(score)
+    })
+
+@app.route("/api/checkouts", methods=["GET"])
+@versioned(static_version, cache_control="public, max-age=3600")
+def get_checkouts():
+    """The full checkout table (score -> darts -> route) for client-side lookups"""
+    table = checkout_table(parse_doubles(request.args.get('doubles')) or PREFERRED_DOUBLES)
+    return jsonify({
+        "success": True,
+        "preferred_doubles": list(table.preferred_doubles),
+        "checkouts": table.to_dict()
+    })
+
+@app.route("/api/simulate", methods=["POST"])
+def simulate_legs_endpoint():
+    """Simulate 501 legs from a player's throw history; with an opponent also head-to-head odds"""
+    if storage is None:
+        return storage_not_configured()
+    
+    data = request.get_json(silent=True) or {}
+    player_name = data.get('player')
+    opponent_name = data.get('opponent')
+    
+    if not player_name:
+        return jsonify({"error": "Spielername erforderlich"}), 400
+    try:
+        legs = int(data.get('legs', SIMULATION_LEGS))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Ungültige Anzahl Legs"}), 400
+    if not 1 <= legs <= SIMULATION_MAX_LEGS:
+        return jsonify({"error": f"Anzahl Legs muss zwischen 1 und {SIMULATION_MAX_LEGS} liegen"}), 400
+    
+    try:
+        result = sheet_cache.get_or_load(
+            f"simulation:{legs}:{player_name}:{opponent_name or ''}",
+            lambda: run_simulation(player_name, opponent_name, legs)
+        )
+        
+        return jsonify({
+            "success": True,
+            "simulation": result
+        })
+        
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 404
+    except StorageError as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": f"Fehler bei der Simulation: {str(e)}"}), 500
+
+def run_simulation(player_name, opponent_name, legs):
+    """Simulated darts-per-leg summaries and, for two players, win probabilities"""
+    def model_for(name):
+        rows = sheet_cache.get_or_load(f"player-rows:{name}", lambda: storage.player_rows(name))
+        return PlayerModel.from_rows([row for row in rows if row.get('player') == name])
+    
+    names = [player_name] + ([opponent_name] if opponent_name else [])
+    darts = {}
+    result = {"legs": legs, "players": {}}
+    for name in names:
+        model = model_for(name)
+        with metrics.phase("simulation"):
+            darts[name] = run_cpu_bound(simulate, model, legs, workers=SIMULATION_WORKERS, preferred_doubles=PREFERRED_DOUBLES)
+        result["players"][name] = {"model": model.to_dict(), **summarize(darts[name])}
+    
+    if opponent_name:
+        win = head_to_head(darts[player_name], darts[opponent_name])
+        result["head_to_head"] = {
+            player_name: round(win * 100, 2),
+            opponent_name: round((1 - win) * 100, 2)
         }
+    return result
+
+@app.route("/api/cache-stats", methods=["GET"])
+def cache_stats():
+    """Hit/miss counters of the SheetDB read cache and the extraction cache"""
+    return jsonify({
+        "success": True,
+        "cache": sheet_cache.stats(),
+        "training_plan_cache": training_plan_cache.stats(),
+        "extraction_cache": extraction_cache.stats(),
+        "integrations": {
+            **{client.name: client.stats() for client in (sheetdb, parseextract, notion)},
+            openai_breaker.name: {"circuit": openai_breaker.state}
+        },
+        "rate_limits": {"OpenAI": openai_limiter.stats(), "Notion": notion_limiter.stats()},
+        "notion_export": notion_exporter.stats(),
+        "player_index": player_index.stats(),
+        "live_writes": live_writer.stats()
+    })
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Request, upstream and phase metrics in the Prometheus text format"""
+    for client in (sheetdb, parseextract, notion):
+        metrics.upstream_circuit_open.set(int(client.breaker.state == 'open'), upstream=client.name)
+    metrics.upstream_circuit_open.set(int(openai_breaker.state == 'open'), upstream=openai_breaker.name)
+    live_writes = live_writer.stats()
+    live_pending_rows.set(live_writes["pending"])
+    live_write_failures.set(live_writes["failures"])
+    return metrics_response(metrics)
+
+@app.route("/api/aggregates/rebuild", methods=["POST"])
+def rebuild_aggregates():
+    """Recompute all player aggregates from the full sheet (recovery)"""
+    if storage is None:
+        return storage_not_configured()
     
-    total_points = sum(game.get('points', 0) for game in player_games)
-    total_rounds = sum(game.get('rounds', 1) for game in player_games)
-    ppr = round(total_points / total_rounds, 2) if total_rounds > 0 else 0
-    
-    successful_checkouts = len([game for game in player_games if game.get('checkout', False)])
-    checkout_percentage = round((successful_checkouts / len(player_games)) * 100, 2) if player_games else 0
-    
-    checkout_points = [game.get('checkout_points', 0) for game in player_games if game.get('checkout_points')]
-    
-    wins = len([game for game in player_games if game.get('win', False)])
-    win_rate = round((wins / len(player_games)) * 100, 2) if player_games else 0
-    
-    # Calculate visits buckets
-    visits_buckets = {"60+": 0, "100+": 0, "140+": 0, "180": 0}
-    for game in player_games:
-        points = game.get('points', 0)
-        if points >= 180:
-            visits_buckets["180"] += 1
-        elif points >= 140:
-            visits_buckets["140+"] += 1
-        elif points >= 100:
-            visits_buckets["100+"] += 1
-        elif points >= 60:
-            visits_buckets["60+"] += 1
-    
-    return {
-        "ppr": ppr,
-        "checkout_percentage": checkout_percentage,
-        "checkout_points": checkout_points,
-        "win_rate": win_rate,
-        "visits_buckets": visits_buckets,
-        "total_games": len(player_games)
-    }
+    try:
+        stamps = aggregate_store.version, trend_store.version
+        data = storage.all_rows()
+        player_count = run_cpu_bound(aggregate_store.rebuild, data, stamps[0])
+        run_cpu_bound(trend_store.rebuild, data, stamps[1])
+        player_index.rebuild(data)
+        sheet_cache.invalidate()
+        data_version.bump()
+        
+        return jsonify({
+            "success": True,
+            "message": f"Statistiken für {player_count} Spieler neu berechnet"
+        })
+        
+    except StorageError as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": f"Fehler beim Neuberechnen der Statistiken: {str(e)}"}), 500
+
+@app.route("/api/export", methods=["GET"])
+def export_rows():
+    """Stream one player's rows (or all rows) as CSV, NDJSON or Parquet, optionally within a date range"""
+    if storage is None:
+        return storage_not_configured()
+    
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"Unbekanntes Exportformat: {fmt}"}), 400
+    if fmt == 'parquet' and not parquet_available():
+        return jsonify({"error": "Parquet-Export nicht verfügbar (pyarrow fehlt)"}), 500
+    
+    player_name = request.args.get('player') or None
+    try:
+        date_from, date_to = (
+            date.fromisoformat(value).isoformat() if value else None
+            for value in (request.args.get('from'), request.args.get('to'))
+        )
+    except ValueError:
+        return jsonify({"error": "Ungültiges Datum, erwartet JJJJ-MM-TT"}), 400
+    
+    try:
+        rows = storage.iter_rows(player_name, date_from, date_to, page_size=EXPORT_PAGE_SIZE)
+        chunks = export_chunks(rows, fmt)
+        # Read the first page before answering so storage errors still get a status code
+        first = next(chunks, b'')
+    except StorageError as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": f"Fehler beim Export: {str(e)}"}), 500
+    
+    content_type, extension = EXPORT_FORMATS[fmt]
+    filename = secure_filename(f"{player_name or 'alle-spieler'}-{date_from or 'start'}-{date_to or 'heute'}.{extension}")
+    return Response(
+        stream_with_context(itertools.chain([first], chunks)),
+        content_type=content_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Accel-Buffering": "no"}
+    )
+
+def calculate_player_stats(data, player_name):
+    """Calculate player statistics from game data"""
+    aggregate = PlayerAggregate()
+    for game in data:
+        if game.get('player') == player_name:
+            aggregate.add(game)
+    return aggregate.to_stats()
 
 @app.route("/")
 def home():
@@ -417,73 +1056,128 @@ def generate_training_plan():
         if not player_name:
             return jsonify({"error": "Spielername erforderlich"}), 400
         
-        # Get last 5 legs from Google Sheets
-        recent_games = get_recent_player_games(player_name, limit=5)
+        digest = get_player_digest(player_name)
         
-        if not recent_games:
+        if digest is None:
             return jsonify({"error": "Keine aktuellen Spieldaten gefunden"}), 404
         
-        # Generate training plan with OpenAI
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        prompt = f"""
-        Analysiere die folgenden Dart-Spieldaten von {player_name} und erstelle einen personalisierten Trainingsplan:
-        
-        Spieldaten: {json.dumps(recent_games, indent=2)}
+        cache_key = plan_cache_key(player_name, digest)
+        generated = []
         
-        Bitte erstelle eine strukturierte Antwort mit folgenden Abschnitten:
-        1. Analyse der Spielstärken
-        2. Identifizierte Schwächen
-        3. Spezifische Übungen (als Tabelle mit Übung, Dauer, Fokus)
-        4. Motivierende Schlussnote
+        def generate():
+            generated.append(True)
+            return request_training_plan(player_name, digest)
         
-        Formatiere die Antwort als JSON mit den Schlüsseln: analysis, strengths, weaknesses, exercises (Array mit name, duration, focus), motivation
-        """
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "Du bist ein professioneller Dart-Trainer. Erstelle präzise, praktische Trainingspläne basierend auf Spielerdaten."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
-        )
-        
-        # Parse GPT response
-        ai_response = response.choices[0].message.content
-        
-        # Try to parse as JSON, fallback to text
-        try:
-            training_plan = json.loads(ai_response)
-        except:
-            training_plan = {
-                "analysis": ai_response,
-                "strengths": [],
-                "weaknesses": [],
-                "exercises": [],
-                "motivation": "Weiter so! Regelmäßiges Training führt zur Verbesserung."
-            }
-        
-        # Add metadata
-        training_plan.update({
-            "player_name": player_name,
-            "created_at": datetime.now().isoformat(),
-            "games_analyzed": len(recent_games)
-        })
+        # One lookup: the plan counts as cached unless this request generated it
+        training_plan = training_plan_cache.get_or_load(cache_key, generate)
         
         return jsonify({
             "success": True,
-            "training_plan": training_plan
+            "training_plan": training_plan,
+            "cached": not generated
         })
         
     except Exception as e:
         return jsonify({"error": f"Fehler bei der Trainingsplan-Generierung: {str(e)}"}), 500
 
+def get_player_digest(player_name):
+    """Feature digest of a player's recent legs, or None without data"""
+    rows = get_recent_player_games(player_name, limit=TRAINING_LEGS * TRAINING_ROWS_PER_LEG)
+    rows = recent_legs(rows, TRAINING_LEGS)
+    if not rows:
+        return None
+    with metrics.phase("digest"):
+        return build_digest(rows, token_budget=TRAINING_TOKEN_BUDGET)
+
+def request_training_plan(player_name, digest):
+    """Ask OpenAI for a training plan and return it with metadata"""
+    client = get_openai_client(OPENAI_API_KEY, timeout=OPENAI_TIMEOUT)
+    with metrics.phase("rate_limit_wait"):
+        openai_limiter.acquire()
+    
+    with openai_breaker.guard(), metrics.upstream(openai_breaker.name, "POST") as call:
+        response = client.chat.completions.create(
+            model=TRAINING_MODEL,
+            messages=build_messages(player_name, digest),
+            temperature=0.7
+        )
+        content = response.choices[0].message.content
+        call.update(status=200, response_bytes=len(content or ""))
+    
+    return finish_training_plan(content, player_name, digest)
+
+def finish_training_plan(ai_response, player_name, digest):
+    """Parse the model answer and add metadata"""
+    training_plan = parse_plan(ai_response)
+    training_plan.update({
+        "player_name": player_name,
+        "created_at": datetime.now().isoformat(),
+        "games_analyzed": digest.get("legs", 0)
+    })
+    return training_plan
+
+@app.route("/api/generate-training-plan/stream", methods=["GET"])
+def stream_training_plan():
+    """Stream a training plan as Server-Sent Events.
+    
+    Cached plans arrive as a single 'plan' event. Otherwise the model output
+    is forwarded as 'delta' events while it is generated, followed by the
+    parsed 'plan' event (or an 'error' event).
+    """
+    if not OPENAI_API_KEY:
+        return jsonify({"error": "OpenAI API Key nicht konfiguriert"}), 500
+    
+    player_name = request.args.get('player_name')
+    if not player_name:
+        return jsonify({"error": "Spielername erforderlich"}), 400
+    
+    digest = get_player_digest(player_name)
+    if digest is None:
+        return jsonify({"error": "Keine aktuellen Spieldaten gefunden"}), 404
+    
+    cache_key = plan_cache_key(player_name, digest)
+    
+    def events():
+        cached = training_plan_cache.get(cache_key)
+        if cached is not None:
+            yield sse_event({"training_plan": cached, "cached": True}, event="plan")
+            return
+        
+        try:
+            client = get_openai_client(OPENAI_API_KEY, timeout=OPENAI_TIMEOUT)
+            with metrics.phase("rate_limit_wait"):
+                openai_limiter.acquire()
+            chunks = []
+            with openai_breaker.guard(), metrics.upstream(openai_breaker.name, "POST") as call:
+                stream = client.chat.completions.create(
+                    model=TRAINING_MODEL,
+                    messages=build_messages(player_name, digest),
+                    temperature=0.7,
+                    stream=True
+                )
+                for chunk in stream:
+                    text = chunk.choices[0].delta.content if chunk.choices else None
+                    if text:
+                        chunks.append(text)
+                        yield sse_event({"text": text}, event="delta")
+                call.update(status=200, response_bytes=sum(len(text) for text in chunks))
+            
+            training_plan = finish_training_plan("".join(chunks), player_name, digest)
+            training_plan_cache.set(cache_key, training_plan)
+            yield sse_event({"training_plan": training_plan, "cached": False}, event="plan")
+        except Exception as e:
+            yield sse_event({"error": f"Fehler bei der Trainingsplan-Generierung: {str(e)}"}, event="error")
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.route("/api/save-to-notion", methods=["POST"])
 def save_to_notion():
     """Save training plan to Notion"""
-    if not NOTION_API_KEY or not NOTION_DATABASE_ID:
+    if not notion_exporter.configured:
         return jsonify({"error": "Notion API nicht konfiguriert"}), 500
     
     try:
@@ -493,123 +1187,315 @@ def save_to_notion():
         if not training_plan:
             return jsonify({"error": "Trainingsplan erforderlich"}), 400
         
-        # Prepare Notion page data
-        notion_data = {
-            "parent": {"database_id": NOTION_DATABASE_ID},
-            "properties": {
-                "Titel": {
-                    "title": [
-                        {
-                            "text": {
-                                "content": f"Trainingsplan - {training_plan.get('player_name', 'Unbekannt')}"
-                            }
-                        }
-                    ]
-                },
-                "Spieler": {
-                    "rich_text": [
-                        {
-                            "text": {
-                                "content": training_plan.get('player_name', 'Unbekannt')
-                            }
-                        }
-                    ]
-                },
-                "Datum": {
-                    "date": {
-                        "start": training_plan.get('created_at', datetime.now().isoformat())
-                    }
-                }
-            },
-            "children": [
-                {
-                    "object": "block",
-                    "type": "heading_2",
-                    "heading_2": {
-                        "rich_text": [{"type": "text", "text": {"content": "Analyse"}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {
-                        "rich_text": [{"type": "text", "text": {"content": str(training_plan.get('analysis', ''))}}]
-                    }
-                }
-            ]
-        }
+        return jsonify({
+            "success": True,
+            "message": "Trainingsplan erfolgreich in Notion gespeichert",
+            "notion_url": notion_exporter.create_page(training_plan)
+        })
         
-        # Add exercises as table if available
-        if training_plan.get('exercises'):
-            exercises_text = "\\n".join([
-                f"• {ex.get('name', '')}: {ex.get('duration', '')} - {ex.get('focus', '')}"
-                for ex in training_plan['exercises']
-            ])
-            
-            notion_data["children"].extend([
-                {
-                    "object": "block",
-                    "type": "heading_2",
-                    "heading_2": {
-                        "rich_text": [{"type": "text", "text": {"content": "Übungen"}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {
-                        "rich_text": [{"type": "text", "text": {"content": exercises_text}}]
-                    }
-                }
-            ])
-        
-        # Send to Notion API
-        headers = {
-            "Authorization": f"Bearer {NOTION_API_KEY}",
-            "Content-Type": "application/json",
-            "Notion-Version": "2022-06-28"
-        }
+    except NotionError as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": f"Fehler beim Speichern in Notion: {str(e)}"}), 500
+
+@app.route("/api/notion/export", methods=["POST"])
+def export_to_notion():
+    """Export many training plans to Notion in a background job.
+    
+    Takes {"plans": [...]} or {"batch_id": ...}; for a batch, plans that
+    already have a Notion page are skipped and new page URLs are recorded
+    in the batch state.
+    """
+    if not notion_exporter.configured:
+        return jsonify({"error": "Notion API nicht konfiguriert"}), 500
+    
+    data = request.get_json(silent=True) or {}
+    batch_id = data.get('batch_id')
+    # The batch stays claimed until the export job ends, so no training batch
+    # run can write its state file meanwhile (and vice versa)
+    if batch_id and not training_batches.claim(batch_id):
+        return jsonify({"error": "Batch wird bereits bearbeitet"}), 409
+    
+    job = None
+    try:
+        if batch_id:
+            state = training_batches.load(batch_id)
+            if state is None:
+                training_batches.release(batch_id)
+                return jsonify({"error": "Batch nicht gefunden"}), 404
+            plans = [entry["plan"] for entry in state["players"].values()
+                     if entry.get("plan") and not entry.get("notion_url")]
+        else:
+            state = None
+            plans = data.get('plans')
+            if not isinstance(plans, list) or not all(isinstance(plan, dict) for plan in plans):
+                return jsonify({"error": "Trainingspläne erforderlich"}), 400
         
-        response = requests.post(
-            "https://api.notion.com/v1/pages",
-            headers=headers,
-            json=notion_data,
-            timeout=30
-        )
+        error = None
+        if not plans:
+            error = "Keine Trainingspläne zu exportieren"
+        elif len(plans) > MAX_NOTION_EXPORT_PLANS:
+            error = f"Maximal {MAX_NOTION_EXPORT_PLANS} Trainingspläne pro Export"
+        if error:
+            if batch_id:
+                training_batches.release(batch_id)
+            return jsonify({"error": error}), 400
         
-        if response.status_code == 200:
-            return jsonify({
-                "success": True,
-                "message": "Trainingsplan erfolgreich in Notion gespeichert",
-                "notion_url": response.json().get('url')
-            })
+        try:
+            if batch_id:
+                job = batch_queue.submit("notion-export", run_batch_job, batch_id, run_notion_export, plans, state)
+            else:
+                job = batch_queue.submit("notion-export", run_notion_export, plans)
+        except QueueFull:
+            if batch_id:
+                training_batches.release(batch_id)
+            return jsonify({"error": "Zu viele Aufträge in Bearbeitung, bitte später erneut versuchen"}), 503
+        
+        return jsonify({
+            "success": True,
+            "job_id": job.id,
+            "status_url": url_for('get_job', job_id=job.id),
+            "events_url": url_for('job_event_stream', job_id=job.id),
+            "message": f"{len(plans)} Trainingspläne werden exportiert"
+        }), 202
+        
+    except Exception as e:
+        if batch_id and job is None:
+            training_batches.release(batch_id)
+        return jsonify({"error": f"Fehler beim Notion-Export: {str(e)}"}), 500
+
+def run_notion_export(job, plans, state=None):
+    """Job body for /api/notion/export; records page URLs in the batch state if given"""
+    summary = export_plans(job, notion_exporter, plans, workers=NOTION_EXPORT_WORKERS)
+    if state is not None:
+        for outcome in summary["plans"]:
+            entry = state["players"].get(outcome["player_name"])
+            if entry is not None and outcome["status"] == "exported":
+                entry["notion_url"] = outcome["notion_url"]
+        training_batches.save(state)
+    return summary
+
+@app.route("/api/training-plans/batch", methods=["POST"])
+def start_training_batch():
+    """Generate training plans for many players (default: all) in a background job.
+    
+    Passing the batch_id of an earlier batch resumes it: players that already
+    finished are skipped and saved plans are not regenerated.
+    """
+    if not OPENAI_API_KEY:
+        return jsonify({"error": "OpenAI API Key nicht konfiguriert"}), 500
+    
+    data = request.get_json(silent=True) or {}
+    batch_id = data.get('batch_id')
+    # Claim before reading the state, so the last save of a run that is just
+    # finishing cannot be overwritten by this one
+    if batch_id and not training_batches.claim(batch_id):
+        return jsonify({"error": "Batch wird bereits bearbeitet"}), 409
+    
+    job = None
+    try:
+        if batch_id:
+            state = training_batches.load(batch_id)
+            if state is None:
+                training_batches.release(batch_id)
+                return jsonify({"error": "Batch nicht gefunden"}), 404
         else:
-            return jsonify({
-                "error": f"Notion API Fehler: {response.status_code} - {response.text}"
-            }), 500
-            
+            players = data.get('players')
+            if not players and storage is not None:
+                players = load_player_index().names()
+            if not isinstance(players, list) or not players:
+                return jsonify({"error": "Keine Spieler gefunden"}), 400
+            state = training_batches.create(list(dict.fromkeys(players)), bool(data.get('save_to_notion')))
+            batch_id = state["batch_id"]
+            training_batches.claim(batch_id)
+        
+        if state["save_to_notion"] and not notion_exporter.configured:
+            training_batches.release(batch_id)
+            return jsonify({"error": "Notion API nicht konfiguriert"}), 500
+        
+        try:
+            job = batch_queue.submit(
+                "training-batch",
+                run_batch_job,
+                batch_id,
+                run_training_batch,
+                training_batches,
+                state,
+                generate_plan_for_player,
+                export=notion_exporter.create_page if state["save_to_notion"] else None,
+                workers=TRAINING_BATCH_WORKERS
+            )
+        except QueueFull:
+            training_batches.release(batch_id)
+            return jsonify({"error": "Zu viele Aufträge in Bearbeitung, bitte später erneut versuchen"}), 503
+        
+        return jsonify({
+            "success": True,
+            "batch_id": batch_id,
+            "job_id": job.id,
+            "status_url": url_for('get_job', job_id=job.id),
+            "events_url": url_for('job_event_stream', job_id=job.id),
+            "batch_url": url_for('get_training_batch', batch_id=batch_id)
+        }), 202
+        
     except Exception as e:
-        return jsonify({"error": f"Fehler beim Speichern in Notion: {str(e)}"}), 500
+        if batch_id and job is None:
+            training_batches.release(batch_id)
+        if isinstance(e, StorageError):
+            return jsonify({"error": str(e)}), 500
+        return jsonify({"error": f"Fehler beim Starten des Batches: {str(e)}"}), 500
+
+def run_batch_job(job, batch_id, func, *args, **kwargs):
+    """Job body that runs func on a claimed batch and releases the claim afterwards"""
+    try:
+        return func(job, *args, **kwargs)
+    finally:
+        training_batches.release(batch_id)
+
+@app.route("/api/training-plans/batch/<batch_id>", methods=["GET"])
+def get_training_batch(batch_id):
+    """Per-player outcomes of a batch, read from its state file"""
+    state = training_batches.load(batch_id)
+    if state is None:
+        return jsonify({"error": "Batch nicht gefunden"}), 404
+    
+    summary = batch_summary(state)
+    summary["running"] = training_batches.running(batch_id)
+    if request.args.get('include_plans'):
+        summary["plans"] = {name: entry.get("plan") for name, entry in state["players"].items() if entry.get("plan")}
+    return jsonify({"success": True, **summary})
+
+def generate_plan_for_player(player_name):
+    """Training plan for one player, served from the plan cache when possible"""
+    digest = get_player_digest(player_name)
+    if digest is None:
+        raise ValueError("Keine aktuellen Spieldaten gefunden")
+    return training_plan_cache.get_or_load(
+        plan_cache_key(player_name, digest),
+        lambda: request_training_plan(player_name, digest)
+    )
 
 def get_recent_player_games(player_name, limit=5):
-    """Get recent games for a player from Google Sheets"""
-    if not SHEETSDB_URL:
+    """Get recent games for a player from storage"""
+    if storage is None:
         return []
     
     try:
-        response = requests.get(
-            f"{SHEETSDB_URL}?player={player_name}&limit={limit}&order=created_at.desc",
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            return response.json()
-        
+        return storage.recent_player_rows(player_name, limit)
     except Exception as e:
         print(f"Error fetching recent games: {e}")
     
     return []
 
+@app.route("/api/live/legs", methods=["POST"])
+def start_live_leg():
+    """Start a leg for live scoring; players throw in the order given"""
+    if storage is None:
+        return storage_not_configured()
+    
+    data = request.get_json(silent=True)
+    players = data.get('players') if isinstance(data, dict) else None
+    if (not isinstance(players, list) or not players
+            or not all(isinstance(name, str) and name.strip() for name in players)):
+        return jsonify({"error": "players muss eine Liste von Spielernamen sein"}), 400
+    try:
+        leg = live_board.start_leg(players, int(data.get('start_score', 501)))
+    except (LiveError, ValueError, TypeError) as e:
+        message = str(e) if isinstance(e, LiveError) else "Startwert muss eine Zahl sein"
+        return jsonify({"error": message}), 400
+    except BoardFull:
+        return jsonify({"error": "Zu viele laufende Legs, bitte später erneut versuchen"}), 503
+    
+    return jsonify({
+        "success": True,
+        "leg": leg,
+        "visits_url": url_for('post_live_visit', leg_id=leg['id']),
+        "events_url": url_for('live_event_stream', leg_id=leg['id'])
+    }), 201
+
+@app.route("/api/live/legs", methods=["GET"])
+def get_live_legs():
+    """Legs being scored right now"""
+    return jsonify({
+        "success": True,
+        "legs": live_board.legs(include_finished=request.args.get('finished') in ('1', 'true')),
+        "pending_rows": live_writer.stats()["pending"],
+        # Event streams hold a request thread each unless served by gevent
+        "streaming": gevent_active()
+    })
+
+@app.route("/api/live/legs/<leg_id>", methods=["GET"])
+def get_live_leg(leg_id):
+    """Current state of one live leg"""
+    leg = live_board.get(leg_id)
+    if leg is None:
+        return jsonify({"error": "Leg nicht gefunden"}), 404
+    
+    return jsonify({
+        "success": True,
+        "leg": leg
+    })
+
+@app.route("/api/live/legs/<leg_id>/visits", methods=["POST"])
+def post_live_visit(leg_id):
+    """Score the next visit (up to three darts) of a live leg.
+    
+    The row is queued for storage rather than written per visit; a
+    finished leg is flushed right away.
+    """
+    if live_writer.full:
+        return jsonify({"error": "Speicher nicht erreichbar, Aufnahmen werden gerade nicht angenommen"}), 503
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        result = live_board.add_visit(leg_id, data.get('throws'), data.get('player'))
+    except LiveError as e:
+        return jsonify({"error": str(e)}), 400
+    if result is None:
+        return jsonify({"error": "Leg nicht gefunden"}), 404
+    
+    leg, row = result
+    live_writer.put(row, urgent=leg['winner'] is not None)
+    
+    return jsonify({
+        "success": True,
+        "leg": leg,
+        "visit": row
+    })
+
+@app.route("/api/live/events", methods=["GET"])
+@app.route("/api/live/legs/<leg_id>/events", methods=["GET"])
+def live_event_stream(leg_id=None):
+    """Stream live score updates as Server-Sent Events: all running legs, or one leg until it ends"""
+    if leg_id is not None and live_board.get(leg_id) is None:
+        return jsonify({"error": "Leg nicht gefunden"}), 404
+    
+    return Response(
+        stream_with_context(live_events(live_board, leg_id)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.cli.command("sync-sqlite")
+def sync_sqlite():
+    """Mirror all rows of the Google Sheet into the local SQLite database.
+    
+    Rows saved only locally (SQLite without SHEETSDB_URL) are appended to
+    the sheet first, so the mirror never drops them.
+    """
+    if not SHEETSDB_URL:
+        raise SystemExit("SHEETSDB_URL ist nicht gesetzt")
+    
+    sheet = SheetDBBackend(SHEETSDB_URL, sheetdb)
+    mirror = SQLiteBackend(SQLITE_PATH, sheet)
+    last_local_id, local_rows = mirror.local_rows()
+    for start in range(0, len(local_rows), SHEETS_WRITE_BATCH_SIZE):
+        sheet.append_rows(local_rows[start:start + SHEETS_WRITE_BATCH_SIZE])
+    if local_rows:
+        print(f"{len(local_rows)} lokale Zeilen an Google Sheets übertragen")
+    count = mirror.replace_all(sheet.all_rows(), pushed_up_to=last_local_id)
+    print(f"{count} Zeilen nach {SQLITE_PATH} gespiegelt")
+
 app.register_blueprint(ui_bp, url_prefix="/ui")
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+"""Compare two bench.run result files and fail on regressions.
+
+    python -m bench.compare baseline.json results.json --threshold 0.15
+
+Exits with status 1 when a case present in both files got slower than
+the threshold allows (relative, and by more than --min-ms absolute).
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(old, new, threshold, min_ms, metric='median_ms'):
+    """Rows of (case, old, new, ratio, status) for cases in both result sets"""
+    rows = []
+    for case in sorted(set(old["results"]) & set(new["results"])):
+        before, after = old["results"][case][metric], new["results"][case][metric]
+        ratio = after / before if before else float('inf')
+        if ratio > 1 + threshold and after - before > min_ms:
+            status = "regression"
+        elif ratio < 1 - threshold and before - after > min_ms:
+            status = "faster"
+        else:
+            status = "ok"
+        rows.append((case, before, after, ratio, status))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('results')
+    parser.add_argument('--threshold', type=float, default=0.15, help="allowed relative slowdown")
+    parser.add_argument('--min-ms', type=float, default=0.5, help="ignore differences below this")
+    parser.add_argument('--metric', default='median_ms', choices=['min_ms', 'median_ms', 'p95_ms', 'mean_ms'])
+    args = parser.parse_args()
+
+    old, new = load(args.baseline), load(args.results)
+    rows = compare(old, new, args.threshold, args.min_ms, args.metric)
+    print(f"{old['meta'].get('commit')} -> {new['meta'].get('commit')} ({args.metric})")
+    width = max((len(case) for case in set(old["results"]) | set(new["results"])), default=10)
+    for case, before, after, ratio, status in rows:
+        print(f"{case:<{width}}  {before:>10.3f}  {after:>10.3f}  {ratio:>6.2f}x  {status}")
+    for case in sorted(set(old["results"]) ^ set(new["results"])):
+        print(f"{case:<{width}}  only in {'baseline' if case in old['results'] else 'results'}")
+
+    regressions = [row for row in rows if row[4] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark parse_dart_data against the previous regex implementation.
+
+    python -m bench.parse_dart_data --legs 200 --players 4 --repeat 5
+"""
+import argparse
+import json
+import random
+import re
+import time
+from datetime import datetime
+
+from app import parse_dart_data, calculate_throw_score
+
+
+def legacy_parse_dart_data(extracted_data):
+    """The regex-based parser this benchmark is measured against"""
+    entries = []
+    data_str = json.dumps(extracted_data) if isinstance(extracted_data, (dict, list)) else str(extracted_data)
+    player_matches = re.findall(r'([A-Z][A-Z0-9]+|\w+\d+)', data_str)
+    throw_matches = re.findall(r'(T\d+|D\d+|S\d+|\b\d{1,3}\b)', data_str)
+    re.findall(r'(?:round|runde|leg)\s*(\d+)', data_str.lower())
+    for i, player in enumerate(player_matches[:5]):
+        entry = {'player': player, 'round': str(i + 1),
+                 'game_id': f"imported_{int(datetime.now().timestamp())}_{i}"}
+        start_idx = i * 3
+        if len(throw_matches) > start_idx:
+            entry['throw1'] = throw_matches[start_idx] if start_idx < len(throw_matches) else ''
+            entry['throw2'] = throw_matches[start_idx + 1] if start_idx + 1 < len(throw_matches) else ''
+            entry['throw3'] = throw_matches[start_idx + 2] if start_idx + 2 < len(throw_matches) else ''
+            score = calculate_throw_score(entry.get('throw1', ''), entry.get('throw2', ''), entry.get('throw3', ''))
+            entry['score'] = str(score)
+            entry['rest'] = str(501 - score)
+        entries.append(entry)
+    return entries
+
+
+def random_dart(rng):
+    roll = rng.random()
+    if roll < 0.05:
+        return rng.choice(['BULL', '25', 'MISS'])
+    prefix = rng.choices(['T', 'D', 'S'], weights=[2, 1, 7])[0]
+    return f"{prefix}{rng.randint(1, 20)}"
+
+
+def make_export(legs, players, seed=1):
+    """A ParseExtract-like export with several legs of visit-by-visit darts"""
+    rng = random.Random(seed)
+    names = [f"PLAYER{i + 1}" for i in range(players)]
+    return {
+        "match": "Dartsmind export",
+        "legs": [
+            {
+                "leg": f"Leg {leg + 1}",
+                "visits": [
+                    {"player": name, "round": f"Round {r + 1}",
+                     "throws": [random_dart(rng) for _ in range(3)],
+                     "score": rng.randint(0, 180)}
+                    for r in range(rng.randint(6, 12)) for name in names
+                ]
+            }
+            for leg in range(legs)
+        ]
+    }
+
+
+def bench(func, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(data)
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--legs', type=int, default=200)
+    parser.add_argument('--players', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    data = make_export(args.legs, args.players)
+    size = len(json.dumps(data))
+    results = {}
+    for name, func in (('legacy', legacy_parse_dart_data), ('current', parse_dart_data)):
+        seconds, entries = bench(func, data, args.repeat)
+        results[name] = {"seconds": round(seconds, 6), "entries": entries}
+
+    print(json.dumps({"legs": args.legs, "players": args.players, "bytes": size, "results": results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
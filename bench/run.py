@@ -0,0 +1,217 @@
+"""Benchmark suite: hot helpers on synthetic data and Flask routes against local stubs.
+
+    python -m bench.run --rows 1000,10000,100000 --repeat 5 --out results.json
+    python -m bench.compare baseline.json results.json
+
+Route benchmarks start the stubs from bench.stubs and point the app at
+them before it is imported, so no real SheetDB, ParseExtract, OpenAI or
+Notion account is used.
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from bench.stubs import start_stubs, stub_environment
+from bench.synthetic import generate_rows, rows_to_export
+
+SIMULATION_LEGS = 20000
+CHECKOUT_LOOKUPS = 10000
+
+
+def measure(func, repeat, setup=None):
+    """min/median/p95/mean of `repeat` timed calls in milliseconds; setup runs untimed before each"""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(timings), 3)
+    }
+
+
+def busiest_player(rows):
+    counts = {}
+    for row in rows:
+        counts[row['player']] = counts.get(row['player'], 0) + 1
+    return max(counts, key=counts.get)
+
+
+def micro_cases(app, rows):
+    """(name, func) pairs over one synthetic data set"""
+    from aggregates import AggregateStore
+    from checkouts import checkout_table
+    from features import build_digest, recent_legs
+    from simulator import PlayerModel, simulate_legs
+    from stats_engine import compute_advanced_stats
+
+    export = rows_to_export(rows)
+    player = busiest_player(rows)
+    player_rows = [row for row in rows if row['player'] == player]
+    recent = player_rows[::-1][:app.TRAINING_LEGS * app.TRAINING_ROWS_PER_LEG]
+    model = PlayerModel.from_rows(player_rows)
+    scores = random.Random(1).choices(range(2, 171), k=CHECKOUT_LOOKUPS)
+    table = checkout_table(app.PREFERRED_DOUBLES)
+
+    def checkout_lookups():
+        for score in scores:
+            table.suggest(score, 3)
+
+    return [
+        ("parse_dart_data", lambda: app.parse_dart_data(export)),
+        ("transform_to_sheet_format", lambda: app.transform_to_sheet_format(export)),
+        ("calculate_player_stats", lambda: app.calculate_player_stats(rows, player)),
+        ("compute_advanced_stats", lambda: compute_advanced_stats(player_rows)),
+        ("build_digest", lambda: build_digest(recent_legs(recent, app.TRAINING_LEGS),
+                                              token_budget=app.TRAINING_TOKEN_BUDGET)),
+        ("aggregate_rebuild", lambda: AggregateStore().rebuild(rows)),
+        (f"checkout_suggest[x{CHECKOUT_LOOKUPS}]", checkout_lookups),
+        (f"simulate_legs[legs={SIMULATION_LEGS}]", lambda: simulate_legs(model, SIMULATION_LEGS, seed=1)),
+    ]
+
+
+def route_cases(app, client, player, opponent, export):
+    """(name, func, cold setup) triples; cold runs start from empty caches"""
+    upload_counter = itertools.count()
+
+    def cold():
+        app.sheet_cache.invalidate()
+        app.training_plan_cache.invalidate()
+        app.aggregate_store.clear()
+
+    def call(method, url, **kwargs):
+        def run():
+            response = getattr(client, method)(url, **kwargs)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method.upper()} {url}: {response.status_code} {response.get_data(as_text=True)[:200]}")
+            return response
+        return run
+
+    def upload():
+        # Unique content so the extraction cache never answers
+        content = f"bench upload {next(upload_counter)} {time.time()}".encode()
+        response = call('post', '/api/upload-statistics', data={"file": (io.BytesIO(content), "sheet.png")},
+                        content_type='multipart/form-data')()
+        job = app.job_queue.get(response.get_json()["job_id"])
+        while job is not None and not job.finished:
+            time.sleep(0.001)
+
+    simulate = {"player": player, "opponent": opponent, "legs": SIMULATION_LEGS}
+    return [
+        ("GET /api/get-players", call('get', '/api/get-players'), cold),
+        ("GET /api/player-stats/<player>", call('get', f'/api/player-stats/{player}'), cold),
+        ("GET /api/player-stats/<player>/advanced", call('get', f'/api/player-stats/{player}/advanced'), cold),
+        ("POST /api/player-stats/batch", call('post', '/api/player-stats/batch', json={"players": [player, opponent]}), cold),
+        ("POST /api/simulate", call('post', '/api/simulate', json=simulate), cold),
+        ("POST /api/generate-training-plan", call('post', '/api/generate-training-plan', json={"player_name": player}), cold),
+        ("GET /api/checkout/<score>", call('get', '/api/checkout/121'), None),
+        ("POST /api/upload-statistics (job)", upload, None),
+        ("POST /api/save-to-notion", call('post', '/api/save-to-notion', json={"player_name": player, "training_plan": {
+            "analysis": "Benchmark", "exercises": [{"name": "Doppel", "duration": "10 min"}] * 30}}), None),
+        # Appends to the stub sheet, so it runs last
+        ("POST /api/save-to-sheets", call('post', '/api/save-to-sheets', json=export), None),
+    ]
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='1000,10000,100000', help="comma-separated synthetic row counts")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--players', type=int, default=8)
+    parser.add_argument('--route-rows', type=int, default=10000, help="rows served by the SheetDB stub")
+    parser.add_argument('--latency-ms', type=float, default=20, help="base stub latency (ParseExtract x4, OpenAI x10)")
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--no-routes', action='store_true')
+    parser.add_argument('--out', default='-')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.rows.split(',') if size]
+
+    servers = None
+    route_rows = generate_rows(args.route_rows, args.players)
+    if not args.no_routes:
+        servers = start_stubs(args.latency_ms / 1000, args.jitter_ms / 1000, route_rows,
+                              rows_to_export(route_rows[:500]))
+        os.environ.update(stub_environment(servers))
+        workdir = tempfile.mkdtemp(prefix='dartcoach-bench-')
+        os.environ.update({
+            "EXTRACTION_CACHE_DIR": os.path.join(workdir, "extraction-cache"),
+            "TRAINING_BATCH_DIR": os.path.join(workdir, "training-batches"),
+            # Measure the routes, not the configured upstream rate limits
+            "OPENAI_REQUESTS_PER_SECOND": "1000", "OPENAI_BURST": "1000",
+            "NOTION_REQUESTS_PER_SECOND": "1000",
+        })
+
+    import app
+
+    results = {}
+    for size in sizes:
+        rows = generate_rows(size, args.players)
+        for name, func in micro_cases(app, rows):
+            results[f"{name}[rows={size}]"] = measure(func, args.repeat)
+            print(f"{name}[rows={size}]: {results[f'{name}[rows={size}]']['median_ms']} ms", file=sys.stderr)
+
+    if servers:
+        client = app.app.test_client()
+        counts = {}
+        for row in route_rows:
+            counts[row['player']] = counts.get(row['player'], 0) + 1
+        player, opponent = sorted(counts, key=counts.get, reverse=True)[:2]
+        for name, func, setup in route_cases(app, client, player, opponent, rows_to_export(route_rows[:200])):
+            variants = [("cold", setup), ("warm", None)] if setup else [("", None)]
+            for label, variant_setup in variants:
+                key = f"route:{name}" + (f" {label}" if label else "")
+                func()  # warm-up, also primes the caches for warm runs
+                results[key] = measure(func, args.repeat, variant_setup)
+                print(f"{key}: {results[key]['median_ms']} ms", file=sys.stderr)
+        for server in servers.values():
+            server.stop()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "rows": sizes,
+            "route_rows": None if args.no_routes else args.route_rows,
+            "players": args.players,
+            "repeat": args.repeat,
+            "latency_ms": args.latency_ms
+        },
+        "results": results
+    }
+    if args.out == '-':
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""Local stand-ins for SheetDB, ParseExtract, OpenAI and Notion with configurable latency.
+
+    python -m bench.stubs --latency-ms 80 --rows 10000
+
+Prints the environment variables that point the app at the stubs and
+serves until interrupted.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PLAN = {
+    "analysis": "Solides Scoring, Schwächen beim Checkout auf den unteren Doppeln.",
+    "strengths": ["Konstantes Scoring auf T20"],
+    "weaknesses": ["Doppelquote unter 30 %"],
+    "exercises": [
+        {"name": "Round the Clock Doppel", "duration": "15 min", "focus": "Doppel"},
+        {"name": "121 Checkout", "duration": "10 min", "focus": "Finish"}
+    ],
+    "motivation": "Dranbleiben!"
+}
+
+
+class StubServer(ThreadingHTTPServer):
+    """Threaded HTTP server with a latency model shared by its handler"""
+
+    daemon_threads = True
+
+    def __init__(self, handler, latency=0.0, jitter=0.0):
+        super().__init__(('127.0.0.1', 0), handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _delay(self):
+        self.server.requests += 1
+        delay = self.server.latency + random.uniform(0, self.server.jitter)
+        if delay:
+            time.sleep(delay)
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _json(self, data, status=200, headers=None):
+        payload = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class SheetDBHandler(StubHandler):
+    """GET with player/select/limit/offset filters and POST {"data": [...]} on one in-memory sheet"""
+
+    def do_GET(self):
+        self._delay()
+        query = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        rows = self.server.rows
+        if 'player' in query:
+            rows = [row for row in rows if row.get('player') == query['player']]
+        if query.get('order', '').endswith('.desc'):
+            rows = rows[::-1]
+        offset = int(query.get('offset', 0))
+        if 'limit' in query:
+            rows = rows[offset:offset + int(query['limit'])]
+        elif offset:
+            rows = rows[offset:]
+        if 'select' in query:
+            keys = query['select'].split(',')
+            rows = [{k: row.get(k) for k in keys} for row in rows]
+        self._json(rows)
+
+    def do_POST(self):
+        self._delay()
+        rows = json.loads(self._body() or b'{}').get('data', [])
+        with self.server.lock:
+            self.server.rows.extend(rows)
+        self._json({"created": len(rows)}, status=201)
+
+
+class ParseExtractHandler(StubHandler):
+    """Any POST returns the configured export"""
+
+    def do_POST(self):
+        self._body()
+        self._delay()
+        self._json(self.server.export)
+
+
+class OpenAIHandler(StubHandler):
+    """Chat completions returning a fixed training plan, optionally streamed"""
+
+    def do_POST(self):
+        request = json.loads(self._body() or b'{}')
+        self._delay()
+        content = json.dumps(PLAN)
+        base = {"id": f"chatcmpl-{uuid.uuid4().hex}", "created": int(time.time()), "model": request.get("model", "stub")}
+        if not request.get("stream"):
+            self._json(dict(base, object="chat.completion", choices=[
+                {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+            ], usage={"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}))
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        for start in range(0, len(content), 40):
+            chunk = dict(base, object="chat.completion.chunk", choices=[
+                {"index": 0, "delta": {"content": content[start:start + 40]}, "finish_reason": None}
+            ])
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+
+class NotionHandler(StubHandler):
+    """Page creation and block appends; answers 429 above rate_limit requests per second"""
+
+    def _limited(self):
+        if not self.server.rate_limit:
+            return False
+        now = time.monotonic()
+        with self.server.lock:
+            window = [t for t in self.server.window if now - t < 1.0]
+            limited = len(window) >= self.server.rate_limit
+            if not limited:
+                window.append(now)
+            self.server.window = window
+        if limited:
+            self._json({"object": "error", "status": 429, "code": "rate_limited"}, status=429,
+                       headers={"Retry-After": "1"})
+        return limited
+
+    def do_POST(self):
+        self._body()
+        self._delay()
+        if not self._limited():
+            page_id = uuid.uuid4().hex
+            self._json({"object": "page", "id": page_id, "url": f"https://www.notion.so/{page_id}"})
+
+    def do_PATCH(self):
+        self._body()
+        self._delay()
+        if not self._limited():
+            self._json({"object": "list", "results": []})
+
+
+def start_stubs(latency=0.05, jitter=0.01, rows=None, export=None, notion_rate_limit=0):
+    """Start all four stubs; returns {name: server}"""
+    servers = {
+        "sheetdb": StubServer(SheetDBHandler, latency, jitter),
+        "parseextract": StubServer(ParseExtractHandler, latency * 4, jitter),
+        "openai": StubServer(OpenAIHandler, latency * 10, jitter),
+        "notion": StubServer(NotionHandler, latency, jitter),
+    }
+    servers["sheetdb"].rows = list(rows or [])
+    servers["sheetdb"].lock = threading.Lock()
+    servers["parseextract"].export = export or {"legs": []}
+    servers["notion"].rate_limit = notion_rate_limit
+    servers["notion"].window = []
+    servers["notion"].lock = threading.Lock()
+    for server in servers.values():
+        server.start()
+    return servers
+
+
+def stub_environment(servers):
+    """Environment variables that point the app at running stubs"""
+    return {
+        "STORAGE_BACKEND": "sheetdb",
+        "SHEETSDB_URL": servers["sheetdb"].url + "/",
+        "PARSEEXTRACT_API_URL": servers["parseextract"].url + "/v1/data-extract",
+        "OPENAI_API_KEY": "stub",
+        "OPENAI_BASE_URL": servers["openai"].url + "/v1",
+        "NOTION_API_KEY": "stub",
+        "NOTION_DATABASE_ID": "stub",
+        "NOTION_API_URL": servers["notion"].url + "/v1",
+    }
+
+
+def main():
+    from bench.synthetic import generate_rows, rows_to_export
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency-ms', type=float, default=50)
+    parser.add_argument('--jitter-ms', type=float, default=10)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--notion-rate-limit', type=int, default=3)
+    args = parser.parse_args()
+
+    rows = generate_rows(args.rows)
+    servers = start_stubs(args.latency_ms / 1000, args.jitter_ms / 1000, rows,
+                          rows_to_export(rows[:500]), args.notion_rate_limit)
+    for key, value in stub_environment(servers).items():
+        print(f"export {key}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for server in servers.values():
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
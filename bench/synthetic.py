@@ -0,0 +1,128 @@
+"""Synthetic dart data: realistic 501 legs as sheet rows or ParseExtract-like exports.
+
+    python -m bench.synthetic --rows 100000 --players 12 --out rows.json
+"""
+import argparse
+import json
+import random
+from datetime import date, timedelta
+
+from checkouts import checkout_table
+from dart_notation import START_SCORE, MISS, make_throw, score_visit
+
+# Segments clockwise from the top, used to pick the neighbour of a missed single
+BOARD = [20, 1, 18, 4, 13, 6, 10, 15, 2, 17, 3, 19, 7, 16, 8, 11, 14, 9, 12, 5]
+NEIGHBOURS = {seg: (BOARD[i - 1], BOARD[(i + 1) % len(BOARD)]) for i, seg in enumerate(BOARD)}
+
+
+class Profile:
+    """Hit rates of one synthetic player; skill 0..1 scales all of them"""
+
+    def __init__(self, name, skill):
+        self.name = name
+        self.treble_rate = 0.08 + 0.35 * skill
+        self.double_rate = 0.10 + 0.35 * skill
+        self.single_rate = 0.75 + 0.2 * skill
+
+
+def throw_dart(rng, profile, remaining, darts_left, table):
+    """Aim along the checkout table (or at T20) and return the Throw that landed"""
+    route = table.suggest(remaining, darts_left) or table.suggest(remaining)
+    target = route[0] if route else 'T20'
+    multiplier = {'S': 1, 'D': 2, 'T': 3}[target[0]]
+    segment = int(target[1:])
+    roll = rng.random()
+
+    if segment == 25:
+        if roll < profile.double_rate * (0.5 if multiplier == 2 else 1):
+            return make_throw(multiplier, 25)
+        return make_throw(1, 25) if roll < 0.6 else make_throw(1, rng.choice(BOARD))
+    rate = {1: profile.single_rate, 2: profile.double_rate, 3: profile.treble_rate}[multiplier]
+    if roll < rate:
+        return make_throw(multiplier, segment)
+    if multiplier == 2 and roll > (1 + rate) / 2:
+        return MISS
+    if rng.random() < 0.7:
+        return make_throw(1, segment)
+    return make_throw(1, rng.choice(NEIGHBOURS[segment]))
+
+
+def play_leg(rng, profiles, game_id, day, table):
+    """Rows of one leg, players throwing in turn until someone checks out"""
+    remaining = {p.name: START_SCORE for p in profiles}
+    rows = []
+    for round_no in range(1, 100):
+        for profile in profiles:
+            start = remaining[profile.name]
+            throws = []
+            rest = start
+            for left in (3, 2, 1):
+                throw = throw_dart(rng, profile, rest, left, table)
+                throws.append(throw)
+                rest -= throw.points
+                if rest <= 1:
+                    break
+            score, rest, bust = score_visit(start, throws)
+            remaining[profile.name] = rest
+            notations = [t.notation for t in throws] + ['', '']
+            rows.append({
+                'game_id': game_id, 'mode': '501', 'legType': 'standard',
+                'date': day, 'duration': '', 'player': profile.name, 'round': str(round_no),
+                'throw1': notations[0], 'throw2': notations[1], 'throw3': notations[2],
+                'score': str(score), 'rest': str(rest), 'bust': 'true' if bust else 'false'
+            })
+            if rest == 0:
+                return rows
+    return rows
+
+
+def generate_rows(count, players=8, seed=1, start_day=date(2024, 1, 1)):
+    """At least `count` sheet rows of two-player legs between `players` players of mixed skill"""
+    rng = random.Random(seed)
+    profiles = [Profile(f"Player{i + 1}", rng.random()) for i in range(players)]
+    table = checkout_table()
+    rows = []
+    leg = 0
+    while len(rows) < count:
+        pair = rng.sample(profiles, 2) if players > 1 else profiles
+        day = (start_day + timedelta(days=leg // 20)).isoformat()
+        rows.extend(play_leg(rng, pair, f"bench_{seed}_{leg}", day, table))
+        leg += 1
+    return rows[:count]
+
+
+def rows_to_export(rows):
+    """ParseExtract-like export of rows, grouped into legs of visits"""
+    legs = {}
+    for row in rows:
+        legs.setdefault(row['game_id'], []).append({
+            "player": row['player'],
+            "round": f"Round {row['round']}",
+            "throws": [row[key] for key in ('throw1', 'throw2', 'throw3') if row[key]]
+        })
+    return {
+        "match": "Benchmark export",
+        "legs": [{"leg": f"Leg {i + 1}", "visits": visits} for i, visits in enumerate(legs.values())]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--players', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--export', action='store_true', help="write a ParseExtract-like export instead of rows")
+    parser.add_argument('--out', default='-')
+    args = parser.parse_args()
+
+    rows = generate_rows(args.rows, args.players, args.seed)
+    data = rows_to_export(rows) if args.export else rows
+    if args.out == '-':
+        print(json.dumps(data))
+    else:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+
+if __name__ == '__main__':
+    main()
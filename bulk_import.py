@@ -0,0 +1,190 @@
+import io
+import mimetypes
+import os
+import queue
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class UploadLimitExceeded(Exception):
+    """A bulk upload with too many files or too much content; the message is shown to the user"""
+
+
+def iter_upload_files(files, allowed, max_bytes=None, max_files=None, max_total_bytes=None):
+    """Yield (filename, content, mimetype, error) for uploads, expanding ZIP archives.
+
+    Files (or archive members) larger than max_bytes are reported as errors.
+    Archive members are read one at a time, and UploadLimitExceeded is raised
+    before reading the entry that goes past max_files or max_total_bytes.
+    """
+    too_large = f"Datei zu groß (maximal {max_bytes // (1024 * 1024)} MB)" if max_bytes else None
+    count = 0
+    total = 0
+
+    def admit(size=0):
+        nonlocal count, total
+        count += 1
+        total += size
+        if max_files and count > max_files:
+            raise UploadLimitExceeded(f"Maximal {max_files} Dateien pro Import")
+        if max_total_bytes and total > max_total_bytes:
+            raise UploadLimitExceeded(f"Import zu groß (maximal {max_total_bytes // (1024 * 1024)} MB entpackt)")
+
+    for file in files:
+        filename = file.filename or ''
+        content = file.read()
+        if filename.lower().endswith('.zip'):
+            try:
+                archive = zipfile.ZipFile(io.BytesIO(content))
+            except zipfile.BadZipFile:
+                admit()
+                yield filename, None, None, "Ungültiges ZIP-Archiv"
+                continue
+            for info in archive.infolist():
+                name = os.path.basename(info.filename)
+                if info.is_dir() or not name or name.startswith('.'):
+                    continue
+                if not allowed(name):
+                    admit()
+                    yield name, None, None, "Dateityp nicht erlaubt"
+                    continue
+                if max_bytes and info.file_size > max_bytes:
+                    admit()
+                    yield name, None, None, too_large
+                    continue
+                # file_size is what the member inflates to; reads stop there
+                admit(info.file_size)
+                mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                yield name, archive.read(info), mimetype, None
+        elif not allowed(filename):
+            admit()
+            yield filename, None, None, "Dateityp nicht erlaubt"
+        elif max_bytes and len(content) > max_bytes:
+            admit()
+            yield filename, None, None, too_large
+        else:
+            admit(len(content))
+            yield filename, content, file.mimetype, None
+
+
+class BatchWriter:
+    """Writes rows in size-capped batches from a background thread.
+
+    add() blocks once max_pending batches are waiting, which throttles the
+    producers to the speed of the sink instead of buffering without bound.
+    Once a batch carrying a source's rows fails, that source's later rows
+    are skipped, so the rows written per source are always a prefix.
+    """
+
+    _DONE = object()
+
+    def __init__(self, write, batch_size=100, max_pending=4):
+        self.write = write
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._rows = []  # (source, row)
+        self.written = 0
+        self.written_by_source = {}
+        self.failed_sources = {}
+        self._thread = threading.Thread(target=self._drain, name="batch-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, rows, source):
+        for row in rows:
+            self._rows.append((source, row))
+            if len(self._rows) >= self.batch_size:
+                self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._queue.put(self._rows)
+            self._rows = []
+
+    def close(self):
+        """Flush the last partial batch and wait for all writes to finish"""
+        self._flush()
+        self._queue.put(self._DONE)
+        self._thread.join()
+
+    def _drain(self):
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                return
+            batch = [(source, row) for source, row in item if source not in self.failed_sources]
+            if not batch:
+                continue
+            try:
+                self.write([row for _, row in batch])
+            except Exception as e:
+                for source, _ in batch:
+                    self.failed_sources[source] = str(e)
+                continue
+            self.written += len(batch)
+            for source, _ in batch:
+                self.written_by_source[source] = self.written_by_source.get(source, 0) + 1
+
+
+def run_bulk_import(job, files, extract, transform, write, new_import_id, resume=None, workers=4, batch_size=100,
+                    max_pending=4):
+    """Extract files concurrently and stream their rows to the sink in batches.
+
+    Every file's game ids derive from its own import id (transform(data,
+    import_id)). Returns a summary with one result per file, carrying that
+    import_id and the rows written so far; a file only counts as imported
+    when all of its rows were written. resume is a list aligned with files
+    of {"import_id", "start"} (or None) from an earlier run: the file is
+    transformed with the same import id and its first start rows are
+    skipped, so a retry writes each row exactly once.
+    """
+    results = {}
+    starts = {}  # source -> rows already written by an earlier run
+    writer = BatchWriter(write, batch_size=batch_size, max_pending=max_pending)
+    total = len(files)
+    done = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for index, (filename, content, mimetype, error) in enumerate(files):
+            source = f"{index}:{filename}"
+            if error is not None:
+                results[source] = {"file": filename, "status": "failed", "error": error}
+                done += 1
+                continue
+            previous = resume[index] if resume else None
+            if previous:
+                import_id, start = previous["import_id"], previous["start"]
+            else:
+                import_id, start = new_import_id(), 0
+            futures[pool.submit(extract, content, filename, mimetype)] = (source, filename, import_id, start)
+
+        for future in as_completed(futures):
+            source, filename, import_id, start = futures[future]
+            try:
+                data, cached, preprocessing = future.result()
+                rows = transform(data, import_id)["data"]
+                writer.add(rows[start:], source)
+                starts[source] = min(start, len(rows))
+                results[source] = {"file": filename, "status": "imported", "rows": len(rows), "cached": cached,
+                                   "preprocessing": preprocessing, "import_id": import_id}
+            except Exception as e:
+                results[source] = {"file": filename, "status": "failed", "error": str(e)}
+            done += 1
+            job.update(progress=int(done / total * 90), message=f"{done} von {total} Dateien verarbeitet")
+
+    job.update(message="Restliche Zeilen werden gespeichert")
+    writer.close()
+
+    for source, start in starts.items():
+        results[source]["rows_written"] = start + writer.written_by_source.get(source, 0)
+    for source, error in writer.failed_sources.items():
+        results[source].update(status="failed", error=f"Speichern fehlgeschlagen: {error}")
+
+    files_summary = [results[source] for source in sorted(results, key=lambda s: int(s.split(':', 1)[0]))]
+    return {
+        "files": files_summary,
+        "imported": sum(1 for f in files_summary if f["status"] == "imported"),
+        "failed": sum(1 for f in files_summary if f["status"] == "failed"),
+        "rows_written": writer.written
+    }
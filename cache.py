@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Pending:
+    """A fetch in progress that concurrent callers for the same key wait on"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """Thread-safe in-process cache with per-key TTLs, LRU eviction and
+    stampede protection: concurrent misses for one key share a single load."""
+
+    def __init__(self, maxsize=256, default_ttl=60):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return default
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def _store(self, key, value, ttl):
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_load(self, key, loader, ttl=None):
+        """Return the cached value for key, calling loader() once on a miss.
+
+        Callers that miss while another thread is already loading the same
+        key block until that load finishes and share its result (or error).
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[key] = _Pending()
+
+        if not owner:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            value = loader()
+        except Exception as e:
+            pending.error = e
+            raise
+        else:
+            pending.value = value
+            with self._lock:
+                # Skip storing if the key was invalidated while loading
+                if self._pending.get(key) is pending:
+                    self._store(key, value, self.default_ttl if ttl is None else ttl)
+            return value
+        finally:
+            with self._lock:
+                if self._pending.get(key) is pending:
+                    del self._pending[key]
+            pending.event.set()
+
+    def get_or_load_many(self, keys, loader, ttl=None):
+        """Return {key: value} for keys, loading all misses with one loader(missing_keys) call.
+
+        loader returns a dict with a value for every key it was given.
+        Unlike get_or_load, concurrent misses are not shared; loaded values
+        are not stored if the cache was invalidated meanwhile.
+        """
+        values = {}
+        keys = list(dict.fromkeys(keys))
+        with self._lock:
+            now = time.monotonic()
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is not None and entry[0] > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    values[key] = entry[1]
+                else:
+                    self.misses += 1
+            invalidations = self.invalidations
+        missing = [key for key in keys if key not in values]
+        if missing:
+            loaded = loader(missing)
+            with self._lock:
+                if self.invalidations == invalidations:
+                    for key in missing:
+                        self._store(key, loaded[key], self.default_ttl if ttl is None else ttl)
+            values.update(loaded)
+        return values
+
+    def invalidate(self, prefix=None):
+        """Drop all entries, or only those whose key starts with prefix"""
+        with self._lock:
+            if prefix is None:
+                keys = list(self._data)
+                self._pending.clear()
+            else:
+                keys = [k for k in self._data if str(k).startswith(prefix)]
+                for k in [k for k in self._pending if str(k).startswith(prefix)]:
+                    del self._pending[k]
+            for k in keys:
+                del self._data[k]
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "default_ttl": self.default_ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "in_flight": len(self._pending),
+            }
@@ -0,0 +1,110 @@
+from functools import lru_cache
+
+from dart_notation import make_throw
+
+MIN_CHECKOUT = 2
+MAX_CHECKOUT = 170
+MAX_DARTS = 3
+
+# Finishing doubles in the order they are preferred when no player
+# preference is given; doubles not listed rank after these by segment
+DEFAULT_DOUBLES = ('D20', 'D16', 'D8', 'D10', 'D18', 'D12', 'D4', 'D6', 'D14', 'D2', 'D25')
+
+DOUBLES = [make_throw(2, segment) for segment in list(range(1, 21)) + [25]]
+SETUP_DARTS = [make_throw(multiplier, segment)
+               for multiplier in (3, 1, 2)
+               for segment in list(range(20, 0, -1)) + [25]
+               if make_throw(multiplier, segment) is not None]
+
+
+def _setup_difficulty(throw):
+    """0 for a plain single, 1 for a treble, double or outer bull, 2 for the bullseye"""
+    if throw.segment == 25:
+        return throw.multiplier
+    return 0 if throw.multiplier == 1 else 1
+
+
+def _double_ranks(preferred):
+    order = list(dict.fromkeys(tuple(preferred) + DEFAULT_DOUBLES))
+    order += [d.notation for d in sorted(DOUBLES, key=lambda d: -d.segment) if d.notation not in order]
+    return {notation: rank for rank, notation in enumerate(order)}
+
+
+class CheckoutTable:
+    """Best double-out route for every score from 2 to 170, per number of darts.
+
+    Routes are built bottom-up: the best k-dart route for a score is the
+    best setup dart followed by the best (k-1)-dart route for what is left.
+    Routes compare by how hard their setup darts are, then by finishing
+    double (preferred first), then by the larger first dart.
+    """
+
+    def __init__(self, preferred_doubles=()):
+        self.preferred_doubles = tuple(preferred_doubles)
+        ranks = _double_ranks(self.preferred_doubles)
+        # best[k][score] = (cost, route) with route a tuple of Throws
+        best = [None] + [[None] * (MAX_CHECKOUT + 1) for _ in range(MAX_DARTS)]
+
+        for double in DOUBLES:
+            # Finishing on the bullseye counts like one hard setup dart
+            best[1][double.points] = ((int(double.segment == 25), ranks[double.notation]), (double,))
+
+        for darts in range(2, MAX_DARTS + 1):
+            for score in range(MIN_CHECKOUT, MAX_CHECKOUT + 1):
+                candidate = None
+                for setup in SETUP_DARTS:
+                    rest = score - setup.points
+                    if rest < MIN_CHECKOUT or best[darts - 1][rest] is None:
+                        continue
+                    (hard, rank), route = best[darts - 1][rest]
+                    cost = (hard + _setup_difficulty(setup), rank)
+                    if candidate is None or (cost, -setup.points) < (candidate[0], -candidate[1][0].points):
+                        candidate = (cost, (setup,) + route)
+                best[darts][score] = candidate
+
+        self._routes = [
+            [None if best[darts][score] is None else [t.notation for t in best[darts][score][1]]
+             for darts in range(1, MAX_DARTS + 1)]
+            for score in range(MAX_CHECKOUT + 1)
+        ]
+
+    def routes(self, score):
+        """{darts: route} for every dart count that can finish score"""
+        if not MIN_CHECKOUT <= score <= MAX_CHECKOUT:
+            return {}
+        return {darts: route for darts, route in enumerate(self._routes[score], 1) if route is not None}
+
+    def suggest(self, score, darts_left=MAX_DARTS):
+        """Route with the fewest darts that fits in darts_left, or None"""
+        if not MIN_CHECKOUT <= score <= MAX_CHECKOUT:
+            return None
+        for route in self._routes[score][:darts_left]:
+            if route is not None:
+                return route
+        return None
+
+    def min_darts(self, score):
+        """Fewest darts that can finish score, or None if it is no checkout"""
+        route = self.suggest(score)
+        return len(route) if route else None
+
+    def to_dict(self):
+        return {score: self.routes(score) for score in range(MIN_CHECKOUT, MAX_CHECKOUT + 1)}
+
+
+@lru_cache(maxsize=32)
+def checkout_table(preferred_doubles=()):
+    """Shared table per preference tuple, built on first use"""
+    return CheckoutTable(preferred_doubles)
+
+
+def parse_doubles(text):
+    """Normalize 'D16, d8,bull' into ('D16', 'D8', 'D25'), dropping anything that is not a double"""
+    doubles = []
+    for part in (text or '').split(','):
+        part = part.strip().upper()
+        if part in ('BULL', 'DBULL', 'DB', '50'):
+            part = 'D25'
+        if any(part == d.notation for d in DOUBLES) and part not in doubles:
+            doubles.append(part)
+    return tuple(doubles)
@@ -0,0 +1,276 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+START_SCORE = 501
+
+# One compiled pattern, alternatives tried in priority order: leg and round
+# markers, dart notation, player names, bare numbers.
+TOKEN_RE = re.compile(r"""
+    (?P<leg>(?i:\bleg\s*(?P<leg_no>\d+)))
+  | (?P<round>(?i:\b(?:round|runde)\s*(?P<round_no>\d+)))
+  | (?P<throw>(?i:\b(?:
+        (?P<mult>[TDS])(?P<seg>\d{1,2})
+      | (?P<dbull>DBULL|BULLSEYE|BULL|DB)
+      | (?P<sbull>SBULL|SB|OB)
+      | (?P<miss>MISS|M)
+    )\b))
+  | (?P<player>\b[A-Z][A-Z0-9]+\b|\b[^\W\d]\w*\d+\b)
+  | (?P<number>\b\d{1,3}\b)
+""", re.VERBOSE)
+
+PLAYER_KEYS = {'player', 'name', 'spieler', 'user'}
+THROW_KEY_RE = re.compile(r'throw|dart|wurf', re.I)
+
+MAX_PLAYERS = 5
+
+
+class Throw(namedtuple('Throw', 'notation multiplier segment points')):
+    """A single validated dart, e.g. Throw('T20', 3, 20, 60)"""
+
+    __slots__ = ()
+
+    @property
+    def is_double(self):
+        return self.multiplier == 2
+
+
+MISS = Throw('M', 0, 0, 0)
+
+
+def make_throw(multiplier, segment):
+    """Build a Throw, or None if the segment does not exist on the board"""
+    if segment == 0:
+        return MISS
+    if segment == 25:
+        if multiplier == 3:
+            return None
+    elif not 1 <= segment <= 20:
+        return None
+    prefix = {1: 'S', 2: 'D', 3: 'T'}[multiplier]
+    return Throw(f"{prefix}{segment}", multiplier, segment, multiplier * segment)
+
+
+@lru_cache(maxsize=256)
+def parse_throw(text):
+    """Parse one dart in notation (T20, D16, S5, 20, BULL, 25, 50, MISS, ...)"""
+    text = str(text).strip()
+    if not text:
+        return None
+    if text.isdigit():
+        value = int(text)
+        if value == 50:
+            return make_throw(2, 25)
+        return make_throw(1, value)
+    match = TOKEN_RE.fullmatch(text)
+    if match is None or match.lastgroup != 'throw':
+        return None
+    return _throw_from_match(match)
+
+
+def _throw_from_match(match):
+    if match.group('mult'):
+        multiplier = {'S': 1, 'D': 2, 'T': 3}[match.group('mult').upper()]
+        return make_throw(multiplier, int(match.group('seg')))
+    if match.group('dbull'):
+        return make_throw(2, 25)
+    if match.group('sbull'):
+        return make_throw(1, 25)
+    return MISS
+
+
+def score_visit(remaining, throws):
+    """Apply a visit to a remaining score with double-out and bust rules.
+
+    Returns (score, rest, bust). A visit busts when it would leave the player
+    below zero, on exactly one, or on zero without finishing on a double;
+    a busted visit scores nothing.
+    """
+    rest = remaining
+    for throw in throws:
+        rest -= throw.points
+        if rest < 0 or rest == 1 or (rest == 0 and not throw.is_double):
+            return 0, remaining, True
+        if rest == 0:
+            break
+    return remaining - rest, rest, False
+
+
+# Marks the end of a dict that names a player, i.e. one row of a keyed export
+ROW_END = object()
+
+
+def _walk(node):
+    """Yield (text, key) for every scalar in extracted data, depth first and
+    in document order, without recursion. key is the lower-cased name of the
+    dict entry the scalar sits under, or None outside any dict. A dict with
+    a player key is followed by (ROW_END, None)."""
+    stack = [iter(((node, None),))]
+    while stack:
+        for value, key in stack[-1]:
+            if value is ROW_END:
+                yield value, None
+                continue
+            if isinstance(value, dict):
+                stack.append(_dict_items(value))
+                break
+            if isinstance(value, (list, tuple)):
+                stack.append(((item, key) for item in value))
+                break
+            if value is not None and not isinstance(value, bool):
+                yield str(value), key
+        else:
+            stack.pop()
+
+
+def _dict_items(node):
+    # Keys are column names (throw1, PPR, ...), never players or darts
+    row = False
+    for k, v in node.items():
+        k = str(k).lower()
+        row = row or k in PLAYER_KEYS
+        yield v, k
+    if row:
+        yield ROW_END, None
+
+
+@lru_cache(maxsize=4096)
+def _tokens_for(text, key):
+    """Tokens of one scalar; memoized because exports repeat short strings.
+
+    Inside dicts only values under PLAYER_KEYS name players; names are
+    guessed from free text only where there are no keys at all.
+    """
+    if key in PLAYER_KEYS and not text.isdigit():
+        return (('player', text.strip()),)
+    throw_field = key is not None and THROW_KEY_RE.search(key) is not None
+    tokens = []
+    for match in TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == 'leg':
+            tokens.append(('leg', int(match.group('leg_no'))))
+        elif kind == 'round':
+            tokens.append(('round', int(match.group('round_no'))))
+        elif kind == 'throw':
+            throw = _throw_from_match(match)
+            if throw is not None:
+                tokens.append(('throw', throw))
+        elif kind == 'player' and key is None:
+            tokens.append(('player', match.group('player')))
+        elif kind == 'number' and throw_field:
+            throw = parse_throw(match.group('number'))
+            if throw is not None:
+                tokens.append(('throw', throw))
+    return tuple(tokens)
+
+
+def tokenize(extracted_data):
+    """Walk extracted data once and yield (kind, value) tokens.
+
+    kind is 'leg' or 'round' (int), 'throw' (Throw), 'player' (str) or
+    'row_end' (None, after a dict naming a player). Bare numbers only count
+    as throws inside throw/dart fields, so scores, averages and dates no
+    longer turn into phantom darts.
+    """
+    if isinstance(extracted_data, str):
+        nodes = [(extracted_data, None)]
+    else:
+        nodes = _walk(extracted_data)
+
+    for text, key in nodes:
+        if text is ROW_END:
+            yield 'row_end', None
+        elif len(text) <= 64:
+            yield from _tokens_for(text, key)
+        else:
+            yield from _tokens_for.__wrapped__(text, key)
+
+
+class _PlayerState:
+    __slots__ = ('name', 'remaining', 'round', 'darts')
+
+    def __init__(self, name):
+        self.name = name
+        self.remaining = START_SCORE
+        self.round = 0
+        self.darts = []
+
+
+def parse_visits(extracted_data):
+    """Turn the token stream into scored per-player visits of up to three darts.
+
+    Darts following a player name belong to that player. A visit closes
+    after three darts, when another player is named or at the end of the
+    row naming its player, so checkouts and busts on the first or second
+    dart do not run into the next visit. A round marker closes any open
+    visits and a new leg marker also resets every player to 501. Darts seen before any name are dealt out to the players in order at
+    the end, three each. Returns a list of dicts with player, leg, round,
+    throws, score, rest and bust.
+    """
+    players = {}
+    unassigned = []
+    visits = []
+    current = None
+    leg = 1
+
+    def close_visit(state):
+        state.round += 1
+        score, rest, bust = score_visit(state.remaining, state.darts)
+        state.remaining = rest
+        visits.append({
+            'player': state.name,
+            'leg': leg,
+            'round': state.round,
+            'throws': state.darts,
+            'score': score,
+            'rest': rest,
+            'bust': bust
+        })
+        state.darts = []
+
+    def close_open_visits():
+        for state in players.values():
+            if state.darts:
+                close_visit(state)
+
+    for kind, value in tokenize(extracted_data):
+        if kind == 'throw':
+            if current is None:
+                unassigned.append(value)
+                continue
+            current.darts.append(value)
+            if len(current.darts) == 3:
+                close_visit(current)
+        elif kind == 'player':
+            if current is not None and current.darts and current.name != value:
+                close_visit(current)
+            current = players.get(value)
+            if current is None and len(players) < MAX_PLAYERS:
+                current = players[value] = _PlayerState(value)
+        elif kind == 'row_end':
+            if current is not None and current.darts:
+                close_visit(current)
+        elif kind == 'round':
+            close_open_visits()
+        elif kind == 'leg' and value != leg:
+            close_open_visits()
+            leg = value
+            for state in players.values():
+                state.remaining = START_SCORE
+                state.round = 0
+
+    close_open_visits()
+
+    if unassigned:
+        targets = list(players.values()) or [players.setdefault('Imported_Player', _PlayerState('Imported_Player'))]
+        for i in range(0, len(unassigned), 3):
+            state = targets[(i // 3) % len(targets)]
+            state.darts = unassigned[i:i + 3]
+            close_visit(state)
+
+    # Players named without any darts still get an (empty) entry
+    for state in players.values():
+        if state.round == 0 and not any(v['player'] == state.name for v in visits):
+            visits.append({'player': state.name, 'leg': leg, 'round': 1, 'throws': [],
+                           'score': None, 'rest': None, 'bust': False})
+    return visits
@@ -0,0 +1,135 @@
+import csv
+import io
+import json
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is unavailable without pyarrow
+    pa = None
+
+from storage import SHEET_COLUMNS
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+INT_COLUMNS = ('round', 'score', 'rest')
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def csv_chunks(rows, columns=SHEET_COLUMNS, batch_size=500):
+    """CSV text in chunks of batch_size rows, header first; unknown keys are dropped"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore', lineterminator='\n')
+    writer.writeheader()
+    for batch in _batches(rows, batch_size):
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def ndjson_chunks(rows, batch_size=500):
+    """One JSON object per line, batch_size lines per chunk"""
+    for batch in _batches(rows, batch_size):
+        yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in batch)
+
+
+def _int_or_none(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose written bytes are collected until drained"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def parquet_schema(columns=SHEET_COLUMNS):
+    """Typed schema: round/score/rest as integers, bust as boolean, the rest as strings"""
+    fields = []
+    for column in columns:
+        if column in INT_COLUMNS:
+            fields.append(pa.field(column, pa.int32()))
+        elif column == 'bust':
+            fields.append(pa.field(column, pa.bool_()))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+
+def parquet_chunks(rows, columns=SHEET_COLUMNS, batch_size=10000):
+    """Parquet file bytes, one row group per batch_size rows, emitted as each group is written"""
+    if pa is None:
+        raise RuntimeError("Parquet-Export nicht verfügbar (pyarrow fehlt)")
+    schema = parquet_schema(columns)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for batch in _batches(rows, batch_size):
+            data = {}
+            for column in columns:
+                values = [row.get(column) for row in batch]
+                if column in INT_COLUMNS:
+                    values = [_int_or_none(v) for v in values]
+                elif column == 'bust':
+                    values = [None if v in (None, '') else str(v).strip().lower() == 'true' for v in values]
+                else:
+                    values = [None if v is None else str(v) for v in values]
+                data[column] = values
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_chunks(rows, fmt):
+    """Encoded chunks of rows in one of FORMATS"""
+    if fmt == "csv":
+        return (chunk.encode('utf-8') for chunk in csv_chunks(rows))
+    if fmt == "ndjson":
+        return (chunk.encode('utf-8') for chunk in ndjson_chunks(rows))
+    if fmt == "parquet":
+        return parquet_chunks(rows)
+    raise ValueError(f"Unbekanntes Exportformat: {fmt}")
+
+
+def parquet_available():
+    return pa is not None
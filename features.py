@@ -0,0 +1,102 @@
+import json
+
+import numpy as np
+
+from stats_engine import PlayerColumns, compute_advanced_stats, leg_totals
+
+# Shape of the digest, explained to the model once instead of repeating keys per row
+DIGEST_LEGEND = (
+    "Legende: ppr=Punkte pro Aufnahme, avg3=3-Dart-Average, first9=Punkte pro Aufnahme in den ersten 3 Aufnahmen, "
+    "bust_pct=Bust-Quote in %, visit_dist=Anzahl Aufnahmen je Punktebereich, p=Perzentile der Aufnahmen, "
+    "doubles={Doppel:[Treffer,Würfe aufs Finish-Doppel]}, trend=Veränderung des 3-Dart-Averages pro Leg, "
+    "leg_series=[3-Dart-Average,Darts,beendet 1/0] je Leg (älteste zuerst), rolling=gleitender 3-Dart-Average über 5 Legs."
+)
+
+
+def estimate_tokens(text):
+    """Rough token count for budgeting (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+def recent_legs(rows, max_legs):
+    """Rows of the newest max_legs legs; rows arrive newest first"""
+    kept = set()
+    result = []
+    for row in rows:
+        game_id = row.get('game_id', '')
+        if game_id not in kept:
+            if len(kept) >= max_legs:
+                continue
+            kept.add(game_id)
+        result.append(row)
+    return result
+
+
+def _slope(values):
+    """Least-squares change per step; 0 for fewer than three points"""
+    if len(values) < 3:
+        return 0.0
+    return round(float(np.polyfit(np.arange(len(values)), values, 1)[0]), 2)
+
+
+def _rolling(values, window=5):
+    """Non-overlapping window means, oldest first"""
+    usable = len(values) - len(values) % window
+    if usable == 0:
+        return [round(float(np.mean(values)), 1)] if len(values) else []
+    return [round(float(v), 1) for v in np.asarray(values[-usable:]).reshape(-1, window).mean(axis=1)]
+
+
+def _doubles(checkout_by_double, limit=None):
+    ranked = sorted(checkout_by_double.items(), key=lambda item: -item[1]["attempts"])
+    return {label: [v["hits"], v["attempts"]] for label, v in ranked[:limit]}
+
+
+def build_digest(rows, token_budget=None):
+    """Dense feature summary of a player's legs for an LLM prompt.
+
+    With a token_budget, per-leg detail is dropped step by step (full leg
+    series, then rolling averages, then summary only) until it fits.
+    """
+    stats = compute_advanced_stats(rows)
+    if not stats.get("visits"):
+        return {"legs": 0}
+
+    cols = PlayerColumns(rows)
+    darts, points, finished, averages = leg_totals(cols)
+    # Rows come newest first; series read oldest first
+    order = np.arange(len(averages))[::-1]
+    series = [[round(float(averages[i]), 1), int(darts[i]), int(finished[i])] for i in order]
+    averages_oldest_first = averages[order]
+
+    summary = {
+        "legs": stats["legs"],
+        "finished": stats["finished_legs"],
+        "visits": stats["visits"],
+        "ppr": stats["ppr"],
+        "avg3": round(float(points.sum() * 3 / darts.sum()), 2) if darts.sum() else 0,
+        "first9": stats["first9_average"],
+        "bust_pct": stats["bust_rate"],
+        "darts_per_leg": stats.get("average_darts_per_leg"),
+        "best_leg": stats["best_leg"]["darts"] if stats["best_leg"] else None,
+        "visit_dist": {k: v for k, v in stats["visit_histogram"].items() if v},
+        "p": stats["percentiles"],
+        "trend": _slope(averages_oldest_first),
+    }
+
+    levels = [
+        dict(summary, doubles=_doubles(stats["checkout_by_double"]), leg_series=series),
+        dict(summary, doubles=_doubles(stats["checkout_by_double"], 8), rolling=_rolling(averages_oldest_first)),
+        dict(summary, doubles=_doubles(stats["checkout_by_double"], 4)),
+    ]
+    if token_budget is None:
+        return levels[0]
+    for digest in levels:
+        if estimate_tokens(digest_text(digest)) <= token_budget:
+            return digest
+    return levels[-1]
+
+
+def digest_text(digest):
+    """Compact JSON for embedding in a prompt"""
+    return json.dumps(digest, separators=(',', ':'), ensure_ascii=False)
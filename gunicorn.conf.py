@@ -0,0 +1,21 @@
+import os
+from importlib.util import find_spec
+
+# Serving mode: "async" runs requests as gevent greenlets, so slow SheetDB,
+# ParseExtract, OpenAI and Notion calls only park a greenlet instead of a
+# thread; "sync" keeps the previous thread-per-request gthread worker.
+SERVING_MODE = os.getenv("SERVING_MODE") or ("async" if find_spec("gevent") else "sync")
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+
+# One worker process: background jobs and their status live in memory.
+workers = 1
+if SERVING_MODE == "async":
+    worker_class = "gevent"
+    worker_connections = int(os.getenv("WORKER_CONNECTIONS", "500"))
+else:
+    worker_class = "gthread"
+    threads = int(os.getenv("WORKER_THREADS", "8"))
+
+# Must stay off: gevent patches the standard library before the app is imported
+preload_app = False
@@ -0,0 +1,154 @@
+import gzip
+import hashlib
+import threading
+import time
+import uuid
+from functools import wraps
+
+from flask import Response, make_response, request
+
+try:
+    import brotli
+except ImportError:  # responses are gzip-compressed only without brotli
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/javascript', 'image/svg+xml')
+
+
+class DataVersion:
+    """Counter bumped on every write to stored data, the basis of API ETags.
+
+    A random boot id keeps tags of different processes apart, since each
+    one holds its own caches.
+    """
+
+    def __init__(self):
+        self.boot_id = uuid.uuid4().hex[:8]
+        self._value = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self):
+        return self._value
+
+    def bump(self):
+        with self._lock:
+            self._value += 1
+            return self._value
+
+    def etag(self, key, refresh_seconds=None):
+        """Tag for one resource at the current version; with refresh_seconds it also rolls over on that period"""
+        epoch = int(time.time() // refresh_seconds) if refresh_seconds else 0
+        return hashlib.sha1(f"{self.boot_id}:{self._value}:{epoch}:{key}".encode('utf-8')).hexdigest()[:20]
+
+
+class StaticVersion:
+    """Tag source for responses that depend only on the URL and the code.
+
+    Unlike DataVersion, writes never change these tags; a new process
+    does, since a deploy may change the code.
+    """
+
+    def __init__(self):
+        self.boot_id = uuid.uuid4().hex[:8]
+
+    def etag(self, key, refresh_seconds=None):
+        return hashlib.sha1(f"{self.boot_id}:static:{key}".encode('utf-8')).hexdigest()[:20]
+
+
+def matching_etag(header, etag):
+    """The If-None-Match entry matching etag, or None.
+
+    Tags of compressed representations match too; the entry is returned as
+    sent (e.g. "<etag>+gzip"), which is what a 304 has to carry.
+    """
+    if not header:
+        return None
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return etag
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        # compress_response appends the content coding: "<etag>+gzip"
+        if tag.split('+', 1)[0] == etag:
+            return tag
+    return None
+
+
+def not_modified(etag, cache_control):
+    """304 carrying etag, which should be the matched tag so a coding suffix is kept"""
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def versioned(data_version, refresh_seconds=None, cache_control="private, no-cache"):
+    """Give a GET view a strong ETag derived from the data version (or a StaticVersion) and the URL.
+
+    A request whose If-None-Match carries the current tag is answered with
+    304 before the view runs. Writes outside the app do not bump the
+    version, so refresh_seconds (the storage cache TTL) bounds how long a
+    tag can outlive them.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Read the version first: a write during the view only makes the tag conservative
+            etag = data_version.etag(request.full_path, refresh_seconds)
+            matched = matching_etag(request.headers.get('If-None-Match'), etag)
+            if matched is not None:
+                return not_modified(matched, cache_control)
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = cache_control
+            return response
+        return wrapper
+    return decorator
+
+
+def _compressible(response):
+    mimetype = response.mimetype or ''
+    return mimetype.startswith('text/') and mimetype != 'text/event-stream' or mimetype in COMPRESSIBLE_TYPES
+
+
+def compress_response(response, min_bytes=1024, level=6):
+    """gzip or brotli encode a buffered response as the client's Accept-Encoding allows.
+
+    Streams, file responses, non-200s, small bodies and already encoded
+    responses are left alone. A strong ETag gets the coding appended so
+    each representation keeps a distinct strong tag.
+    """
+    if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+            or 'Content-Encoding' in response.headers or not _compressible(response)):
+        return response
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < min_bytes:
+        return response
+    encoding = request.accept_encodings.best_match(['br', 'gzip'] if brotli is not None else ['gzip'])
+    if encoding is None:
+        return response
+
+    if encoding == 'br':
+        response.set_data(brotli.compress(data, quality=min(level, 11)))
+    else:
+        response.set_data(gzip.compress(data, compresslevel=level, mtime=0))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}+{encoding}", weak)
+    return response
+
+
+def enable_compression(app, min_bytes=1024, level=6):
+    """Compress every eligible Flask response (see compress_response)"""
+
+    @app.after_request
+    def _compress_response(response):
+        return compress_response(response, min_bytes, level)
@@ -0,0 +1,203 @@
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+import requests
+from requests.adapters import HTTPAdapter
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+def _body_size(body):
+    if isinstance(body, (bytes, str)):
+        return len(body)
+    return 0 if body is None else None
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After failure_threshold failures in a row the circuit opens and calls fail
+    fast for reset_timeout seconds. Then a single trial call is let through
+    (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return 'closed'
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return 'half_open'
+            return 'open'
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def abandon(self):
+        """End a call without a verdict (e.g. the caller went away); frees the half-open trial"""
+        with self._lock:
+            self._trial_running = False
+
+    @contextmanager
+    def guard(self):
+        """Run a block as a call through the breaker (for non-HTTP clients)"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} ist vorübergehend nicht erreichbar")
+        try:
+            yield
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            # GeneratorExit when a streaming client disconnects says nothing about the upstream
+            self.abandon()
+            raise
+        self.record_success()
+
+
+class IntegrationClient:
+    """Pooled keep-alive HTTP client for one upstream service.
+
+    Idempotent requests are retried on connection errors and 429/5xx
+    responses with exponential backoff and full jitter. All requests go
+    through the upstream's circuit breaker. With a metrics registry every
+    attempt is timed and counted under the upstream's name.
+    """
+
+    def __init__(self, name, connect_timeout=5, read_timeout=30, retries=2,
+                 backoff=0.5, max_backoff=8, pool_size=10,
+                 failure_threshold=5, reset_timeout=30, metrics=None):
+        self.name = name
+        self.metrics = metrics
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method, url, timeout=None, retry=None, **kwargs):
+        method = method.upper()
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+        attempts = 1 + (self.retries if retry else 0)
+
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"{self.name} ist vorübergehend nicht erreichbar")
+            last_attempt = attempt + 1 >= attempts
+
+            with self._timed(method) as call:
+                try:
+                    response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+                    call.update(
+                        status=response.status_code,
+                        request_bytes=_body_size(response.request.body),
+                        response_bytes=len(response.content)
+                    )
+                except (requests.ConnectionError, requests.Timeout):
+                    self.breaker.record_failure()
+                    if last_attempt:
+                        raise
+                    response = None
+                except Exception:
+                    # e.g. ChunkedEncodingError while reading the body; never retried
+                    self.breaker.record_failure()
+                    raise
+                except BaseException:
+                    self.breaker.abandon()
+                    raise
+            if response is None:
+                self._sleep(attempt)
+                continue
+
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+
+            if response.status_code in RETRY_STATUSES and not last_attempt:
+                self._sleep(attempt, response.headers.get('Retry-After'))
+                continue
+            return response
+
+    def _timed(self, method):
+        if self.metrics is None:
+            return nullcontext({})
+        return self.metrics.upstream(self.name, method)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request('PATCH', url, **kwargs)
+
+    def _sleep(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                time.sleep(min(float(retry_after), self.max_backoff))
+                return
+            except ValueError:
+                pass
+        time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt))))
+
+    def stats(self):
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+        }
+
+
+_openai_client = None
+_openai_lock = threading.Lock()
+
+
+def get_openai_client(api_key, timeout=60, max_retries=2):
+    """Shared OpenAI client so its HTTP connection pool is reused"""
+    global _openai_client
+    with _openai_lock:
+        if _openai_client is None:
+            from openai import OpenAI
+            _openai_client = OpenAI(api_key=api_key, timeout=timeout, max_retries=max_retries)
+        return _openai_client
@@ -0,0 +1,149 @@
+import json
+import queue
+import threading
+import time
+import uuid
+
+
+class QueueFull(Exception):
+    """Raised when the job queue has no room for another job"""
+
+
+class Job:
+    """A unit of background work with observable progress"""
+
+    def __init__(self, kind):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = 'queued'
+        self.progress = 0
+        self.message = ''
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        self.version = 0
+        self._changed = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+
+    def update(self, progress=None, message=None, status=None, result=None, error=None):
+        with self._changed:
+            if progress is not None:
+                self.progress = progress
+            if message is not None:
+                self.message = message
+            if status is not None:
+                self.status = status
+            if result is not None:
+                self.result = result
+            if error is not None:
+                self.error = error
+            self.updated_at = time.time()
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait_for_change(self, version, timeout):
+        """Block until the job moves past version or timeout elapses"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.progress,
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+
+class JobQueue:
+    """Bounded queue drained by a fixed pool of daemon worker threads.
+
+    Jobs live in memory, so status and event endpoints must be served by the
+    same process that accepted the job.
+    """
+
+    def __init__(self, workers=2, max_queue=16, retention=3600):
+        self.workers = workers
+        self.retention = retention
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def submit(self, kind, func, *args, **kwargs):
+        """Queue func(job, *args, **kwargs) and return its Job"""
+        self._start_workers()
+        self._prune()
+        job = Job(kind)
+        try:
+            self._queue.put_nowait((job, func, args, kwargs))
+        except queue.Full:
+            raise QueueFull()
+        with self._lock:
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"queued": self._queue.qsize(), "workers": self.workers, "jobs": counts}
+
+    def _start_workers(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job, func, args, kwargs = self._queue.get()
+            job.update(status='running')
+            try:
+                result = func(job, *args, **kwargs)
+            except Exception as e:
+                job.update(status='failed', error=str(e))
+            else:
+                job.update(status='done', progress=100, result=result)
+            finally:
+                self._queue.task_done()
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.finished and job.updated_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+
+def job_events(job, heartbeat=15):
+    """Server-Sent Events stream of a job's state until it finishes"""
+    version = -1
+    while True:
+        if job.version != version:
+            version = job.version
+            yield f"data: {json.dumps(job.to_dict())}\n\n"
+            if job.finished:
+                return
+        elif job.wait_for_change(version, heartbeat) == version:
+            yield ": keep-alive\n\n"
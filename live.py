@@ -0,0 +1,311 @@
+import json
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from dart_notation import MAX_PLAYERS, START_SCORE, parse_throw, score_visit
+
+START_SCORES = (301, 501, 701)
+
+
+class LiveError(Exception):
+    """A live scoring request that breaks the rules; the message is shown to the scorer"""
+
+
+class BoardFull(Exception):
+    """Raised when no more legs can be started"""
+
+
+class LivePlayer:
+    __slots__ = ('name', 'remaining', 'visits', 'darts', 'points')
+
+    def __init__(self, name, start_score):
+        self.name = name
+        self.remaining = start_score
+        self.visits = 0
+        self.darts = 0
+        self.points = 0
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "remaining": self.remaining,
+            "visits": self.visits,
+            "darts": self.darts,
+            "average": round(self.points * 3 / self.darts, 2) if self.darts else 0
+        }
+
+
+class LiveLeg:
+    """One leg being scored visit by visit; players throw in the order given"""
+
+    __slots__ = ('id', 'game_id', 'start_score', 'date', 'players', 'turn', 'winner',
+                 'last_visit', 'started_at', 'updated_at')
+
+    def __init__(self, player_names, start_score=START_SCORE):
+        self.id = uuid.uuid4().hex[:12]
+        started = datetime.now()
+        self.game_id = f"live_{int(started.timestamp())}_{self.id[:6]}"
+        self.start_score = start_score
+        self.date = started.strftime('%Y-%m-%d')
+        self.players = [LivePlayer(name, start_score) for name in player_names]
+        self.turn = 0
+        self.winner = None
+        self.last_visit = None
+        self.started_at = time.time()
+        self.updated_at = self.started_at
+
+    @property
+    def finished(self):
+        return self.winner is not None
+
+    def add_visit(self, notations, player_name=None):
+        """Score the next visit and return it as a sheet row.
+
+        Darts are checked one by one against the bust and double-out rules;
+        a visit has three darts unless it checks out or busts on an
+        earlier one, and no dart may follow that.
+        """
+        if self.finished:
+            raise LiveError("Leg ist bereits beendet")
+        player = self.players[self.turn]
+        if player_name and player_name != player.name:
+            raise LiveError(f"{player.name} ist am Wurf")
+        if not isinstance(notations, list) or not 1 <= len(notations) <= 3:
+            raise LiveError("Eine Aufnahme besteht aus ein bis drei Darts")
+
+        throws = []
+        rest = player.remaining
+        for notation in notations:
+            if throws and (rest < 0 or rest == 1 or rest == 0):
+                raise LiveError("Nach Checkout oder Bust sind keine weiteren Darts erlaubt")
+            throw = parse_throw(notation)
+            if throw is None:
+                raise LiveError(f"Ungültiger Wurf: {notation}")
+            throws.append(throw)
+            rest -= throw.points
+            if rest == 0 and not throw.is_double:
+                rest = -1  # finishing on a single or treble busts like overshooting
+        if len(throws) < 3 and rest > 1:
+            raise LiveError("Eine Aufnahme hat drei Darts, außer bei Checkout oder Bust")
+
+        score, rest, bust = score_visit(player.remaining, throws)
+        player.remaining = rest
+        player.visits += 1
+        player.darts += len(throws)
+        player.points += score
+        if rest == 0:
+            self.winner = player.name
+        else:
+            self.turn = (self.turn + 1) % len(self.players)
+        self.updated_at = time.time()
+
+        notations = [throw.notation for throw in throws] + ['', '', '']
+        self.last_visit = {
+            'game_id': self.game_id,
+            'mode': str(self.start_score),
+            'legType': 'live',
+            'date': self.date,
+            'duration': '',
+            'player': player.name,
+            'round': str(player.visits),
+            'throw1': notations[0],
+            'throw2': notations[1],
+            'throw3': notations[2],
+            'score': str(score),
+            'rest': str(rest),
+            'bust': 'true' if bust else 'false'
+        }
+        return self.last_visit
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "game_id": self.game_id,
+            "start_score": self.start_score,
+            "players": [player.to_dict() for player in self.players],
+            "to_throw": None if self.finished else self.players[self.turn].name,
+            "winner": self.winner,
+            "last_visit": self.last_visit,
+            "started_at": self.started_at,
+            "updated_at": self.updated_at
+        }
+
+
+class LiveBoard:
+    """Legs in progress (and recently finished ones) with change notification.
+
+    Like background jobs, legs live in memory: scorer and viewers must be
+    served by the same process.
+    """
+
+    def __init__(self, max_legs=200, retention=3600):
+        self.max_legs = max_legs
+        self.retention = retention
+        self.version = 0
+        self._legs = {}
+        self._changed = threading.Condition()
+
+    def start_leg(self, player_names, start_score=START_SCORE):
+        names = [str(name).strip() for name in player_names if str(name).strip()]
+        if not 1 <= len(names) <= MAX_PLAYERS:
+            raise LiveError(f"Ein Leg braucht 1 bis {MAX_PLAYERS} Spieler")
+        if len(set(names)) != len(names):
+            raise LiveError("Spielernamen müssen eindeutig sein")
+        if start_score not in START_SCORES:
+            raise LiveError(f"Startwert muss einer von {', '.join(map(str, START_SCORES))} sein")
+
+        with self._changed:
+            self._prune()
+            if sum(not leg.finished for leg in self._legs.values()) >= self.max_legs:
+                raise BoardFull()
+            leg = LiveLeg(names, start_score)
+            self._legs[leg.id] = leg
+            self._notify()
+            return leg.to_dict()
+
+    def add_visit(self, leg_id, notations, player_name=None):
+        """Score a visit; returns (leg state, sheet row) or None for an unknown leg"""
+        with self._changed:
+            leg = self._legs.get(leg_id)
+            if leg is None:
+                return None
+            row = leg.add_visit(notations, player_name)
+            self._notify()
+            return leg.to_dict(), row
+
+    def get(self, leg_id):
+        with self._changed:
+            leg = self._legs.get(leg_id)
+            return leg.to_dict() if leg else None
+
+    def legs(self, include_finished=False):
+        with self._changed:
+            return [leg.to_dict() for leg in self._legs.values() if include_finished or not leg.finished]
+
+    def wait_for_change(self, version, timeout):
+        """Block until the board moves past version or timeout elapses"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def _notify(self):
+        self.version += 1
+        self._changed.notify_all()
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        expired = [leg_id for leg_id, leg in self._legs.items() if leg.finished and leg.updated_at < cutoff]
+        for leg_id in expired:
+            del self._legs[leg_id]
+
+
+def live_events(board, leg_id=None, heartbeat=15):
+    """Server-Sent Events with the running legs (or one leg) after every change.
+
+    A single-leg stream ends once the leg is finished or gone.
+    """
+    version = -1
+    while True:
+        if board.version != version:
+            version = board.version
+            if leg_id is None:
+                yield f"data: {json.dumps({'legs': board.legs()})}\n\n"
+                continue
+            leg = board.get(leg_id)
+            yield f"data: {json.dumps({'leg': leg})}\n\n"
+            if leg is None or leg['winner'] is not None:
+                return
+        elif board.wait_for_change(version, heartbeat) == version:
+            yield ": keep-alive\n\n"
+
+
+class WriteBehind:
+    """Rows buffered in memory and persisted by a background thread in batches.
+
+    A batch is written once batch_size rows are waiting, interval seconds
+    after the last write, or right away on flush_soon(). A failed write
+    keeps its rows at the front of the buffer for the next attempt; once
+    max_pending rows are waiting the writer is full and callers are
+    expected to stop producing until storage recovers.
+    """
+
+    def __init__(self, write, batch_size=100, interval=5.0, max_pending=5000):
+        self.write = write
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_pending = max_pending
+        self.written = 0
+        self.failures = 0
+        self.last_error = None
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    def put(self, row, urgent=False):
+        self._start()
+        with self._lock:
+            self._pending.append(row)
+            full = len(self._pending) >= self.batch_size
+        if full or urgent:
+            self._wake.set()
+
+    @property
+    def full(self):
+        with self._lock:
+            return len(self._pending) >= self.max_pending
+
+    def flush_soon(self):
+        self._wake.set()
+
+    def flush(self):
+        """Write everything pending now; returns False if a batch failed"""
+        while True:
+            with self._lock:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+            if not batch:
+                return True
+            try:
+                self.write(batch)
+            except Exception as e:
+                with self._lock:
+                    self._pending[:0] = batch
+                    self.failures += 1
+                    self.last_error = str(e)
+                return False
+            with self._lock:
+                self.written += len(batch)
+
+    def close(self, timeout=10):
+        """Stop the background thread after a last flush"""
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "max_pending": self.max_pending,
+                "written": self.written,
+                "failures": self.failures,
+                "last_error": self.last_error
+            }
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="live-write-behind", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
@@ -0,0 +1,255 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        with self._lock:
+            return [(self.name, list(zip(self.labelnames, key)), value) for key, value in self._values.items()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self._samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram in the Prometheus exposition format"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self):
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                labels = list(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    samples.append((f"{self.name}_bucket", labels + [("le", _format_value(float(bound)))], cumulative))
+                samples.append((f"{self.name}_sum", labels, total))
+                samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class RequestTimer:
+    """Time spent per phase (upstream calls, named steps) within one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def breakdown(self, total):
+        """Phase durations in ms; whatever no phase covers is reported as 'other'"""
+        result = {phase: round(seconds * 1000, 1) for phase, seconds in self.phases.items()}
+        result["other"] = round(max(total - sum(self.phases.values()), 0.0) * 1000, 1)
+        return result
+
+
+class Metrics:
+    """The app's metric registry plus the phase timer of the request on this thread"""
+
+    def __init__(self, prefix="dartcoach"):
+        self._metrics = []
+        self._local = threading.local()
+
+        self.http_requests = self.counter(f"{prefix}_http_requests_total", "HTTP requests handled", ("route", "method", "status"))
+        self.http_latency = self.histogram(f"{prefix}_http_request_duration_seconds", "Time until the response is returned (streams: until headers)", ("route", "method"))
+        self.http_request_bytes = self.histogram(f"{prefix}_http_request_size_bytes", "Request body size", ("route",), SIZE_BUCKETS)
+        self.http_response_bytes = self.histogram(f"{prefix}_http_response_size_bytes", "Response body size (streams excluded)", ("route",), SIZE_BUCKETS)
+        self.http_in_flight = self.gauge(f"{prefix}_http_requests_in_flight", "HTTP requests being handled", ("route",))
+
+        self.upstream_requests = self.counter(f"{prefix}_upstream_requests_total", "Outbound calls per integration and status", ("upstream", "method", "status"))
+        self.upstream_latency = self.histogram(f"{prefix}_upstream_request_duration_seconds", "Outbound call duration, one observation per attempt", ("upstream", "method"))
+        self.upstream_request_bytes = self.histogram(f"{prefix}_upstream_request_size_bytes", "Outbound request body size", ("upstream",), SIZE_BUCKETS)
+        self.upstream_response_bytes = self.histogram(f"{prefix}_upstream_response_size_bytes", "Outbound response body size", ("upstream",), SIZE_BUCKETS)
+        self.upstream_in_flight = self.gauge(f"{prefix}_upstream_requests_in_flight", "Outbound calls in progress", ("upstream",))
+        self.upstream_circuit_open = self.gauge(f"{prefix}_upstream_circuit_open", "1 while an integration's circuit breaker is open", ("upstream",))
+
+        self.phase_latency = self.histogram(f"{prefix}_phase_duration_seconds", "Duration of named steps inside requests and jobs", ("phase",))
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+    def start_request(self):
+        self._local.timer = RequestTimer()
+        return self._local.timer
+
+    def finish_request(self):
+        timer = getattr(self._local, 'timer', None)
+        self._local.timer = None
+        return timer
+
+    def _add_phase(self, phase, seconds):
+        timer = getattr(self._local, 'timer', None)
+        if timer is not None:
+            timer.add(phase, seconds)
+
+    @contextmanager
+    def phase(self, name):
+        """Time a named step; it shows up in the phase histogram and the slow-request log"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            self.phase_latency.observe(seconds, phase=name)
+            self._add_phase(name, seconds)
+
+    @contextmanager
+    def upstream(self, name, method):
+        """Time one outbound call; the caller fills in status and byte counts on the yielded dict.
+
+        A call that raises is counted with status 'error'.
+        """
+        call = {"status": "error", "request_bytes": None, "response_bytes": None}
+        self.upstream_in_flight.inc(upstream=name)
+        started = time.perf_counter()
+        try:
+            yield call
+        finally:
+            seconds = time.perf_counter() - started
+            self.upstream_in_flight.dec(upstream=name)
+            self.upstream_requests.inc(upstream=name, method=method, status=call["status"])
+            self.upstream_latency.observe(seconds, upstream=name, method=method)
+            if call["request_bytes"] is not None:
+                self.upstream_request_bytes.observe(call["request_bytes"], upstream=name)
+            if call["response_bytes"] is not None:
+                self.upstream_response_bytes.observe(call["response_bytes"], upstream=name)
+            self._add_phase(name, seconds)
+
+
+def instrument_app(app, metrics, slow_request_ms=0):
+    """Record latency, status, sizes and in-flight counts for every Flask request.
+
+    With slow_request_ms set, requests slower than that are logged with
+    their per-phase breakdown.
+    """
+
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics_route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        metrics.http_in_flight.inc(route=g.metrics_route)
+        metrics.start_request()
+
+    @app.after_request
+    def _record_request_metrics(response):
+        route = g.get('metrics_route')
+        timer = metrics.finish_request()
+        if route is None or timer is None:
+            return response
+        seconds = time.perf_counter() - timer.started
+
+        metrics.http_in_flight.dec(route=route)
+        metrics.http_requests.inc(route=route, method=request.method, status=response.status_code)
+        metrics.http_latency.observe(seconds, route=route, method=request.method)
+        if request.content_length:
+            metrics.http_request_bytes.observe(request.content_length, route=route)
+        if not response.is_streamed:
+            metrics.http_response_bytes.observe(response.calculate_content_length() or 0, route=route)
+
+        if slow_request_ms and seconds * 1000 >= slow_request_ms:
+            phases = ", ".join(f"{phase}={ms} ms" for phase, ms in timer.breakdown(seconds).items())
+            app.logger.warning(
+                f"Slow request: {request.method} {request.full_path.rstrip('?')} "
+                f"{response.status_code} {seconds * 1000:.0f} ms ({phases})"
+            )
+        return response
+
+
+def metrics_response(metrics):
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,239 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+NOTION_API_URL = "https://api.notion.com/v1"
+NOTION_VERSION = "2022-06-28"
+
+# Notion request limits: characters per text object, blocks per children
+# array, blocks per request (including nested table rows)
+MAX_TEXT_LENGTH = 2000
+MAX_CHILDREN = 100
+MAX_BLOCKS_PER_REQUEST = 1000
+
+EXERCISE_COLUMNS = [("Übung", "name"), ("Dauer", "duration"), ("Fokus", "focus")]
+
+
+class NotionError(Exception):
+    """Non-success response from the Notion API"""
+    def __init__(self, status_code, text):
+        super().__init__(f"Notion API Fehler: {status_code} - {text}")
+        self.status_code = status_code
+
+
+def split_text(text, limit=MAX_TEXT_LENGTH):
+    """Split text into chunks of at most limit characters, preferring line and word breaks"""
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind('\n', 0, limit)
+        if cut <= 0:
+            cut = text.rfind(' ', 0, limit)
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip('\n ')
+    if text:
+        chunks.append(text)
+    return chunks
+
+
+def rich_text(text):
+    return [{"type": "text", "text": {"content": chunk}} for chunk in split_text(str(text))]
+
+
+def _block(block_type, **content):
+    return {"object": "block", "type": block_type, block_type: content}
+
+
+def heading(text):
+    return _block("heading_2", rich_text=rich_text(text))
+
+
+def paragraphs(text):
+    """One paragraph block per blank-line separated paragraph; long ones become several blocks"""
+    blocks = []
+    for part in str(text).split('\n\n'):
+        for chunk in split_text(part.strip()):
+            blocks.append(_block("paragraph", rich_text=rich_text(chunk)))
+    return blocks
+
+
+def bullets(items):
+    if isinstance(items, str):
+        items = [line.lstrip('-• ').strip() for line in items.splitlines()]
+    return [_block("bulleted_list_item", rich_text=rich_text(item)) for item in items if str(item).strip()]
+
+
+def tables(header, rows):
+    """Table blocks with a column header; split so no table exceeds MAX_CHILDREN rows"""
+    def row(cells):
+        return _block("table_row", cells=[rich_text(cell) for cell in cells])
+
+    per_table = MAX_CHILDREN - 1
+    return [
+        _block("table", table_width=len(header), has_column_header=True, has_row_header=False,
+               children=[row(header)] + [row(cells) for cells in rows[i:i + per_table]])
+        for i in range(0, len(rows), per_table)
+    ]
+
+
+def plan_blocks(plan):
+    """Page body for a training plan"""
+    blocks = [heading("Analyse")] + paragraphs(plan.get('analysis', ''))
+    if plan.get('strengths'):
+        blocks += [heading("Stärken")] + bullets(plan['strengths'])
+    if plan.get('weaknesses'):
+        blocks += [heading("Schwächen")] + bullets(plan['weaknesses'])
+    exercises = [ex for ex in plan.get('exercises') or [] if isinstance(ex, dict)]
+    if exercises:
+        rows = [[str(ex.get(key, '')) for _, key in EXERCISE_COLUMNS] for ex in exercises]
+        blocks += [heading("Übungen")] + tables([title for title, _ in EXERCISE_COLUMNS], rows)
+    if plan.get('motivation'):
+        blocks.append(_block("quote", rich_text=rich_text(plan['motivation'])))
+    return blocks
+
+
+def page_properties(plan):
+    player_name = plan.get('player_name', 'Unbekannt')
+    return {
+        "Titel": {"title": rich_text(f"Trainingsplan - {player_name}")},
+        "Spieler": {"rich_text": rich_text(player_name)},
+        "Datum": {"date": {"start": plan.get('created_at', datetime.now().isoformat())}}
+    }
+
+
+def chunk_blocks(blocks):
+    """Group top-level blocks into request-sized batches (children and total block limits)"""
+    batch, size = [], 0
+    for block in blocks:
+        weight = 1 + len(block.get(block["type"], {}).get("children", []))
+        if batch and (len(batch) >= MAX_CHILDREN or size + weight > MAX_BLOCKS_PER_REQUEST):
+            yield batch
+            batch, size = [], 0
+        batch.append(block)
+        size += weight
+    if batch:
+        yield batch
+
+
+class NotionExporter:
+    """Writes training plans as Notion pages.
+
+    Every request first takes a token from the shared limiter. A 429 means
+    Notion did not process the request, so it is retried after Retry-After
+    (or a jittered backoff) even for POST and PATCH. Pages with more blocks
+    than fit in one request are created with the first batch and filled
+    through block-children appends; if an append fails the half-filled page
+    is archived, so a retry does not leave a duplicate behind.
+    """
+
+    def __init__(self, client, api_key, database_id, limiter, max_retries=5, backoff=1.0, max_backoff=30,
+                 base_url=NOTION_API_URL):
+        self.client = client
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.database_id = database_id
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.orphaned_pages = 0
+
+    @property
+    def configured(self):
+        return bool(self.api_key and self.database_id)
+
+    def _request(self, method, path, payload):
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Notion-Version": NOTION_VERSION
+        }
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            response = self.client.request(method, f"{self.base_url}{path}", headers=headers, json=payload, retry=False)
+            with self._lock:
+                self.requests += 1
+            if response.status_code != 429 or attempt == self.max_retries:
+                break
+            with self._lock:
+                self.rate_limited += 1
+            self._sleep(attempt, response.headers.get('Retry-After'))
+        if response.status_code != 200:
+            raise NotionError(response.status_code, response.text)
+        return response.json()
+
+    def _sleep(self, attempt, retry_after=None):
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = random.uniform(0, self.backoff * (2 ** attempt))
+        time.sleep(min(delay, self.max_backoff))
+
+    def create_page(self, plan):
+        """Create the page for a training plan and return its URL"""
+        batches = list(chunk_blocks(plan_blocks(plan)))
+        page = self._request("POST", "/pages", {
+            "parent": {"database_id": self.database_id},
+            "properties": page_properties(plan),
+            "children": batches[0] if batches else []
+        })
+        try:
+            for batch in batches[1:]:
+                self._request("PATCH", f"/blocks/{page['id']}/children", {"children": batch})
+        except Exception:
+            self._archive(page['id'])
+            raise
+        with self._lock:
+            self.pages += 1
+        return page.get('url')
+
+    def _archive(self, page_id):
+        """Best-effort removal of a page that could not be completed"""
+        try:
+            self._request("PATCH", f"/pages/{page_id}", {"archived": True})
+        except Exception:
+            with self._lock:
+                self.orphaned_pages += 1
+
+    def stats(self):
+        return {
+            "pages": self.pages,
+            "orphaned_pages": self.orphaned_pages,
+            "requests": self.requests,
+            "rate_limited": self.rate_limited
+        }
+
+
+def export_plans(job, exporter, plans, workers=3):
+    """Export many plans concurrently; throughput is bounded by the exporter's limiter.
+
+    Returns one outcome per plan, in input order.
+    """
+    results = [None] * len(plans)
+    total = len(plans)
+    done = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(exporter.create_page, plan): index for index, plan in enumerate(plans)}
+        for future in as_completed(futures):
+            index = futures[future]
+            player_name = plans[index].get('player_name', 'Unbekannt')
+            try:
+                results[index] = {"player_name": player_name, "status": "exported", "notion_url": future.result()}
+            except Exception as e:
+                results[index] = {"player_name": player_name, "status": "failed", "error": str(e)}
+            done += 1
+            job.update(progress=int(done / total * 100), message=f"{done} von {total} Seiten exportiert")
+
+    return {
+        "plans": results,
+        "exported": sum(1 for r in results if r["status"] == "exported"),
+        "failed": sum(1 for r in results if r["status"] == "failed")
+    }
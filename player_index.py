@@ -0,0 +1,143 @@
+import bisect
+import threading
+import time
+from collections import Counter
+
+SORT_ORDERS = ('name', 'recent', 'games')
+FUZZY_CUTOFF = 0.4   # trigram Jaccard similarity a fuzzy match needs
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PlayerIndex:
+    """Directory of all players with game counts and last-played dates.
+
+    Built from (player, game_id, date) rows with rebuild, then kept current
+    by apply_rows as rows are saved. Names are held in a list sorted by
+    their case-folded form, so prefix search is a bisect rather than a scan;
+    a trigram index answers fuzzy (typo-tolerant) lookups.
+    """
+
+    def __init__(self):
+        self._players = {}   # name -> {"games": set of game ids, "rows": int, "last_played": str}
+        self._keys = []      # sorted (casefolded name, name)
+        self._trigrams = {}  # trigram -> set of names
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.loaded_at = None
+
+    def _add(self, row):
+        name = row.get('player')
+        if not name:
+            return
+        entry = self._players.get(name)
+        if entry is None:
+            entry = self._players[name] = {"games": set(), "rows": 0, "last_played": ""}
+            bisect.insort(self._keys, (name.casefold(), name))
+            trigrams = _trigrams(name.casefold())
+            entry["trigrams"] = len(trigrams)
+            for trigram in trigrams:
+                self._trigrams.setdefault(trigram, set()).add(name)
+        if row.get('game_id'):
+            entry["games"].add(row['game_id'])
+        entry["rows"] += int(row.get('rows', 1))
+        # Dates are ISO strings, so the largest one is the latest
+        date = str(row.get('date') or '')
+        if date > entry["last_played"]:
+            entry["last_played"] = date
+
+    def rebuild(self, rows):
+        """Replace the index with one built from the given rows"""
+        with self._lock:
+            self._players = {}
+            self._keys = []
+            self._trigrams = {}
+            for row in rows:
+                self._add(row)
+            self.loaded_at = time.monotonic()
+        return len(self._players)
+
+    def ensure(self, loader, ttl=None):
+        """Build the index from loader() unless it is loaded and younger than ttl seconds"""
+        with self._load_lock:
+            if self.loaded_at is None or (ttl is not None and time.monotonic() - self.loaded_at > ttl):
+                self.rebuild(loader())
+
+    def apply_rows(self, rows):
+        """Fold newly written rows in; ignored until the index is first built"""
+        with self._lock:
+            if self.loaded_at is None:
+                return
+            for row in rows:
+                self._add(row)
+
+    def names(self):
+        """Player names in the index's case-insensitive order"""
+        with self._lock:
+            return [name for _, name in self._keys]
+
+    def _entry(self, name, match=None):
+        entry = self._players[name]
+        result = {"name": name, "games": len(entry["games"]), "rows": entry["rows"],
+                  "last_played": entry["last_played"] or None}
+        if match:
+            result["match"] = match
+        return result
+
+    def _matches(self, query):
+        """(name, match kind) pairs: prefix matches, then substring, then close fuzzy matches"""
+        key = query.casefold()
+        start = bisect.bisect_left(self._keys, (key,))
+        prefix = []
+        for folded, name in self._keys[start:]:
+            if not folded.startswith(key):
+                break
+            prefix.append(name)
+        seen = set(prefix)
+        substring = [name for folded, name in self._keys if key in folded and name not in seen]
+        seen.update(substring)
+        wanted = _trigrams(key)
+        shared = Counter()
+        for trigram in wanted:
+            shared.update(self._trigrams.get(trigram, ()))
+        scored = []
+        for name, count in shared.items():
+            similarity = count / (len(wanted) + self._players[name]["trigrams"] - count)
+            if name not in seen and similarity >= FUZZY_CUTOFF:
+                scored.append((-similarity, name.casefold(), name))
+        fuzzy = [name for _, _, name in sorted(scored)]
+        return ([(name, "prefix") for name in prefix] + [(name, "substring") for name in substring]
+                + [(name, "fuzzy") for name in fuzzy])
+
+    def search(self, query="", offset=0, limit=20, sort='name', fuzzy=True):
+        """One page of matching players and the total match count.
+
+        Without a query all players are listed in the given sort order;
+        with one, prefix matches come first, then (if fuzzy) players whose
+        name contains the query or resembles it.
+        """
+        query = (query or '').strip()
+        with self._lock:
+            if query:
+                matches = self._matches(query)
+                if not fuzzy:
+                    matches = [m for m in matches if m[1] == "prefix"]
+            else:
+                names = [name for _, name in self._keys]
+                if sort == 'recent':
+                    names.sort(key=lambda name: self._players[name]["last_played"], reverse=True)
+                elif sort == 'games':
+                    names.sort(key=lambda name: len(self._players[name]["games"]), reverse=True)
+                matches = [(name, None) for name in names]
+            page = [self._entry(name, match) for name, match in matches[offset:offset + limit]]
+        return len(matches), page
+
+    def stats(self):
+        with self._lock:
+            return {
+                "players": len(self._players),
+                "age_seconds": None if self.loaded_at is None else round(time.monotonic() - self.loaded_at, 1)
+            }
@@ -0,0 +1,145 @@
+import io
+import os
+import time
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # preprocessing is skipped without Pillow
+    Image = None
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # PDFs are forwarded unchanged without pypdfium2
+    pdfium = None
+
+IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+
+
+class PreparedUpload:
+    """An upload as it will be sent to ParseExtract, plus what preprocessing did"""
+
+    def __init__(self, content, filename, mimetype, original_bytes, seconds=0.0, action="unchanged", pages=None, note=None):
+        self.content = content
+        self.filename = filename
+        self.mimetype = mimetype
+        self.original_bytes = original_bytes
+        self.seconds = seconds
+        self.action = action
+        self.pages = pages
+        self.note = note
+
+    def to_dict(self):
+        result = {
+            "action": self.action,
+            "original_bytes": self.original_bytes,
+            "bytes": len(self.content),
+            "saved_bytes": self.original_bytes - len(self.content),
+            "ms": round(self.seconds * 1000, 1)
+        }
+        if self.pages is not None:
+            result["pages"] = self.pages
+        if self.note:
+            result["note"] = self.note
+        return result
+
+
+def _extension(filename):
+    return filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+
+
+def _with_extension(filename, extension):
+    return f"{os.path.splitext(filename)[0]}.{extension}"
+
+
+def _ocr_image(image, max_side, grayscale):
+    """Upright, downscaled (never enlarged) and optionally grayscale copy of an image"""
+    image = ImageOps.exif_transpose(image)
+    image = image.convert("L" if grayscale else "RGB")
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+    return image
+
+
+def _encode_jpeg(image, quality):
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def _prepare_image(content, filename, max_side, quality, grayscale):
+    with Image.open(io.BytesIO(content)) as source:
+        source.seek(0)  # first frame of animated GIFs
+        if source.format == 'JPEG':
+            # Let the decoder downscale by a power of two instead of decoding every pixel
+            source.draft("L" if grayscale else "RGB", (max_side, max_side))
+        image = _ocr_image(source, max_side, grayscale)
+    return _encode_jpeg(image, quality), _with_extension(filename, 'jpg'), 'image/jpeg', None
+
+
+def _prepare_pdf(content, filename, max_side, quality, grayscale, dpi, max_pages):
+    """Rasterize page by page into a PDF of recompressed JPEG pages; None above max_pages"""
+    document = pdfium.PdfDocument(content)
+    try:
+        page_count = len(document)
+        if page_count > max_pages:
+            return None
+        pages = []
+        for index in range(page_count):
+            page = document[index]
+            try:
+                width, height = page.get_size()
+                scale = min(dpi / 72, max_side / max(width, height))
+                image = _ocr_image(page.render(scale=scale).to_pil(), max_side, grayscale)
+            finally:
+                page.close()
+            # Keep each page only in its compressed form
+            pages.append(Image.open(io.BytesIO(_encode_jpeg(image, quality))))
+    finally:
+        document.close()
+
+    buffer = io.BytesIO()
+    pages[0].save(buffer, "PDF", save_all=True, append_images=pages[1:], resolution=dpi)
+    return buffer.getvalue(), filename, 'application/pdf', page_count
+
+
+def prepare_upload(content, filename, mimetype, max_side=2000, quality=80, grayscale=True,
+                   min_bytes=256 * 1024, pdf_dpi=150, max_pdf_pages=20):
+    """Shrink an image or PDF to an OCR-friendly size before it goes to ParseExtract.
+
+    Images are turned upright, downscaled to max_side, grayscaled and
+    recompressed as JPEG; PDFs are rasterized the same way page by page.
+    Files below min_bytes, other types and anything that fails to decode
+    are passed through, as is any result that would not be smaller.
+    """
+    started = time.perf_counter()
+    original_bytes = len(content)
+    extension = _extension(filename)
+
+    if original_bytes < min_bytes:
+        return PreparedUpload(content, filename, mimetype, original_bytes)
+    if extension in IMAGE_EXTENSIONS:
+        action, available = "image", Image is not None
+    elif extension == 'pdf':
+        action, available = "pdf", Image is not None and pdfium is not None
+    else:
+        return PreparedUpload(content, filename, mimetype, original_bytes)
+    if not available:
+        return PreparedUpload(content, filename, mimetype, original_bytes, note="Vorverarbeitung nicht verfügbar")
+
+    try:
+        if action == "image":
+            result = _prepare_image(content, filename, max_side, quality, grayscale)
+        else:
+            result = _prepare_pdf(content, filename, max_side, quality, grayscale, pdf_dpi, max_pdf_pages)
+    except Exception as e:
+        return PreparedUpload(content, filename, mimetype, original_bytes, time.perf_counter() - started,
+                              note=f"Vorverarbeitung fehlgeschlagen: {e}")
+
+    seconds = time.perf_counter() - started
+    if result is None:
+        return PreparedUpload(content, filename, mimetype, original_bytes, seconds,
+                              note=f"Mehr als {max_pdf_pages} Seiten, unverändert gesendet")
+    prepared, new_name, new_type, pages = result
+    if len(prepared) >= original_bytes:
+        return PreparedUpload(content, filename, mimetype, original_bytes, seconds, pages=pages)
+    return PreparedUpload(prepared, new_name, new_type, original_bytes, seconds, action, pages)
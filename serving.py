@@ -0,0 +1,19 @@
+def gevent_active():
+    """True when the process runs under gevent's monkey-patched standard library"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("socket")
+
+
+def run_cpu_bound(func, *args, **kwargs):
+    """Call func(*args, **kwargs), on a native thread when serving under gevent.
+
+    NumPy work would otherwise block the event loop and every greenlet
+    waiting on an upstream call with it.
+    """
+    if not gevent_active():
+        return func(*args, **kwargs)
+    import gevent
+    return gevent.get_hub().threadpool.apply(func, args, kwargs)
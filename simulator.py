@@ -0,0 +1,230 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from checkouts import MAX_CHECKOUT, checkout_table
+from dart_notation import START_SCORE
+from stats_engine import PlayerColumns, checkout_by_double, dart_remaining
+
+# What the player aims at for a given remaining score and darts left in the visit
+SCORING, SINGLE, DOUBLE, TREBLE = 0, 1, 2, 3
+
+MAX_VISITS = 60          # legs still open after this many visits count as unfinished
+MIN_SCORING_DARTS = 30   # below this, all logged darts form the scoring distribution
+SINGLE_HIT_RATE = 0.9
+BULL_HIT_FACTOR = 0.5    # bull is hit this much less often than the player's doubles
+# Beta prior pseudo-counts (hits, attempts) so short histories stay plausible
+DOUBLE_PRIOR = (1, 4)
+TREBLE_PRIOR = (1, 10)
+
+
+class PlayerModel:
+    """Per-dart throwing model of one player, estimated from logged throws.
+
+    Scoring darts (remaining above a checkout) are drawn from the player's
+    own scoring darts. On a checkout the player follows the checkout table
+    and hits the aimed double or treble with their observed rates.
+    """
+
+    def __init__(self, scoring_points, scoring_doubles, double_rate, treble_rate):
+        self.scoring_points = np.asarray(scoring_points, dtype=np.int64)
+        self.scoring_doubles = np.asarray(scoring_doubles, dtype=bool)
+        self.double_rate = double_rate
+        self.treble_rate = treble_rate
+
+    @classmethod
+    def from_rows(cls, rows):
+        cols = PlayerColumns(rows)
+        if not len(cols.dart_visit):
+            raise ValueError("Keine Wurfdaten für die Simulation")
+
+        remaining = dart_remaining(cols)
+        known = cols.rest[cols.dart_visit] >= 0
+        scoring = ~known | (remaining > MAX_CHECKOUT)
+        if scoring.sum() < MIN_SCORING_DARTS:
+            scoring = np.ones(len(remaining), dtype=bool)
+
+        doubles = checkout_by_double(cols).values()
+        double_hits = sum(d["hits"] for d in doubles) + DOUBLE_PRIOR[0]
+        double_attempts = sum(d["attempts"] for d in doubles) + DOUBLE_PRIOR[1]
+        trebles = int((cols.dart_mult[scoring] == 3).sum()) + TREBLE_PRIOR[0]
+
+        return cls(
+            cols.dart_points[scoring],
+            cols.dart_mult[scoring] == 2,
+            double_hits / double_attempts,
+            trebles / (int(scoring.sum()) + TREBLE_PRIOR[1])
+        )
+
+    def to_dict(self):
+        return {
+            "scoring_darts": int(len(self.scoring_points)),
+            "scoring_average": round(float(self.scoring_points.mean()) * 3, 2),
+            "double_rate": round(self.double_rate * 100, 2),
+            "treble_rate": round(self.treble_rate * 100, 2)
+        }
+
+
+_targets = {}
+_targets_lock = threading.Lock()
+
+
+def aim_table(preferred_doubles=()):
+    """(kind, segment) arrays indexed by [remaining, darts left] for the aimed dart"""
+    with _targets_lock:
+        if preferred_doubles not in _targets:
+            table = checkout_table(preferred_doubles)
+            kind = np.zeros((START_SCORE + 1, 4), dtype=np.int64)
+            segment = np.zeros((START_SCORE + 1, 4), dtype=np.int64)
+            for remaining in range(START_SCORE + 1):
+                for left in (1, 2, 3):
+                    # Without a finish in the darts left, set up the best three-dart finish
+                    route = table.suggest(remaining, left) or table.suggest(remaining)
+                    if not route:
+                        continue
+                    target = route[0]
+                    kind[remaining, left] = {'S': SINGLE, 'D': DOUBLE, 'T': TREBLE}[target[0]]
+                    segment[remaining, left] = int(target[1:])
+            _targets[preferred_doubles] = (kind, segment)
+        return _targets[preferred_doubles]
+
+
+def simulate_legs(model, legs, seed=None, start=START_SCORE, preferred_doubles=()):
+    """Darts needed to finish each of `legs` simulated legs (-1 if unfinished).
+
+    All legs advance one dart per step as NumPy array operations; legs that
+    finish drop out of the active set.
+    """
+    rng = np.random.default_rng(seed)
+    kind_table, segment_table = aim_table(tuple(preferred_doubles))
+
+    remaining = np.full(legs, start, dtype=np.int64)
+    visit_start = remaining.copy()
+    left = np.full(legs, 3, dtype=np.int64)
+    darts = np.zeros(legs, dtype=np.int64)
+    result = np.full(legs, -1, dtype=np.int64)
+    active = np.arange(legs)
+
+    for _ in range(MAX_VISITS * 3):
+        if not len(active):
+            break
+        rem = remaining[active]
+        lft = left[active]
+        kind = kind_table[rem, lft]
+        seg = segment_table[rem, lft]
+        u = rng.random(len(active))
+        points = np.zeros(len(active), dtype=np.int64)
+        is_double = np.zeros(len(active), dtype=bool)
+
+        scoring = kind == SCORING
+        if scoring.any():
+            pick = rng.integers(0, len(model.scoring_points), int(scoring.sum()))
+            points[scoring] = model.scoring_points[pick]
+            is_double[scoring] = model.scoring_doubles[pick]
+
+        bull = seg == 25
+        double = kind == DOUBLE
+        double_rate = np.where(bull, model.double_rate * BULL_HIT_FACTOR, model.double_rate)
+        hit = double & (u < double_rate)
+        points[hit] = 2 * seg[hit]
+        is_double[hit] = True
+        # Half of the missed doubles land in the single, the rest outside the board
+        near = double & ~hit & (u < double_rate + (1 - double_rate) / 2)
+        points[near] = seg[near]
+
+        treble = kind == TREBLE
+        points[treble] = np.where(u[treble] < model.treble_rate, 3 * seg[treble], seg[treble])
+
+        single = kind == SINGLE
+        single_rate = np.where(bull, SINGLE_HIT_RATE * BULL_HIT_FACTOR, SINGLE_HIT_RATE)
+        single_hit = single & (u < single_rate)
+        points[single_hit] = seg[single_hit]
+        single_miss = single & ~single_hit
+        points[single_miss] = rng.integers(1, 21, int(single_miss.sum()))
+
+        after = rem - points
+        bust = (after < 0) | (after == 1) | ((after == 0) & ~is_double)
+        finished = (after == 0) & ~bust
+
+        # A bust forfeits the rest of the visit, which still counts as three darts
+        darts[active] += np.where(bust, lft, 1)
+        after = np.where(bust, visit_start[active], after)
+        lft = np.where(bust, 0, lft - 1)
+        visit_over = lft == 0
+        lft[visit_over] = 3
+        remaining[active] = after
+        left[active] = lft
+        visit_start[active[visit_over]] = after[visit_over]
+
+        result[active[finished]] = darts[active[finished]]
+        active = active[~finished]
+
+    return result
+
+
+def _simulate_chunk(args):
+    model, legs, seed, preferred_doubles = args
+    return simulate_legs(model, legs, seed, preferred_doubles=preferred_doubles)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _process_pool(workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a multi-threaded server process is not safe
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def simulate(model, legs, seed=None, workers=0, preferred_doubles=()):
+    """simulate_legs, optionally fanned out over a process pool in independent streams"""
+    if workers <= 1:
+        return simulate_legs(model, legs, seed, preferred_doubles=preferred_doubles)
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    sizes = [legs // workers + (i < legs % workers) for i in range(workers)]
+    chunks = [(model, size, s, tuple(preferred_doubles)) for size, s in zip(sizes, seeds) if size]
+    return np.concatenate(list(_process_pool(workers).map(_simulate_chunk, chunks)))
+
+
+def summarize(darts):
+    finished = darts[darts >= 0]
+    summary = {"legs": int(len(darts)), "unfinished": int(len(darts) - len(finished))}
+    if len(finished):
+        p10, p50, p90 = np.percentile(finished, [10, 50, 90])
+        summary.update({
+            "expected_darts": round(float(finished.mean()), 2),
+            "median_darts": float(p50),
+            "p10_darts": float(p10),
+            "p90_darts": float(p90),
+            "three_dart_average": round(START_SCORE / float(finished.mean()) * 3, 2)
+        })
+    return summary
+
+
+def _visits(darts):
+    """Visits per leg; unfinished legs rank behind every finished one"""
+    return np.where(darts >= 0, np.minimum((darts + 2) // 3, MAX_VISITS), MAX_VISITS + 1)
+
+
+def head_to_head(darts_a, darts_b):
+    """Win probability of A over B, averaged over who throws first.
+
+    With A first, A wins when it needs no more visits than B; with B first,
+    A wins only with strictly fewer visits. Computed exactly over the two
+    visit-count distributions rather than by pairing samples.
+    """
+    visits_a, visits_b = _visits(darts_a), _visits(darts_b)
+    size = MAX_VISITS + 2
+    p_a = np.bincount(visits_a, minlength=size) / len(visits_a)
+    p_b = np.bincount(visits_b, minlength=size) / len(visits_b)
+    b_at_least = p_b[::-1].cumsum()[::-1]            # P(vB >= k)
+    b_more = np.r_[b_at_least[1:], 0.0]              # P(vB > k)
+    a_first = float((p_a * b_at_least).sum())
+    b_first = float((p_a * b_more).sum())
+    return 0.5 * (a_first + b_first)
@@ -0,0 +1,157 @@
+import numpy as np
+
+from dart_notation import parse_throw
+
+VISIT_BINS = [0, 20, 40, 60, 80, 100, 120, 140, 160, 180, 181]
+PERCENTILES = [10, 25, 50, 75, 90]
+
+
+def _int(value, default=0):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+class PlayerColumns:
+    """A player's visits and darts loaded into NumPy columns once.
+
+    Visit columns are indexed per row; dart columns are flattened with
+    dart_visit pointing back to the visit each dart belongs to.
+    """
+
+    def __init__(self, rows):
+        game_codes = {}
+        games, rounds, scores, rests, busts = [], [], [], [], []
+        dart_visit, dart_mult, dart_seg, dart_points = [], [], [], []
+
+        for index, row in enumerate(rows):
+            games.append(game_codes.setdefault(row.get('game_id', ''), len(game_codes)))
+            rounds.append(_int(row.get('round'), 1))
+            scores.append(_int(row.get('score', row.get('points', 0))))
+            rests.append(_int(row.get('rest'), -1))
+            busts.append(str(row.get('bust', '')).strip().lower() == 'true')
+            for key in ('throw1', 'throw2', 'throw3'):
+                throw = parse_throw(row.get(key) or '')
+                if throw is not None:
+                    dart_visit.append(index)
+                    dart_mult.append(throw.multiplier)
+                    dart_seg.append(throw.segment)
+                    dart_points.append(throw.points)
+
+        self.game_ids = list(game_codes)
+        self.game = np.array(games, dtype=np.int64)
+        self.round = np.array(rounds, dtype=np.int64)
+        self.score = np.array(scores, dtype=np.int64)
+        self.rest = np.array(rests, dtype=np.int64)
+        self.bust = np.array(busts, dtype=bool)
+        self.dart_visit = np.array(dart_visit, dtype=np.int64)
+        self.dart_mult = np.array(dart_mult, dtype=np.int64)
+        self.dart_seg = np.array(dart_seg, dtype=np.int64)
+        self.dart_points = np.array(dart_points, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.score)
+
+
+def dart_remaining(cols):
+    """Remaining score before each dart: visit start minus darts already thrown"""
+    visit_start = (cols.rest + cols.score)[cols.dart_visit]
+    thrown_before = np.cumsum(cols.dart_points) - cols.dart_points
+    first_of_visit = np.r_[True, cols.dart_visit[1:] != cols.dart_visit[:-1]]
+    visit_first_dart = np.maximum.accumulate(np.where(first_of_visit, np.arange(len(thrown_before)), 0))
+    before = thrown_before - thrown_before[visit_first_dart]
+    return visit_start - before
+
+
+def checkout_by_double(cols):
+    """Darts thrown at a finishing double and how many of them hit, per double"""
+    if not len(cols.dart_visit):
+        return {}
+    remaining = dart_remaining(cols)
+
+    valid = cols.rest[cols.dart_visit] >= 0
+    on_double = valid & (((remaining <= 40) & (remaining >= 2) & (remaining % 2 == 0)) | (remaining == 50))
+    target = remaining[on_double] // 2
+    hit = (cols.dart_mult[on_double] == 2) & (cols.dart_seg[on_double] == target)
+
+    attempts = np.bincount(target, minlength=26)
+    hits = np.bincount(target[hit], minlength=26)
+    result = {}
+    for double in np.nonzero(attempts)[0]:
+        label = 'D25' if double == 25 else f"D{double}"
+        result[label] = {
+            "attempts": int(attempts[double]),
+            "hits": int(hits[double]),
+            "percentage": round(float(hits[double]) / float(attempts[double]) * 100, 2)
+        }
+    return result
+
+
+def leg_totals(cols):
+    """Per-leg darts, points, finished flag and 3-dart average, in game_ids order"""
+    leg_count = len(cols.game_ids)
+    darts_per_visit = np.bincount(cols.dart_visit, minlength=len(cols)) if len(cols.dart_visit) else np.zeros(len(cols), dtype=np.int64)
+    # Visits without recorded darts still count as three darts
+    darts_per_visit = np.where(darts_per_visit == 0, 3, darts_per_visit)
+    darts = np.bincount(cols.game, weights=darts_per_visit, minlength=leg_count)
+    points = np.bincount(cols.game, weights=cols.score, minlength=leg_count)
+    finished = np.bincount(cols.game, weights=((cols.rest == 0) & ~cols.bust), minlength=leg_count) > 0
+    averages = np.divide(points * 3, darts, out=np.zeros(leg_count), where=darts > 0)
+    return darts, points, finished, averages
+
+
+def _legs(cols):
+    """Per-leg darts, points and averages; finished legs end on rest 0"""
+    leg_count = len(cols.game_ids)
+    darts, points, finished, averages = leg_totals(cols)
+
+    def leg(i):
+        return {
+            "game_id": cols.game_ids[i],
+            "darts": int(darts[i]),
+            "average": round(float(averages[i]), 2)
+        }
+
+    result = {"legs": leg_count, "finished_legs": int(finished.sum()), "best_leg": None, "worst_leg": None}
+    if finished.any():
+        finished_idx = np.nonzero(finished)[0]
+        result["best_leg"] = leg(finished_idx[np.argmin(darts[finished_idx])])
+        result["worst_leg"] = leg(finished_idx[np.argmax(darts[finished_idx])])
+        result["average_darts_per_leg"] = round(float(darts[finished_idx].mean()), 2)
+    return result
+
+
+def compute_advanced_stats(rows):
+    """Vectorized KPIs over a player's full visit history"""
+    cols = PlayerColumns(rows)
+    if not len(cols):
+        return {"visits": 0}
+
+    scores = cols.score
+    first9 = scores[cols.round <= 3]
+    histogram, _ = np.histogram(scores, bins=VISIT_BINS)
+
+    return {
+        "visits": int(len(cols)),
+        "darts": int(len(cols.dart_visit)),
+        "ppr": round(float(scores.mean()), 2),
+        "first9_average": round(float(first9.mean()), 2) if len(first9) else 0,
+        "bust_rate": round(float(cols.bust.mean()) * 100, 2),
+        "visits_buckets": {
+            "60+": int(((scores >= 60) & (scores < 100)).sum()),
+            "100+": int(((scores >= 100) & (scores < 140)).sum()),
+            "140+": int(((scores >= 140) & (scores < 180)).sum()),
+            "180": int((scores >= 180).sum())
+        },
+        "visit_histogram": {
+            f"{VISIT_BINS[i]}-{VISIT_BINS[i + 1] - 1}": int(count)
+            for i, count in enumerate(histogram)
+        },
+        "percentiles": {
+            f"p{p}": round(float(v), 2)
+            for p, v in zip(PERCENTILES, np.percentile(scores, PERCENTILES))
+        },
+        "checkout_by_double": checkout_by_double(cols),
+        **_legs(cols)
+    }
@@ -0,0 +1,281 @@
+import json
+import sqlite3
+import threading
+
+SHEET_COLUMNS = ['game_id', 'mode', 'legType', 'date', 'duration', 'player', 'round',
+                 'throw1', 'throw2', 'throw3', 'score', 'rest', 'bust']
+
+
+class StorageError(Exception):
+    """A storage backend could not complete a read or write"""
+
+
+class SheetsError(StorageError):
+    """Non-success response from SheetDB"""
+    def __init__(self, status_code, text=None):
+        message = f"Google Sheets Fehler: {status_code}"
+        super().__init__(f"{message} - {text}" if text else message)
+        self.status_code = status_code
+
+
+def filter_dates(rows, date_from=None, date_to=None):
+    """Rows whose ISO date lies within the inclusive range"""
+    for row in rows:
+        date = str(row.get('date') or '')[:10]
+        if date_from and date < date_from:
+            continue
+        if date_to and date > date_to:
+            continue
+        yield row
+
+
+class StorageBackend:
+    """Interface every game-row store implements.
+
+    Rows are dicts keyed by the sheet columns with string values, the shape
+    SheetDB returns and transform_to_sheet_format produces.
+    """
+
+    name = None
+    not_configured_error = "Datenspeicher nicht konfiguriert"
+    # Where saved rows end up, as shown to the user ("gespeichert in ...")
+    destination = "Google Sheets"
+
+    def player_rows(self, player_name):
+        raise NotImplementedError
+
+    def rows_for_players(self, player_names):
+        """Rows of several players, fetched in one query"""
+        wanted = set(player_names)
+        return [row for row in self.all_rows() if row.get('player') in wanted]
+
+    def recent_player_rows(self, player_name, limit):
+        """A player's newest rows first"""
+        raise NotImplementedError
+
+    def all_rows(self):
+        raise NotImplementedError
+
+    def iter_rows(self, player_name=None, date_from=None, date_to=None, page_size=1000):
+        """Yield rows in storage order, one page at a time.
+
+        date_from/date_to are inclusive ISO dates. Backends that can page
+        keep at most one page in memory.
+        """
+        rows = self.player_rows(player_name) if player_name else self.all_rows()
+        yield from filter_dates(rows, date_from, date_to)
+
+    def player_activity(self):
+        """Rows reduced to player, game_id and date, for the player index.
+
+        A row may carry a 'rows' count when the backend already grouped
+        several rows of one game.
+        """
+        return [{key: row.get(key) for key in ('player', 'game_id', 'date')} for row in self.all_rows()]
+
+    def append_rows(self, rows):
+        """Store new rows and return how many were created"""
+        raise NotImplementedError
+
+
+class SheetDBBackend(StorageBackend):
+    """Google Sheet behind the sheetdb.io REST API"""
+
+    name = "sheetdb"
+    not_configured_error = "Google Sheets URL nicht konfiguriert"
+
+    def __init__(self, url, client):
+        self.url = url
+        self.client = client
+
+    def _get(self, params=None):
+        response = self.client.get(self.url, params=params)
+        if response.status_code != 200:
+            raise SheetsError(response.status_code)
+        return response.json()
+
+    def player_rows(self, player_name):
+        return self._get({"player": player_name})
+
+    def rows_for_players(self, player_names):
+        # SheetDB filters on a single value, so several players take one
+        # read of the whole sheet; callers cache the result per player
+        if len(player_names) == 1:
+            return self.player_rows(player_names[0])
+        return super().rows_for_players(player_names)
+
+    def recent_player_rows(self, player_name, limit):
+        # The sheet has no creation timestamp to order by, and SheetDB returns
+        # rows in sheet order (oldest first): sort by date, then sheet position
+        rows = list(enumerate(self.player_rows(player_name)))
+        rows.sort(key=lambda item: (str(item[1].get('date') or ''), item[0]), reverse=True)
+        return [row for _, row in rows[:limit]]
+
+    def all_rows(self):
+        return self._get()
+
+    def iter_rows(self, player_name=None, date_from=None, date_to=None, page_size=1000):
+        params = {"player": player_name} if player_name else {}
+        offset = 0
+        while True:
+            page = self._get({**params, "limit": page_size, "offset": offset})
+            yield from filter_dates(page, date_from, date_to)
+            if len(page) < page_size:
+                return
+            offset += page_size
+
+    def player_activity(self):
+        return self._get({"select": "player,game_id,date"})
+
+    def append_rows(self, rows):
+        response = self.client.post(
+            self.url,
+            json={"data": rows},
+            headers={'Content-Type': 'application/json'}
+        )
+        if response.status_code not in [200, 201]:
+            raise SheetsError(response.status_code, response.text)
+        return response.json().get('created', len(rows))
+
+
+class SQLiteBackend(StorageBackend):
+    """Local SQLite mirror of the sheet, indexed by player, game_id and date.
+
+    Sheet columns are stored as text columns; any other keys a row carries
+    are kept in a JSON column so rows round-trip unchanged. With an upstream
+    backend, writes go there first and the table is only a read mirror;
+    without one, rows are flagged local until a sync pushes them.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path, upstream=None):
+        self.path = path
+        self.upstream = upstream
+        self._local = threading.local()
+        self._create_schema()
+
+    @property
+    def destination(self):
+        return self.upstream.destination if self.upstream is not None else "der lokalen Datenbank"
+
+    @property
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        columns = ", ".join(f'"{column}" TEXT' for column in SHEET_COLUMNS)
+        with self._conn as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS rows (id INTEGER PRIMARY KEY AUTOINCREMENT, {columns}, extra TEXT, "
+                         "local INTEGER NOT NULL DEFAULT 0)")
+            if 'local' not in {record['name'] for record in conn.execute("PRAGMA table_info(rows)")}:
+                conn.execute("ALTER TABLE rows ADD COLUMN local INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_rows_player ON rows (player, date)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_rows_player_id ON rows (player, id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_rows_game_id ON rows (game_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_rows_date ON rows (date)")
+
+    def _to_dict(self, record):
+        row = {column: record[column] for column in SHEET_COLUMNS if record[column] is not None}
+        if record['extra']:
+            row.update(json.loads(record['extra']))
+        return row
+
+    def _select(self, where="", params=(), order="id", limit=None):
+        sql = f"SELECT * FROM rows {where} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = tuple(params) + (int(limit),)
+        return [self._to_dict(record) for record in self._conn.execute(sql, params)]
+
+    def player_rows(self, player_name):
+        return self._select("WHERE player = ?", (player_name,))
+
+    def rows_for_players(self, player_names):
+        placeholders = ", ".join("?" for _ in player_names)
+        return self._select(f"WHERE player IN ({placeholders})", tuple(player_names))
+
+    def recent_player_rows(self, player_name, limit):
+        return self._select("WHERE player = ?", (player_name,), order="date DESC, id DESC", limit=limit)
+
+    def all_rows(self):
+        return self._select()
+
+    def iter_rows(self, player_name=None, date_from=None, date_to=None, page_size=1000):
+        # Keyset pagination on id: every page is an index range scan
+        conditions, params = ["id > ?"], []
+        if player_name:
+            conditions.append("player = ?")
+            params.append(player_name)
+        if date_from:
+            conditions.append("date >= ?")
+            params.append(date_from)
+        if date_to:
+            # Dates may carry a time part; compare on the day
+            conditions.append("substr(date, 1, 10) <= ?")
+            params.append(date_to)
+        sql = f"SELECT * FROM rows WHERE {' AND '.join(conditions)} ORDER BY id LIMIT ?"
+        last_id = 0
+        while True:
+            records = self._conn.execute(sql, (last_id, *params, page_size)).fetchall()
+            for record in records:
+                yield self._to_dict(record)
+            if len(records) < page_size:
+                return
+            last_id = records[-1]['id']
+
+    def player_activity(self):
+        return [dict(record) for record in self._conn.execute(
+            "SELECT player, game_id, MAX(date) AS date, COUNT(*) AS rows FROM rows "
+            "WHERE player IS NOT NULL AND player != '' GROUP BY player, game_id")]
+
+    def _records(self, rows):
+        for row in rows:
+            extra = {k: v for k, v in row.items() if k not in SHEET_COLUMNS}
+            yield tuple(None if row.get(c) is None else str(row.get(c)) for c in SHEET_COLUMNS) + (
+                json.dumps(extra) if extra else None,)
+
+    def _insert(self, conn, rows, local=False):
+        columns = ", ".join(f'"{column}"' for column in SHEET_COLUMNS)
+        placeholders = ", ".join("?" for _ in range(len(SHEET_COLUMNS) + 2))
+        conn.executemany(f"INSERT INTO rows ({columns}, extra, local) VALUES ({placeholders})",
+                         (record + (int(local),) for record in self._records(rows)))
+
+    def append_rows(self, rows):
+        # Upstream first: a failed sheet write leaves the mirror untouched
+        created = self.upstream.append_rows(rows) if self.upstream is not None else len(rows)
+        with self._conn as conn:
+            self._insert(conn, rows, local=self.upstream is None)
+        return created
+
+    def local_rows(self):
+        """(last id, rows) of rows saved here that are not in the sheet yet"""
+        records = self._conn.execute("SELECT * FROM rows WHERE local = 1 ORDER BY id").fetchall()
+        return (records[-1]['id'] if records else 0), [self._to_dict(record) for record in records]
+
+    def replace_all(self, rows, pushed_up_to=0):
+        """Replace the mirrored rows in one transaction (used by the sheet sync).
+
+        Local rows survive unless their id is at most pushed_up_to, i.e. the
+        sync already appended them to the sheet that rows was read from.
+        """
+        with self._conn as conn:
+            conn.execute("DELETE FROM rows WHERE local = 0 OR id <= ?", (pushed_up_to,))
+            self._insert(conn, rows)
+        return len(rows)
+
+
+def create_storage(backend, sheetdb_url=None, sheetdb_client=None, sqlite_path=None):
+    """Build the configured backend, or None if it is not configured"""
+    if backend == "sqlite":
+        upstream = SheetDBBackend(sheetdb_url, sheetdb_client) if sheetdb_url else None
+        return SQLiteBackend(sqlite_path, upstream)
+    if backend == "sheetdb":
+        return SheetDBBackend(sheetdb_url, sheetdb_client) if sheetdb_url else None
+    raise ValueError(f"Unbekanntes Storage-Backend: {backend}")
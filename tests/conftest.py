@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """The Flask app on a throwaway SQLite store, imported once per run"""
+    workdir = tmp_path_factory.mktemp('app')
+    os.environ.update(
+        STORAGE_BACKEND='sqlite',
+        SQLITE_PATH=str(workdir / 'rows.sqlite'),
+        EXTRACTION_CACHE_DIR=str(workdir / 'extraction-cache'),
+        TRAINING_BATCH_DIR=str(workdir / 'training-batches'),
+    )
+    os.environ.pop('SHEETSDB_URL', None)
+    import app
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
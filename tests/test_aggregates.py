@@ -0,0 +1,45 @@
+from aggregates import AggregateStore
+from trends import TrendStore
+
+
+def _row(player, score=60, game_id='g1'):
+    return {'player': player, 'game_id': game_id, 'date': '2024-01-01', 'points': score,
+            'score': score, 'rest': 100}
+
+
+def test_write_during_load_is_not_lost():
+    store = AggregateStore()
+
+    def loader(names):
+        # A save lands after the rows were fetched but before they are installed
+        rows = [_row('Anna')]
+        store.apply_rows([_row('Anna', 100)])
+        return rows
+
+    assert store.stats(['Anna'], loader)['Anna']['total_games'] == 1
+    reloaded = store.stats(['Anna'], lambda names: [_row('Anna'), _row('Anna', 100)])
+    assert reloaded['Anna']['total_games'] == 2
+
+
+def test_entries_expire_after_ttl():
+    store = AggregateStore(ttl=0)
+    store.stats(['Anna'], lambda names: [_row('Anna')])
+    # Edited in the sheet: the next lookup reloads instead of serving the old entry
+    assert store.stats(['Anna'], lambda names: [_row('Anna'), _row('Anna')])['Anna']['total_games'] == 2
+
+
+def test_fresh_entries_are_updated_by_writes():
+    store = AggregateStore(ttl=None)
+    store.stats(['Anna'], lambda names: [_row('Anna')])
+    store.apply_rows([_row('Anna')])
+    assert store.stats(['Anna'], lambda names: [])['Anna']['total_games'] == 2
+
+
+def test_rebuild_leaves_out_players_written_since_fetch():
+    store = TrendStore()
+    stamp = store.version
+    rows = [_row('Anna'), _row('Ben')]
+    store.apply_rows([_row('Anna', game_id='g2')])
+    store.rebuild(rows, stamp)
+    legs, _ = store.series('Anna', lambda names: rows + [_row('Anna', game_id='g2')], 5)
+    assert legs == 2
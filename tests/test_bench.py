@@ -0,0 +1,44 @@
+import requests
+
+from bench.stubs import start_stubs
+from bench.synthetic import generate_rows, rows_to_export
+from storage import SheetDBBackend
+
+
+def test_synthetic_legs_follow_the_501_rules():
+    rows = generate_rows(2000, players=4, seed=5)
+    assert len(rows) == 2000
+    assert rows == generate_rows(2000, players=4, seed=5)
+    remaining = {}
+    for row in rows:
+        key = (row['game_id'], row['player'])
+        start = remaining.get(key, 501)
+        score, rest = int(row['score']), int(row['rest'])
+        if row['bust'] == 'true':
+            assert (score, rest) == (0, start)
+        else:
+            assert rest == start - score
+        if rest == 0:
+            last = [row[f'throw{i}'] for i in (1, 2, 3) if row[f'throw{i}']][-1]
+            assert last.startswith('D')
+        remaining[key] = rest
+
+
+def test_export_groups_visits_into_legs():
+    rows = generate_rows(300, seed=2)
+    export = rows_to_export(rows)
+    assert len(export['legs']) == len({row['game_id'] for row in rows})
+    assert sum(len(leg['visits']) for leg in export['legs']) == 300
+
+
+def test_sheetdb_stub_serves_the_storage_backend():
+    servers = start_stubs(latency=0, jitter=0, rows=generate_rows(50, players=2, seed=3))
+    try:
+        with requests.Session() as session:
+            backend = SheetDBBackend(servers['sheetdb'].url + '/', session)
+            assert len(list(backend.iter_rows(page_size=20))) == 50
+            backend.append_rows([{'player': 'Stub', 'game_id': 'g', 'score': '60'}])
+            assert backend.player_rows('Stub') == [{'player': 'Stub', 'game_id': 'g', 'score': '60'}]
+    finally:
+        for server in servers.values():
+            server.stop()
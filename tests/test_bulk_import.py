@@ -0,0 +1,103 @@
+import io
+import zipfile
+
+import pytest
+
+from bulk_import import UploadLimitExceeded, iter_upload_files, run_bulk_import
+
+
+class _Upload:
+    def __init__(self, filename, content, mimetype='application/zip'):
+        self.filename = filename
+        self.mimetype = mimetype
+        self._content = content
+
+    def read(self):
+        return self._content
+
+
+class _CountingZip(zipfile.ZipFile):
+    reads = 0
+
+    def read(self, name, pwd=None):
+        _CountingZip.reads += 1
+        return super().read(name, pwd)
+
+
+def _zip(members, size=10):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for i in range(members):
+            archive.writestr(f'sheet{i}.png', b'x' * size)
+    return _Upload('sheets.zip', buffer.getvalue())
+
+
+def _allowed(name):
+    return name.endswith('.png')
+
+
+@pytest.fixture
+def counting_zip(monkeypatch):
+    _CountingZip.reads = 0
+    monkeypatch.setattr(zipfile, 'ZipFile', _CountingZip)
+    return _CountingZip
+
+
+def test_stops_reading_members_past_the_file_limit(counting_zip):
+    with pytest.raises(UploadLimitExceeded):
+        list(iter_upload_files([_zip(50)], _allowed, max_files=5))
+    assert counting_zip.reads == 5
+
+
+def test_stops_reading_members_past_the_total_size(counting_zip):
+    with pytest.raises(UploadLimitExceeded):
+        list(iter_upload_files([_zip(50, size=100)], _allowed, max_total_bytes=350))
+    assert counting_zip.reads == 3
+
+
+def test_within_limits_yields_every_member():
+    files = list(iter_upload_files([_zip(5)], _allowed, max_files=5, max_total_bytes=50))
+    assert [name for name, _, _, _ in files] == [f'sheet{i}.png' for i in range(5)]
+
+
+class _Job:
+    def update(self, **fields):
+        pass
+
+
+def _run(files, write, resume=None):
+    ids = iter(f'imported_1_{i:06x}' for i in range(100))
+    return run_bulk_import(
+        _Job(), files,
+        extract=lambda content, filename, mimetype: (content, False, None),
+        transform=lambda data, import_id: {"data": [{"game_id": import_id, "round": i} for i in range(data)]},
+        write=write,
+        new_import_id=lambda: next(ids),
+        resume=resume,
+        workers=1,
+        batch_size=2,
+    )
+
+
+def test_a_retry_resumes_each_file_without_writing_rows_twice():
+    stored = []
+    calls = []
+
+    def flaky(rows):
+        calls.append(len(rows))
+        if len(calls) == 2:
+            raise RuntimeError("sheet down")
+        stored.extend(rows)
+
+    files = [('a.png', 5, 'image/png', None)]
+    first = _run(files, flaky)
+    result, = first["files"]
+    assert result["status"] == "failed"
+    # Later batches of a failed file are skipped, so what was written is a prefix
+    assert [row["round"] for row in stored] == list(range(result["rows_written"]))
+
+    second = _run(files, stored.extend, resume=[{"import_id": result["import_id"], "start": result["rows_written"]}])
+    assert second["files"][0]["status"] == "imported"
+    assert second["files"][0]["rows_written"] == 5
+    assert [row["round"] for row in stored] == list(range(5))
+    assert {row["game_id"] for row in stored} == {result["import_id"]}
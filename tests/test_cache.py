@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+import cache as cache_module
+from cache import TTLCache
+
+
+def test_get_or_load_many_loads_only_the_misses_in_one_call():
+    cache = TTLCache()
+    cache.set('a', 1)
+    calls = []
+
+    def load(keys):
+        calls.append(keys)
+        return {key: key.upper() for key in keys}
+
+    assert cache.get_or_load_many(['a', 'b', 'c', 'b'], load) == {'a': 1, 'b': 'B', 'c': 'C'}
+    assert calls == [['b', 'c']]
+    assert cache.get_or_load_many(['b', 'c'], load) == {'b': 'B', 'c': 'C'}
+    assert len(calls) == 1
+
+
+def test_get_or_load_many_skips_storing_after_an_invalidation():
+    cache = TTLCache()
+
+    def load(keys):
+        cache.invalidate()  # a write lands while the rows are being read
+        return {key: 'stale' for key in keys}
+
+    assert cache.get_or_load_many(['a'], load) == {'a': 'stale'}
+    assert cache.get('a') is None
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache_module, 'time', clock)
+    cache = TTLCache(default_ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2, ttl=5)
+    clock.now += 10
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    clock.now += 60
+    assert cache.get('a') is None
+    assert cache.get_or_load('a', lambda: 3) == 3
+    assert cache.stats()['misses'] == 1
+
+
+def test_evicts_the_least_recently_used_entry():
+    cache = TTLCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')  # 'b' is now the oldest
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache()
+    release = threading.Event()
+    calls = []
+
+    def load():
+        calls.append(1)
+        release.wait(5)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load('k', load))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()['misses'] < 8 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ['value'] * 8
+    assert len(calls) == 1
+    assert cache.stats()['in_flight'] == 0
+
+
+def test_a_failed_load_is_not_cached():
+    cache = TTLCache()
+
+    def fail():
+        raise RuntimeError('sheet down')
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load('k', fail)
+    assert cache.get_or_load('k', lambda: 'ok') == 'ok'
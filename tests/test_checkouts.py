@@ -0,0 +1,62 @@
+import pytest
+
+from checkouts import CheckoutTable, checkout_table, parse_doubles
+
+BOGEY_NUMBERS = (159, 162, 163, 165, 166, 168, 169)
+
+
+@pytest.fixture(scope='module')
+def table():
+    return checkout_table()
+
+
+def test_170_is_treble_treble_bull(table):
+    assert table.suggest(170) == ['T20', 'T20', 'D25']
+    assert table.min_darts(170) == 3
+
+
+@pytest.mark.parametrize('score', BOGEY_NUMBERS)
+def test_bogey_numbers_have_no_route(table, score):
+    assert table.suggest(score) is None
+    assert table.routes(score) == {}
+
+
+def test_every_route_adds_up_and_ends_on_a_double(table):
+    points = {'S': 1, 'D': 2, 'T': 3}
+    for score, routes in table.to_dict().items():
+        for darts, route in routes.items():
+            assert len(route) == darts
+            assert sum(points[t[0]] * int(t[1:]) for t in route) == score
+            assert route[-1].startswith('D')
+    assert [score for score in range(2, 171) if not table.routes(score)] == list(BOGEY_NUMBERS)
+
+
+def test_fewest_darts_within_the_darts_left(table):
+    assert table.suggest(40) == ['D20']
+    assert table.suggest(100, darts_left=1) is None
+    assert len(table.suggest(100, darts_left=2)) == 2
+
+
+def test_preferred_double_is_used_when_it_costs_nothing_extra():
+    assert CheckoutTable(('D16',)).suggest(32) == ['D16']
+    assert CheckoutTable(('D16',)).suggest(72)[-1] == 'D16'
+
+
+def test_out_of_range_scores():
+    table = checkout_table()
+    assert table.suggest(1) is None
+    assert table.suggest(171) is None
+    assert table.min_darts(1) is None
+
+
+def test_parse_doubles_normalizes_and_drops_the_rest():
+    assert parse_doubles('D16, d8,bull,T20,d16') == ('D16', 'D8', 'D25')
+
+
+def test_checkout_endpoint(client):
+    body = client.get('/api/checkout/170').get_json()
+    assert body['checkout'] is True
+    assert body['route'] == ['T20', 'T20', 'D25']
+    assert client.get('/api/checkout/169').get_json()['route'] is None
+    assert client.get('/api/checkout/171').status_code == 400
+    assert client.get('/api/checkout/40?darts=4').status_code == 400
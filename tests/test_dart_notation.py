@@ -0,0 +1,54 @@
+from dart_notation import parse_visits, tokenize
+
+
+def _summary(visits):
+    return [(v['player'], [t.notation for t in v['throws']], v['score']) for v in visits]
+
+
+def test_keyed_export_credits_darts_to_named_players():
+    data = {'players': [
+        {'player': 'Alice', 'throw1': 'T20', 'throw2': 'T20', 'throw3': 'T20'},
+        {'player': 'Bob', 'throw1': '20', 'throw2': 'D10', 'throw3': 'S5'},
+    ]}
+    assert _summary(parse_visits(data)) == [
+        ('Alice', ['T20', 'T20', 'T20'], 180),
+        ('Bob', ['S20', 'D10', 'S5'], 45),
+    ]
+
+
+def test_dict_keys_never_become_tokens():
+    assert list(tokenize({'PPR': 55.3, 'throw1': '', 'dart2': None})) == []
+    assert list(tokenize({'game': 'Leg 1', 'PPR': 55.3})) == [('leg', 1)]
+
+
+def test_values_outside_player_keys_do_not_name_players():
+    data = {'notes': 'ABC', 'player': 'Alice', 'throws': ['T20', 'T20', 'T20']}
+    assert [v['player'] for v in parse_visits(data)] == ['Alice']
+
+
+def test_free_text_still_detects_players():
+    visits = parse_visits("PLAYER1 T20 T20 T20 PLAYER2 S1 S1 S1")
+    assert [(v['player'], v['score']) for v in visits] == [('PLAYER1', 180), ('PLAYER2', 3)]
+
+
+def test_short_visits_close_at_the_next_player_and_row_end():
+    data = {'players': [
+        {'player': 'A', 'throw1': 'T20', 'throw2': 'T20', 'throw3': ''},
+        {'player': 'B', 'throw1': 'S20', 'throw2': 'S20', 'throw3': 'S20'},
+        {'player': 'A', 'throw1': 'T20', 'throw2': 'T20', 'throw3': 'T20'},
+    ]}
+    visits = parse_visits(data)
+    assert [(v['player'], v['round'], v['score'], v['rest']) for v in visits] == [
+        ('A', 1, 120, 381),
+        ('B', 1, 60, 441),
+        ('A', 2, 180, 201),
+    ]
+
+
+def test_free_text_closes_a_visit_when_the_next_player_is_named():
+    visits = parse_visits("PLAYER1 T20 T20 PLAYER2 S1 S1 S1 PLAYER1 S5")
+    assert _summary(visits) == [
+        ('PLAYER1', ['T20', 'T20'], 120),
+        ('PLAYER2', ['S1', 'S1', 'S1'], 3),
+        ('PLAYER1', ['S5'], 5),
+    ]
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+
+import pytest
+
+from export import csv_chunks, export_chunks, ndjson_chunks
+
+
+def _rows(count, player='Erik'):
+    return ({'player': player, 'game_id': f'g{i // 10}', 'round': i % 10 + 1, 'date': '2024-02-01',
+             'score': 60, 'rest': 441, 'throw1': 'T20'} for i in range(count))
+
+
+def test_csv_is_emitted_in_batches_with_one_header():
+    chunks = list(csv_chunks(_rows(1201), batch_size=500))
+    assert len(chunks) == 3
+    records = list(csv.DictReader(io.StringIO(''.join(chunks))))
+    assert len(records) == 1201
+    assert records[0]['throw1'] == 'T20'
+
+
+def test_ndjson_has_one_line_per_row():
+    chunks = list(ndjson_chunks(_rows(1000), batch_size=500))
+    assert len(chunks) == 2
+    lines = ''.join(chunks).splitlines()
+    assert len(lines) == 1000
+    assert json.loads(lines[-1])['round'] == 10
+
+
+def test_export_reads_rows_lazily():
+    consumed = []
+
+    def rows():
+        for row in _rows(2000):
+            consumed.append(row)
+            yield row
+
+    chunks = export_chunks(rows(), 'ndjson')
+    next(chunks)
+    assert len(consumed) == 500
+
+
+def test_parquet_keeps_every_row_typed():
+    pq = pytest.importorskip('pyarrow.parquet')
+    data = b''.join(export_chunks(_rows(2500), 'parquet'))
+    table = pq.read_table(io.BytesIO(data))
+    assert table.num_rows == 2500
+    assert table.column('score').to_pylist()[:2] == [60, 60]
+
+
+def test_export_endpoint_streams_every_row_across_pages(client, app_module, monkeypatch):
+    app_module.storage.append_rows(list(_rows(23, player='Export')))
+    monkeypatch.setattr(app_module, 'EXPORT_PAGE_SIZE', 5)
+    response = client.get('/api/export?player=Export&format=csv')
+    assert response.status_code == 200
+    assert 'Export-start-heute.csv' in response.headers['Content-Disposition']
+    records = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(records) == 23
+    assert {record['player'] for record in records} == {'Export'}
+
+
+def test_export_endpoint_rejects_bad_input(client):
+    assert client.get('/api/export?format=xml').status_code == 400
+    assert client.get('/api/export?from=gestern').status_code == 400
@@ -0,0 +1,47 @@
+from features import recent_legs
+from storage import SheetDBBackend
+
+
+class _Response:
+    status_code = 200
+
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class _SheetClient:
+    """Answers like SheetDB: matching rows in sheet order, oldest first"""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def get(self, url, params=None):
+        params = params or {}
+        rows = [row for row in self.rows if 'player' not in params or row['player'] == params['player']]
+        if 'limit' in params:
+            rows = rows[:int(params['limit'])]
+        return _Response(rows)
+
+
+def _sheet(legs, rounds=3):
+    return [{'player': 'Anna', 'game_id': f'leg{leg}', 'date': f'2024-01-{leg + 1:02d}', 'round': str(r)}
+            for leg in range(legs) for r in range(1, rounds + 1)]
+
+
+def test_recent_legs_are_the_newest_on_sheetdb():
+    backend = SheetDBBackend('http://sheet.invalid', _SheetClient(_sheet(legs=12)))
+    rows = backend.recent_player_rows('Anna', limit=5 * 3)
+    assert [row['game_id'] for row in recent_legs(rows, 5)][::3] == ['leg11', 'leg10', 'leg9', 'leg8', 'leg7']
+
+
+def test_same_day_legs_keep_sheet_order():
+    sheet = _sheet(legs=4)
+    for row in sheet:
+        row['date'] = '2024-01-01'
+    backend = SheetDBBackend('http://sheet.invalid', _SheetClient(sheet))
+    rows = backend.recent_player_rows('Anna', limit=6)
+    assert recent_legs(rows, 2)[0]['game_id'] == 'leg3'
+    assert {row['game_id'] for row in recent_legs(rows, 2)} == {'leg3', 'leg2'}
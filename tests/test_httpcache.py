@@ -0,0 +1,64 @@
+import gzip
+
+from httpcache import DataVersion, matching_etag
+
+
+def _tag(response):
+    return response.headers['ETag']
+
+
+def test_checkout_etag_survives_writes(client, app_module):
+    first = client.get('/api/checkouts')
+    app_module.data_version.bump()
+    second = client.get('/api/checkouts')
+    assert _tag(first) == _tag(second)
+    assert client.get('/api/checkout/170', headers={'If-None-Match': _tag(first)}).status_code == 200
+    assert client.get('/api/checkouts', headers={'If-None-Match': _tag(first)}).status_code == 304
+
+
+def test_304_repeats_the_compressed_tag(client):
+    full = client.get('/api/checkouts', headers={'Accept-Encoding': 'gzip'})
+    assert full.headers['Content-Encoding'] == 'gzip'
+    assert _tag(full).endswith('+gzip"')
+    revalidated = client.get('/api/checkouts', headers={'Accept-Encoding': 'gzip', 'If-None-Match': _tag(full)})
+    assert revalidated.status_code == 304
+    assert _tag(revalidated) == _tag(full)
+
+
+def test_data_routes_change_tag_on_write(client, app_module):
+    first = client.get('/api/player-stats/Anna')
+    app_module.data_version.bump()
+    assert client.get('/api/player-stats/Anna', headers={'If-None-Match': _tag(first)}).status_code == 200
+
+
+def test_data_route_round_trip(client, app_module):
+    first = client.get('/api/player-stats/Anna')
+    assert client.get('/api/player-stats/Anna', headers={'If-None-Match': _tag(first)}).status_code == 304
+    app_module.data_version.bump()
+    second = client.get('/api/player-stats/Anna', headers={'If-None-Match': _tag(first)})
+    assert second.status_code == 200
+    assert _tag(second) != _tag(first)
+
+
+def test_compressed_body_decodes_to_the_plain_one(client):
+    plain = client.get('/api/checkouts')
+    compressed = client.get('/api/checkouts', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert gzip.decompress(compressed.data) == plain.data
+    assert len(compressed.data) < len(plain.data)
+
+
+def test_matching_etag_handles_lists_weak_tags_and_star():
+    assert matching_etag('"aaa", W/"bbb+gzip"', 'bbb') == 'bbb+gzip'
+    assert matching_etag('"aaa"', 'bbb') is None
+    assert matching_etag('*', 'bbb') == 'bbb'
+    assert matching_etag(None, 'bbb') is None
+
+
+def test_data_version_tags_differ_per_key_and_version():
+    version = DataVersion()
+    tag = version.etag('/api/a')
+    assert tag != version.etag('/api/b')
+    version.bump()
+    assert tag != version.etag('/api/a')
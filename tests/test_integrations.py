@@ -0,0 +1,37 @@
+import pytest
+import requests
+
+from integrations import CircuitBreaker, IntegrationClient
+
+
+def _half_open(breaker):
+    breaker.record_failure()
+    breaker.opened_at -= breaker.reset_timeout
+
+
+def test_unexpected_error_during_trial_reopens_instead_of_wedging():
+    client = IntegrationClient('Test', failure_threshold=1, reset_timeout=30, retries=0)
+    _half_open(client.breaker)
+
+    def broken(*args, **kwargs):
+        raise requests.exceptions.ChunkedEncodingError("truncated")
+
+    client.session.request = broken
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        client.get('http://upstream.invalid/')
+    client.breaker.opened_at -= client.breaker.reset_timeout
+    assert client.breaker.allow()
+
+
+def test_abandoned_guard_frees_the_trial():
+    breaker = CircuitBreaker('Test', failure_threshold=1)
+    _half_open(breaker)
+
+    def stream():
+        with breaker.guard():
+            yield 'delta'
+
+    events = stream()
+    next(events)
+    events.close()  # client disconnected: GeneratorExit inside guard()
+    assert breaker.allow()
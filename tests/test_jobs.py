@@ -0,0 +1,71 @@
+import json
+import threading
+
+import pytest
+
+from jobs import JobQueue, QueueFull, job_events
+
+
+def _wait(job):
+    for _ in job_events(job, heartbeat=5):
+        pass
+    return job
+
+
+def test_a_job_reports_progress_then_its_result():
+    queue = JobQueue(workers=1)
+
+    def work(job, count):
+        job.update(progress=50, message='halb')
+        return {"count": count}
+
+    job = queue.submit('extract', work, 3)
+    events = [json.loads(event[len('data: '):]) for event in job_events(job, heartbeat=5)]
+    assert events[-1]['status'] == 'done'
+    assert events[-1]['result'] == {"count": 3}
+    assert events[-1]['progress'] == 100
+    assert queue.get(job.id) is job
+
+
+def test_a_failing_job_keeps_the_error():
+    queue = JobQueue(workers=1)
+
+    def work(job):
+        raise RuntimeError('ParseExtract nicht erreichbar')
+
+    job = _wait(queue.submit('extract', work))
+    assert (job.status, job.error) == ('failed', 'ParseExtract nicht erreichbar')
+
+
+def test_a_full_queue_refuses_jobs():
+    queue = JobQueue(workers=1, max_queue=1)
+    release = threading.Event()
+    running = threading.Event()
+
+    def block(job):
+        running.set()
+        release.wait(5)
+
+    first = queue.submit('extract', block)
+    assert running.wait(5)
+    queue.submit('extract', block)
+    with pytest.raises(QueueFull):
+        queue.submit('extract', block)
+    release.set()
+    _wait(first)
+
+
+def test_finished_jobs_are_pruned_after_retention():
+    queue = JobQueue(workers=1, retention=-1)
+    job = _wait(queue.submit('extract', lambda job: None))
+    queue.submit('extract', lambda job: None)
+    assert queue.get(job.id) is None
+
+
+def test_job_routes(client, app_module):
+    assert client.get('/api/jobs/unknown').status_code == 404
+    job = _wait(app_module.job_queue.submit('extract', lambda job: {"rows": 2}))
+    body = client.get(f'/api/jobs/{job.id}').get_json()
+    assert body['job']['result'] == {"rows": 2}
+    events = client.get(f'/api/jobs/{job.id}/events').get_data(as_text=True)
+    assert '"status": "done"' in events
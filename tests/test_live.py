@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from live import LiveBoard, LiveError, WriteBehind, live_events
+
+
+def test_start_leg_rejects_duplicate_and_empty_names():
+    board = LiveBoard()
+    with pytest.raises(LiveError):
+        board.start_leg(['Anna', 'Anna'])
+    with pytest.raises(LiveError):
+        board.start_leg([' '])
+    assert [p['name'] for p in board.start_leg(['Anna', 'Ben'])['players']] == ['Anna', 'Ben']
+
+
+def test_visits_take_turns_until_a_double_finishes_the_leg():
+    board = LiveBoard()
+    leg_id = board.start_leg(['Anna', 'Ben'], start_score=301)['id']
+    board.add_visit(leg_id, ['T20', 'T20', 'T20'], 'Anna')
+    with pytest.raises(LiveError):
+        board.add_visit(leg_id, ['S1', 'S1', 'S1'], 'Anna')
+    board.add_visit(leg_id, ['S1', 'S1', 'S1'], 'Ben')
+    leg, row = board.add_visit(leg_id, ['T20', 'S11', 'DB'], 'Anna')
+    assert leg['winner'] == 'Anna'
+    assert (row['score'], row['rest'], row['round']) == ('121', '0', '2')
+    with pytest.raises(LiveError):
+        board.add_visit(leg_id, ['S1', 'S1', 'S1'], 'Ben')
+
+
+def test_write_behind_keeps_failed_rows_and_reports_full():
+    attempts = []
+
+    def write(rows):
+        attempts.append(list(rows))
+        raise RuntimeError("sheet down")
+
+    writer = WriteBehind(write, batch_size=2, max_pending=3)
+    for i in range(3):
+        writer._pending.append(i)
+    assert writer.full
+    assert writer.flush() is False
+    assert attempts == [[0, 1]]
+    assert writer.stats()["pending"] == 3
+    assert writer.stats()["failures"] == 1
+
+
+def test_a_bust_resets_the_score_and_passes_the_turn():
+    board = LiveBoard()
+    leg_id = board.start_leg(['Anna', 'Ben'], start_score=301)['id']
+    board.add_visit(leg_id, ['T20', 'T20', 'T20'])
+    board.add_visit(leg_id, ['T20', 'T20', 'T20'])
+    # Leaving 1 busts on the second dart, which ends the visit
+    leg, row = board.add_visit(leg_id, ['T20', 'T20'])
+    assert (row['score'], row['rest'], row['bust']) == ('0', '121', 'true')
+    assert leg['to_throw'] == 'Ben'
+    # Checking out on a single busts as well
+    leg, row = board.add_visit(leg_id, ['T20', 'T17', 'S10'])
+    assert (row['rest'], row['bust']) == ('121', 'true')
+    with pytest.raises(LiveError):
+        board.add_visit(leg_id, ['T20', 'T20', 'S1', 'S1'])
+    with pytest.raises(LiveError):
+        board.add_visit(leg_id, ['T20', 'S1'])
+    leg, _ = board.add_visit(leg_id, ['T20', 'T7', 'D20'])
+    assert leg['winner'] == 'Anna'
+
+
+def test_events_stream_each_visit_and_end_with_the_leg():
+    board = LiveBoard()
+    leg_id = board.start_leg(['Anna'], start_score=301)['id']
+    events = live_events(board, leg_id)
+    assert json.loads(next(events)[len('data: '):])['leg']['players'][0]['remaining'] == 301
+    board.add_visit(leg_id, ['T20', 'T20', 'T20'])
+    assert json.loads(next(events)[len('data: '):])['leg']['players'][0]['remaining'] == 121
+    board.add_visit(leg_id, ['T20', 'T7', 'D20'])
+    assert json.loads(next(events)[len('data: '):])['leg']['winner'] == 'Anna'
+    assert next(events, None) is None
+
+
+def test_write_behind_writes_in_batches_and_drains_on_close():
+    batches = []
+    writer = WriteBehind(batches.append, batch_size=2, interval=60)
+    for i in range(5):
+        writer.put(i)
+    writer.close()
+    assert sum(batches, []) == list(range(5))
+    assert all(len(batch) <= 2 for batch in batches)
+    assert writer.stats()["written"] == 5
@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.mark.parametrize('body', [{'players': 'Bob'}, {'players': []}, {'players': ['Anna', '']},
+                                  {'players': ['Anna', 3]}, ['Anna'], {}])
+def test_start_leg_needs_a_list_of_names(client, body):
+    response = client.post('/api/live/legs', json=body)
+    assert response.status_code == 400
+    assert 'players' in response.get_json()['error']
+
+
+def test_start_leg_keeps_names_whole(client):
+    response = client.post('/api/live/legs', json={'players': ['Bob', 'Anna']})
+    assert response.status_code == 201
+    assert [p['name'] for p in response.get_json()['leg']['players']] == ['Bob', 'Anna']
+
+
+def test_visits_are_refused_while_the_write_backlog_is_full(client, app_module, monkeypatch):
+    leg = client.post('/api/live/legs', json={'players': ['Bob']}).get_json()['leg']
+    monkeypatch.setattr(app_module.live_writer, 'max_pending', 0)
+    response = client.post(f"/api/live/legs/{leg['id']}/visits", json={'throws': ['T20', 'T20', 'T20']})
+    assert response.status_code == 503
+    assert 'dartcoach_live_pending_rows' in client.get('/metrics').get_data(as_text=True)
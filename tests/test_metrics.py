@@ -0,0 +1,61 @@
+import pytest
+from flask import Flask
+
+from metrics import Histogram, Metrics, instrument_app, metrics_response
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram('latency_seconds', 'Latency', ('route',), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 5):
+        histogram.observe(value, route='/a')
+    text = histogram.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{route="/a"} 4' in text
+    assert 'latency_seconds_sum{route="/a"} 6.05' in text
+
+
+def test_requests_are_counted_per_route_and_status():
+    app = Flask(__name__)
+    metrics = Metrics(prefix='test')
+    instrument_app(app, metrics)
+
+    @app.route('/items/<int:item>')
+    def item(item):
+        with metrics.phase('lookup'):
+            return {'item': item}
+
+    @app.route('/metrics')
+    def exposition():
+        return metrics_response(metrics)
+
+    client = app.test_client()
+    client.get('/items/1')
+    client.get('/items/2')
+    client.get('/missing')
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'test_http_requests_total{route="/items/<int:item>",method="GET",status="200"} 2' in text
+    assert 'test_http_requests_total{route="<unmatched>",method="GET",status="404"} 1' in text
+    assert 'test_phase_duration_seconds_count{phase="lookup"} 2' in text
+    assert 'test_http_requests_in_flight{route="/items/<int:item>"} 0' in text
+
+
+def test_a_failed_upstream_call_counts_as_error():
+    metrics = Metrics(prefix='test')
+    with pytest.raises(ConnectionError):
+        with metrics.upstream('sheetdb', 'GET'):
+            raise ConnectionError()
+    with metrics.upstream('sheetdb', 'GET') as call:
+        call['status'] = 200
+        call['response_bytes'] = 512
+    text = metrics.render()
+    assert 'test_upstream_requests_total{upstream="sheetdb",method="GET",status="error"} 1' in text
+    assert 'test_upstream_requests_total{upstream="sheetdb",method="GET",status="200"} 1' in text
+    assert 'test_upstream_requests_in_flight{upstream="sheetdb"} 0' in text
+
+
+def test_app_metrics_endpoint(client):
+    client.get('/api/checkout/40')
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'dartcoach_http_requests_total{route="/api/checkout/<int:score>",method="GET",status="200"}' in text
@@ -0,0 +1,106 @@
+import pytest
+
+import notion_export
+from notion_export import (MAX_BLOCKS_PER_REQUEST, MAX_CHILDREN, MAX_TEXT_LENGTH, NotionError, NotionExporter,
+                           chunk_blocks, export_plans, plan_blocks, split_text)
+
+
+class _Response:
+    def __init__(self, status_code=200, data=None, headers=None):
+        self.status_code = status_code
+        self._data = data or {}
+        self.headers = headers or {}
+        self.text = 'error'
+
+    def json(self):
+        return self._data
+
+
+class _Client:
+    def __init__(self, fail=None):
+        self.calls = []
+        self.fail = fail or (lambda method, url, count: None)
+
+    def request(self, method, url, headers=None, json=None, retry=True):
+        self.calls.append((method, url, json))
+        failure = self.fail(method, url, len(self.calls))
+        if failure is not None:
+            return failure
+        return _Response(data={'id': 'page1', 'url': 'https://notion.test/page1'})
+
+
+class _Limiter:
+    def __init__(self):
+        self.tokens = 0
+
+    def acquire(self):
+        self.tokens += 1
+
+
+def _exporter(client, **kwargs):
+    return NotionExporter(client, 'key', 'db', _Limiter(), backoff=0, **kwargs)
+
+
+def _plan(exercises=0, analysis='Gut gespielt.'):
+    return {'player_name': 'Anna', 'analysis': analysis, 'strengths': ['Scoring'],
+            'exercises': [{'name': f'Übung {i}', 'duration': '10 min', 'focus': 'D16'} for i in range(exercises)]}
+
+
+def test_split_text_respects_the_limit_and_keeps_the_words():
+    text = ' '.join(['dart'] * 2000)
+    chunks = split_text(text)
+    assert all(len(chunk) <= MAX_TEXT_LENGTH for chunk in chunks)
+    assert ' '.join(chunks) == text
+
+
+def test_chunks_stay_within_the_children_and_block_limits():
+    blocks = plan_blocks(_plan(exercises=2500, analysis='\n\n'.join(['Absatz'] * 150)))
+    batches = list(chunk_blocks(blocks))
+    assert sum(len(batch) for batch in batches) == len(blocks)
+    for batch in batches:
+        assert len(batch) <= MAX_CHILDREN
+        assert sum(1 + len(block[block['type']].get('children', [])) for block in batch) <= MAX_BLOCKS_PER_REQUEST
+    tables = [block for block in blocks if block['type'] == 'table']
+    assert all(len(table['table']['children']) <= MAX_CHILDREN for table in tables)
+
+
+def test_long_pages_are_created_then_appended():
+    client = _Client()
+    exporter = _exporter(client)
+    assert exporter.create_page(_plan(exercises=2500)) == 'https://notion.test/page1'
+    methods = [(method, url.rsplit('/v1', 1)[1]) for method, url, _ in client.calls]
+    assert methods[0] == ('POST', '/pages')
+    assert len(methods) > 1 and all(call == ('PATCH', '/blocks/page1/children') for call in methods[1:])
+    assert exporter.limiter.tokens == len(client.calls)
+
+
+def test_a_failed_append_archives_the_page():
+    client = _Client(fail=lambda method, url, count: _Response(400) if count == 2 else None)
+    exporter = _exporter(client)
+    with pytest.raises(NotionError):
+        exporter.create_page(_plan(exercises=2500))
+    method, url, payload = client.calls[-1]
+    assert (method, url.endswith('/pages/page1'), payload) == ('PATCH', True, {'archived': True})
+    assert exporter.stats()['pages'] == 0
+
+
+def test_rate_limited_requests_are_retried(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(notion_export.time, 'sleep', sleeps.append)
+    client = _Client(fail=lambda method, url, count: _Response(429, headers={'Retry-After': '2'}) if count < 3 else None)
+    exporter = _exporter(client)
+    exporter.create_page(_plan())
+    assert sleeps == [2.0, 2.0]
+    assert exporter.stats()['rate_limited'] == 2
+
+
+def test_export_plans_reports_each_plan_in_order():
+    client = _Client(fail=lambda method, url, count: _Response(500) if count == 1 else None)
+
+    class _Job:
+        def update(self, **fields):
+            pass
+
+    result = export_plans(_Job(), _exporter(client), [_plan(), _plan()], workers=1)
+    assert [plan['status'] for plan in result['plans']] == ['failed', 'exported']
+    assert (result['exported'], result['failed']) == (1, 1)
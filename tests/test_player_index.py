@@ -0,0 +1,55 @@
+from player_index import PlayerIndex
+
+
+def _index(*names):
+    index = PlayerIndex()
+    index.rebuild([{'player': name, 'game_id': f'g{i}', 'date': f'2024-01-{i + 1:02d}'} for i, name in enumerate(names)])
+    return index
+
+
+def test_names_come_in_case_insensitive_order_including_later_writes():
+    index = _index('carl', 'Anna', 'bob')
+    index.apply_rows([{'player': 'Bea', 'game_id': 'g9', 'date': '2024-02-01'}])
+    assert index.names() == ['Anna', 'Bea', 'bob', 'carl']
+
+
+def test_search_ranks_prefix_then_substring_then_fuzzy():
+    index = _index('Anna', 'Annika', 'Hannah', 'Ana')
+    total, page = index.search('ann')
+    assert [(p['name'], p['match']) for p in page][:3] == [('Anna', 'prefix'), ('Annika', 'prefix'), ('Hannah', 'substring')]
+    assert total == len(page)
+
+
+def test_fuzzy_matches_tolerate_typos_and_can_be_turned_off():
+    index = _index('Michael', 'Michelle', 'Bob')
+    total, page = index.search('Michal')
+    assert 'Michael' in [p['name'] for p in page if p['match'] == 'fuzzy']
+    assert index.search('Michal', fuzzy=False) == (0, [])
+
+
+def test_listing_pages_and_activity():
+    index = PlayerIndex()
+    index.rebuild([
+        {'player': 'Anna', 'game_id': 'g1', 'date': '2024-01-05'},
+        {'player': 'Anna', 'game_id': 'g2', 'date': '2024-03-01'},
+        {'player': 'Ben', 'game_id': 'g3', 'date': '2024-04-01'},
+        {'player': 'Cem', 'game_id': 'g4', 'date': '2024-02-01'},
+    ])
+    total, page = index.search(sort='recent', offset=1, limit=1)
+    assert total == 3
+    assert [p['name'] for p in page] == ['Anna']
+    assert page[0] == {'name': 'Anna', 'games': 2, 'rows': 2, 'last_played': '2024-03-01'}
+    assert [p['name'] for p in index.search(sort='games')[1]][0] == 'Anna'
+
+
+def test_writes_before_the_first_build_are_ignored_and_ensure_reloads_when_stale():
+    index = PlayerIndex()
+    index.apply_rows([{'player': 'Anna'}])
+    assert index.names() == []
+    loads = []
+    index.ensure(lambda: loads.append(1) or [{'player': 'Ben'}], ttl=60)
+    index.ensure(lambda: loads.append(1) or [], ttl=60)
+    assert loads == [1]
+    assert index.names() == ['Ben']
+    index.ensure(lambda: loads.append(1) or [], ttl=-1)
+    assert index.names() == []
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from simulator import PlayerModel, head_to_head, simulate_legs, summarize
+
+
+def _perfect():
+    return PlayerModel([60], [False], double_rate=1.0, treble_rate=1.0)
+
+
+def test_a_player_who_never_misses_throws_nine_darters():
+    assert (simulate_legs(_perfect(), 50, seed=1) == 9).all()
+
+
+def test_legs_never_finish_without_hitting_a_double():
+    darts = simulate_legs(PlayerModel([60], [False], double_rate=0.0, treble_rate=1.0), 20, seed=1)
+    assert (darts == -1).all()
+    assert summarize(darts) == {"legs": 20, "unfinished": 20}
+
+
+def test_same_seed_same_legs():
+    model = PlayerModel([20, 60, 5, 1, 19], [False] * 5, double_rate=0.3, treble_rate=0.2)
+    first = simulate_legs(model, 200, seed=7)
+    assert (first == simulate_legs(model, 200, seed=7)).all()
+    finished = first[first >= 0]
+    # Every finished leg takes at least the nine darts a perfect leg needs
+    assert len(finished) and finished.min() >= 9
+
+
+def test_summary_of_finished_legs():
+    summary = summarize(np.array([9, 12, 15, -1]))
+    assert summary["legs"] == 4
+    assert summary["unfinished"] == 1
+    assert summary["expected_darts"] == 12.0
+    assert summary["median_darts"] == 12.0
+    assert summary["three_dart_average"] == 125.25
+
+
+def test_head_to_head():
+    same = np.array([12, 15, 18, 21])
+    assert head_to_head(same, same) == pytest.approx(0.5)
+    # Always a visit ahead wins regardless of who throws first
+    assert head_to_head(np.array([9, 9]), np.array([15, 15])) == 1.0
+    # Equal visit counts: only the player throwing first wins
+    assert head_to_head(np.array([12]), np.array([10])) == 0.5
+    assert head_to_head(np.array([-1]), np.array([30])) == 0.0
+
+
+def test_model_from_rows():
+    rows = [{'player': 'A', 'game_id': 'g1', 'round': i, 'score': 100, 'rest': 501 - 100 * i,
+             'throw1': 'T20', 'throw2': 'S20', 'throw3': 'S20'} for i in range(1, 6)]
+    model = PlayerModel.from_rows(rows)
+    assert model.to_dict()["scoring_darts"] == 15
+    assert model.to_dict()["scoring_average"] == 100.0
+    with pytest.raises(ValueError):
+        PlayerModel.from_rows([{'player': 'A', 'score': 60}])
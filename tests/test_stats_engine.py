@@ -0,0 +1,48 @@
+from stats_engine import PlayerColumns, checkout_by_double, compute_advanced_stats, dart_remaining
+
+
+def _visit(game_id, round_, throws, rest, bust=False):
+    points = {'S': 1, 'D': 2, 'T': 3}
+    score = 0 if bust else sum(points[t[0]] * int(t[1:]) for t in throws)
+    return {'player': 'A', 'game_id': game_id, 'round': round_, 'score': score, 'rest': rest,
+            'bust': 'true' if bust else 'false',
+            **{f'throw{i + 1}': throw for i, throw in enumerate(throws)}}
+
+
+# A nine-darter with a 141 checkout, then an unfinished leg with a bust
+ROWS = [
+    _visit('g1', 1, ['T20', 'T20', 'T20'], 321),
+    _visit('g1', 2, ['T20', 'T20', 'T20'], 141),
+    _visit('g1', 3, ['T20', 'T19', 'D12'], 0),
+    _visit('g2', 1, ['S20', 'S1', 'S5'], 475),
+    _visit('g2', 2, ['T20', 'S20', 'D16'], 475, bust=True),
+    _visit('g2', 3, ['S8', 'D16', 'S1'], 434),
+]
+
+
+def test_remaining_before_each_dart_follows_the_visit():
+    cols = PlayerColumns(ROWS)
+    assert list(dart_remaining(cols))[6:9] == [141, 81, 24]
+
+
+def test_checkout_attempts_and_hits_per_double():
+    result = checkout_by_double(PlayerColumns(ROWS))
+    assert result['D12'] == {'attempts': 1, 'hits': 1, 'percentage': 100.0}
+
+
+def test_advanced_stats_match_a_plain_count():
+    stats = compute_advanced_stats(ROWS)
+    scores = [row['score'] for row in ROWS]
+    assert stats['visits'] == 6
+    assert stats['darts'] == 18
+    assert stats['ppr'] == round(sum(scores) / 6, 2)
+    assert stats['bust_rate'] == round(1 / 6 * 100, 2)
+    assert stats['visits_buckets']['180'] == 2
+    assert stats['visits_buckets']['140+'] == 1
+    assert sum(stats['visit_histogram'].values()) == 6
+    assert (stats['legs'], stats['finished_legs']) == (2, 1)
+    assert stats['best_leg'] == {'game_id': 'g1', 'darts': 9, 'average': 167.0}
+
+
+def test_no_rows():
+    assert compute_advanced_stats([]) == {'visits': 0}
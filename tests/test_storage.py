@@ -0,0 +1,83 @@
+import pytest
+
+from storage import SheetDBBackend, SheetsError, SQLiteBackend
+
+
+class _Response:
+    def __init__(self, data, status_code=200, text=''):
+        self._data = data
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return self._data
+
+
+class _SheetClient:
+    def __init__(self, rows):
+        self.rows = rows
+        self.requests = []
+
+    def get(self, url, params=None):
+        params = params or {}
+        self.requests.append(params)
+        return _Response([row for row in self.rows if 'player' not in params or row['player'] == params['player']])
+
+    def post(self, url, json=None, headers=None):
+        return _Response({}, status_code=500, text='quota exceeded')
+
+
+def test_rows_for_players_reads_the_sheet_once():
+    client = _SheetClient([{'player': name, 'round': '1'} for name in ('Anna', 'Ben', 'Cem', 'Dirk')])
+    rows = SheetDBBackend('https://sheetdb.test', client).rows_for_players(['Anna', 'Ben'])
+    assert sorted(row['player'] for row in rows) == ['Anna', 'Ben']
+    assert client.requests == [{}]
+
+
+def test_write_errors_keep_the_numeric_status_code():
+    backend = SheetDBBackend('https://sheetdb.test', _SheetClient([]))
+    with pytest.raises(SheetsError) as error:
+        backend.append_rows([{'player': 'Anna'}])
+    assert error.value.status_code == 500
+    assert str(error.value) == "Google Sheets Fehler: 500 - quota exceeded"
+
+
+class _Sheet:
+    destination = "Google Sheets"
+
+    def __init__(self):
+        self.rows = []
+
+    def append_rows(self, rows):
+        self.rows.extend(rows)
+        return len(rows)
+
+    def all_rows(self):
+        return list(self.rows)
+
+
+def test_sqlite_writes_through_to_the_sheet(tmp_path):
+    sheet = _Sheet()
+    mirror = SQLiteBackend(str(tmp_path / 'rows.sqlite'), sheet)
+    mirror.append_rows([{'player': 'Anna', 'round': '1'}])
+    assert sheet.rows == [{'player': 'Anna', 'round': '1'}]
+    assert mirror.local_rows() == (0, [])
+    assert mirror.destination == "Google Sheets"
+
+
+def test_sync_keeps_rows_saved_only_locally(tmp_path):
+    path = str(tmp_path / 'rows.sqlite')
+    SQLiteBackend(path).append_rows([{'player': 'Anna', 'round': '1'}])
+    sheet = _Sheet()
+    sheet.append_rows([{'player': 'Ben', 'round': '1'}])
+
+    mirror = SQLiteBackend(path, sheet)
+    last_id, local = mirror.local_rows()
+    assert [row['player'] for row in local] == ['Anna']
+    # A row saved locally after the push must survive the sync as well
+    SQLiteBackend(path).append_rows([{'player': 'Cem', 'round': '1'}])
+    sheet.append_rows(local)
+    mirror.replace_all(sheet.all_rows(), pushed_up_to=last_id)
+
+    assert sorted(row['player'] for row in mirror.all_rows()) == ['Anna', 'Ben', 'Cem']
+    assert [row['player'] for row in mirror.local_rows()[1]] == ['Cem']
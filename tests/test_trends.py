@@ -0,0 +1,89 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from trends import FIELDS, PlayerTrend, visit_counts, window_stats
+
+
+def _rows(seed=3, legs=40):
+    rng = random.Random(seed)
+    rows = []
+    for leg in range(legs):
+        day = (date(2024, 1, 1) + timedelta(days=rng.randrange(30))).isoformat()
+        rest = 501
+        for round_ in range(1, rng.randrange(3, 12)):
+            score = min(rng.choice([26, 41, 60, 85, 100, 140, 180]), rest)
+            rest -= score
+            rows.append({'player': 'A', 'game_id': f'g{leg}', 'date': day, 'round': round_,
+                         'score': score, 'rest': rest})
+            if not rest:
+                break
+    # Visits arrive out of order, so older legs are inserted after newer ones
+    rng.shuffle(rows)
+    return rows
+
+
+def _naive_legs(rows):
+    first_seen = list(dict.fromkeys(row['game_id'] for row in rows))
+    dates = {row['game_id']: row['date'] for row in rows}
+    return sorted(first_seen, key=lambda game_id: dates[game_id]), dates
+
+
+def _naive_totals(rows, game_ids):
+    totals = [0] * len(FIELDS)
+    for row in rows:
+        if row['game_id'] in game_ids:
+            totals = [a + b for a, b in zip(totals, visit_counts(row))]
+    return totals
+
+
+@pytest.fixture(scope='module')
+def trend_and_rows():
+    rows = _rows()
+    trend = PlayerTrend()
+    for row in rows:
+        trend.add(row)
+    return trend, rows
+
+
+@pytest.mark.parametrize('window', [1, 5, 100])
+def test_leg_windows_match_a_naive_sum(trend_and_rows, window):
+    trend, rows = trend_and_rows
+    legs, _ = _naive_legs(rows)
+    series = trend.series(window, 'legs', points=len(legs))
+    assert [point['game_id'] for point in series] == legs
+    for end, point in enumerate(series, 1):
+        expected = window_stats(_naive_totals(rows, set(legs[max(end - window, 0):end])))
+        assert {key: point[key] for key in expected} == expected
+
+
+@pytest.mark.parametrize('window', [1, 7])
+def test_day_windows_match_a_naive_sum(trend_and_rows, window):
+    trend, rows = trend_and_rows
+    legs, dates = _naive_legs(rows)
+    series = trend.series(window, 'days', points=1000)
+    assert [point['date'] for point in series] == sorted(set(dates.values()))
+    for point in series:
+        last = date.fromisoformat(point['date'])
+        in_window = {leg for leg in legs if 0 <= (last - date.fromisoformat(dates[leg])).days < window}
+        assert point['legs'] == len(in_window)
+        expected = window_stats(_naive_totals(rows, in_window))
+        assert {key: point[key] for key in expected} == expected
+
+
+def test_points_limits_the_series_to_the_newest(trend_and_rows):
+    trend, rows = trend_and_rows
+    legs, _ = _naive_legs(rows)
+    assert [point['game_id'] for point in trend.series(3, 'legs', points=5)] == legs[-5:]
+
+
+def test_checkout_conversion_counts_finishable_visits():
+    trend = PlayerTrend()
+    for row in [{'game_id': 'g', 'date': '2024-01-01', 'score': 60, 'rest': 100},
+                {'game_id': 'g', 'date': '2024-01-01', 'score': 60, 'rest': 40},
+                {'game_id': 'g', 'date': '2024-01-01', 'score': 40, 'rest': 0}]:
+        trend.add(row)
+    point, = trend.series(1)
+    # 160 and 100 and 40 are all finishable; one of the three was checked out
+    assert point['checkout_conversion'] == 33.33
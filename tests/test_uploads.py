@@ -0,0 +1,12 @@
+from uploads import ExtractionCache
+
+
+def test_overwriting_an_entry_does_not_grow_the_size(tmp_path):
+    cache = ExtractionCache(str(tmp_path), max_bytes=1024 * 1024)
+    cache.put('key', {'rows': 'x' * 100})
+    size = cache.stats()['size_bytes']
+    for _ in range(5):
+        cache.put('key', {'rows': 'x' * 100})
+    assert cache.stats()['size_bytes'] == size
+    cache.put('key', {'rows': 'x' * 50})
+    assert cache.stats()['size_bytes'] == size - 50 == cache._scan_size()
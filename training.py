@@ -0,0 +1,58 @@
+import hashlib
+import json
+
+from features import DIGEST_LEGEND, digest_text
+
+MODEL = "gpt-4o-mini"
+# Bump whenever the prompt changes so cached plans are regenerated
+PROMPT_VERSION = "2"
+
+SYSTEM_PROMPT = "Du bist ein professioneller Dart-Trainer. Erstelle präzise, praktische Trainingspläne basierend auf Spielerdaten."
+
+
+def build_messages(player_name, digest):
+    """Chat messages asking for a JSON training plan for a feature digest"""
+    prompt = f"""
+        Analysiere die folgenden Kennzahlen aus den letzten {digest.get('legs', 0)} Legs von {player_name} und erstelle einen personalisierten Trainingsplan:
+
+        Kennzahlen: {digest_text(digest)}
+        {DIGEST_LEGEND}
+
+        Bitte erstelle eine strukturierte Antwort mit folgenden Abschnitten:
+        1. Analyse der Spielstärken
+        2. Identifizierte Schwächen
+        3. Spezifische Übungen (als Tabelle mit Übung, Dauer, Fokus)
+        4. Motivierende Schlussnote
+
+        Formatiere die Antwort als JSON mit den Schlüsseln: analysis, strengths, weaknesses, exercises (Array mit name, duration, focus), motivation
+        """
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def plan_cache_key(player_name, digest):
+    """Cache key: player + hash of the feature digest + prompt version"""
+    checksum = hashlib.sha256(json.dumps(digest, sort_keys=True).encode('utf-8')).hexdigest()
+    return f"plan:{PROMPT_VERSION}:{player_name}:{checksum}"
+
+
+def parse_plan(ai_response):
+    """Parse the model's answer as JSON, falling back to plain text"""
+    try:
+        return json.loads(ai_response)
+    except (TypeError, ValueError):
+        return {
+            "analysis": ai_response,
+            "strengths": [],
+            "weaknesses": [],
+            "exercises": [],
+            "motivation": "Weiter so! Regelmäßiges Training führt zur Verbesserung."
+        }
+
+
+def sse_event(data, event=None):
+    """Format one Server-Sent Event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
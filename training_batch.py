@@ -0,0 +1,142 @@
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+_BATCH_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+
+class BatchStore:
+    """Batch state persisted as one JSON file per batch_id.
+
+    The file is rewritten after every player, so a batch interrupted by a
+    restart can be resumed and only redoes the players that did not finish.
+    A batch is claimed by the job working on it, so a second job for the
+    same batch_id cannot run alongside and overwrite its state.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def claim(self, batch_id):
+        """Mark a batch as being worked on; False if it already is"""
+        with self._lock:
+            if batch_id in self._running:
+                return False
+            self._running.add(batch_id)
+            return True
+
+    def release(self, batch_id):
+        with self._lock:
+            self._running.discard(batch_id)
+
+    def running(self, batch_id):
+        with self._lock:
+            return batch_id in self._running
+
+    @staticmethod
+    def new_id():
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def valid_id(batch_id):
+        return bool(batch_id and _BATCH_ID_RE.match(batch_id))
+
+    def _path(self, batch_id):
+        return os.path.join(self.directory, f"{batch_id}.json")
+
+    def create(self, players, save_to_notion):
+        state = {
+            "batch_id": self.new_id(),
+            "created_at": time.time(),
+            "save_to_notion": save_to_notion,
+            "players": {name: {"status": "pending"} for name in players}
+        }
+        self.save(state)
+        return state
+
+    def load(self, batch_id):
+        if not self.valid_id(batch_id):
+            return None
+        try:
+            with open(self._path(batch_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, state):
+        # One writer at a time: concurrent saves would race on the same tmp file
+        with self._lock:
+            state["updated_at"] = time.time()
+            path = self._path(state["batch_id"])
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, path)
+
+
+def batch_summary(state):
+    """Per-player outcomes of a batch without the full plans"""
+    players = {}
+    counts = {}
+    for name, entry in state["players"].items():
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        players[name] = {k: v for k, v in entry.items() if k != "plan"}
+    return {
+        "batch_id": state["batch_id"],
+        "total": len(players),
+        "counts": counts,
+        "players": players
+    }
+
+
+def run_training_batch(job, store, state, generate, export=None, workers=4):
+    """Generate (and optionally export) plans for every unfinished player.
+
+    generate(player_name) returns a plan; export(plan) returns a page URL.
+    Both are expected to do their own rate limiting. A plan that was
+    generated but failed to export is kept, so a resume only retries the
+    export.
+    """
+    lock = threading.Lock()
+    todo = [name for name, entry in state["players"].items() if entry["status"] != "done"]
+    total = len(todo)
+    done = 0
+
+    def process(name):
+        entry = state["players"][name]
+        if entry.get("plan") is None:
+            plan = generate(name)
+            with lock:
+                entry.update(plan=plan, status="planned")
+                entry.pop("error", None)
+                store.save(state)
+        if export is not None:
+            url = entry.get("notion_url") or export(entry["plan"])
+            with lock:
+                entry["notion_url"] = url
+
+    job.update(progress=0, message=f"{total} Trainingspläne werden erstellt")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process, name): name for name in todo}
+        for future in as_completed(futures):
+            name = futures[future]
+            entry = state["players"][name]
+            with lock:
+                try:
+                    future.result()
+                    entry["status"] = "done"
+                    entry.pop("error", None)
+                except Exception as e:
+                    entry.update(status="failed", error=str(e))
+                store.save(state)
+                done += 1
+            job.update(progress=int(done / total * 100), message=f"{done} von {total} Spielern bearbeitet")
+
+    return batch_summary(state)
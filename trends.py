@@ -0,0 +1,140 @@
+import bisect
+from datetime import date, timedelta
+
+from aggregates import AggregateStore
+from checkouts import checkout_table
+
+# Per-leg quantities kept as running totals
+FIELDS = ('visits', 'points', 'opportunities', 'checkouts', 'visits_100', 'visits_140', 'visits_180')
+UNITS = ('legs', 'days')
+
+
+def _int(value, default=0):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def visit_counts(row):
+    """One visit's contribution to FIELDS"""
+    score = _int(row.get('score', row.get('points', 0)))
+    counts = [1, score, 0, 0, int(100 <= score < 140), int(140 <= score < 180), int(score >= 180)]
+    # A visit started on a finishable score is a checkout opportunity (as in PlayerAggregate)
+    if row.get('rest') not in (None, ''):
+        rest = _int(row.get('rest'), -1)
+        bust = str(row.get('bust', '')).strip().lower() == 'true'
+        remaining = rest if bust else rest + score
+        if checkout_table().min_darts(remaining) is not None:
+            counts[2] = 1
+            counts[3] = int(rest == 0 and not bust)
+    return counts
+
+
+def window_stats(totals):
+    """Rolling KPIs from summed FIELDS.
+
+    checkout_conversion is checkouts per visit started on a finishable
+    score, not the per-game checkout_percentage of /player-stats.
+    """
+    visits, points, opportunities, checkouts, visits_100, visits_140, visits_180 = totals
+
+    def rate(count, of):
+        return round(count / of * 100, 2) if of else 0
+
+    return {
+        "visits": visits,
+        "ppr": round(points / visits, 2) if visits else 0,
+        "checkout_conversion": rate(checkouts, opportunities),
+        "visits_rates": {
+            "100+": rate(visits_100, visits),
+            "140+": rate(visits_140, visits),
+            "180": rate(visits_180, visits)
+        }
+    }
+
+
+class PlayerTrend:
+    """One player's legs in date order with prefix sums over FIELDS.
+
+    prefix[i] holds the totals of legs[:i], so any run of consecutive legs
+    is summed with two lookups. Visits of the newest leg and legs newer
+    than all others are folded in in constant time; an older leg arriving
+    late shifts the prefix sums after it.
+    """
+
+    __slots__ = ('legs', 'dates', 'positions', 'prefix')
+
+    def __init__(self):
+        self.legs = []         # game ids in date order
+        self.dates = []        # leg date (YYYY-MM-DD), non-decreasing
+        self.positions = {}    # game id -> index in legs
+        self.prefix = [[0] * len(FIELDS)]
+
+    def __len__(self):
+        return len(self.legs)
+
+    def _insert(self, game_id, day):
+        position = bisect.bisect_right(self.dates, day)
+        self.legs.insert(position, game_id)
+        self.dates.insert(position, day)
+        self.prefix.insert(position + 1, list(self.prefix[position]))
+        if position == len(self.legs) - 1:
+            self.positions[game_id] = position
+        else:
+            self.positions = {leg: i for i, leg in enumerate(self.legs)}
+        return position
+
+    def add(self, row):
+        game_id = row.get('game_id', '')
+        position = self.positions.get(game_id)
+        if position is None:
+            position = self._insert(game_id, str(row.get('date') or '')[:10])
+        counts = visit_counts(row)
+        for totals in self.prefix[position + 1:]:
+            for i, count in enumerate(counts):
+                totals[i] += count
+
+    def between(self, start, end):
+        """Summed FIELDS of legs[start:end]"""
+        return [b - a for a, b in zip(self.prefix[start], self.prefix[end])]
+
+    def series(self, window, unit='legs', points=100):
+        """Rolling stats for the newest points windows, oldest first.
+
+        With unit 'legs' there is one point per leg covering that leg and
+        the window - 1 before it; with 'days' one point per day played
+        covering the legs of that day and the window - 1 days before it.
+        """
+        if unit == 'legs':
+            result = []
+            for end in range(max(len(self.legs) - points, 0) + 1, len(self.legs) + 1):
+                start = max(end - window, 0)
+                result.append({"game_id": self.legs[end - 1], "date": self.dates[end - 1] or None,
+                               "legs": end - start, **window_stats(self.between(start, end))})
+            return result
+
+        days = sorted(set(day for day in self.dates if day))[-points:]
+        result = []
+        for day in days:
+            try:
+                first_day = (date.fromisoformat(day) - timedelta(days=window - 1)).isoformat()
+            except ValueError:  # not an ISO date
+                continue
+            end = bisect.bisect_right(self.dates, day)
+            start = bisect.bisect_left(self.dates, first_day)
+            result.append({"date": day, "legs": end - start, **window_stats(self.between(start, end))})
+        return result
+
+
+class TrendStore(AggregateStore):
+    """Materialized PlayerTrend per player, with AggregateStore's expiry and write handling"""
+
+    entry_class = PlayerTrend
+
+    def series(self, player_name, loader, window, unit='legs', points=100):
+        """(legs recorded, series) for one player, loading them with loader([player_name]) if stale"""
+        loaded = self._materialize([player_name], loader)
+        with self._lock:
+            trend = self._entry(player_name, loaded)
+            return len(trend), trend.series(window, unit, points)
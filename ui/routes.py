@@ -1,22 +1,47 @@
-from flask import render_template
+import hashlib
+
+from flask import Response, current_app, render_template, request
+from httpcache import matching_etag, not_modified
 from . import ui_bp
 
+# Rendered pages by template; the templates only depend on the route
+_pages = {}
+
+def cached_page(template):
+    """Serve a page rendered once per process, with an ETag and Cache-Control.
+
+    In debug mode templates reload, so pages are rendered on every hit.
+    """
+    page = None if current_app.debug else _pages.get(template)
+    if page is None:
+        html = render_template(template)
+        page = _pages[template] = (html, hashlib.sha1(html.encode('utf-8')).hexdigest()[:20])
+    html, etag = page
+    cache_control = f"public, max-age={current_app.config.get('UI_CACHE_MAX_AGE', 300)}"
+    matched = matching_etag(request.headers.get('If-None-Match'), etag)
+    if matched is not None:
+        return not_modified(matched, cache_control)
+    response = Response(html, mimetype='text/html')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response
+
 @ui_bp.route("/")
 def index():
-    return render_template("ui/index.html")
+    return cached_page("ui/index.html")
 
 @ui_bp.route("/import")
 def import_page():
-    return render_template("ui/import.html")
+    return cached_page("ui/import.html")
 
 @ui_bp.route("/dashboard")
 def dashboard():
-    return render_template("ui/dashboard.html")
+    return cached_page("ui/dashboard.html")
 
 @ui_bp.route("/training")
 def training():
-    return render_template("ui/training.html")
+    return cached_page("ui/training.html")
 
 @ui_bp.route("/stats")
 def stats():
-    return render_template("ui/stats.html")
\ No newline at end of file
+    return cached_page("ui/stats.html")
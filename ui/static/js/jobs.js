@@ -0,0 +1,46 @@
+// Follow job progress via Server-Sent Events, falling back to polling.
+// onProgress(job) is called on every update; resolves with the finished job.
+function followJob(jobId, onProgress) {
+  return new Promise((resolve, reject) => {
+    const onUpdate = (job) => {
+      onProgress(job);
+      if (job.status === 'done' || job.status === 'failed') {
+        resolve(job);
+        return true;
+      }
+      return false;
+    };
+
+    const poll = async () => {
+      try {
+        const response = await fetch(`/api/jobs/${jobId}`);
+        const result = await response.json();
+        if (!result.success) {
+          reject(new Error(result.error));
+        } else if (!onUpdate(result.job)) {
+          setTimeout(poll, 1500);
+        }
+      } catch (error) {
+        reject(error);
+      }
+    };
+
+    if (!window.EventSource) {
+      poll();
+      return;
+    }
+
+    const source = new EventSource(`/api/jobs/${jobId}/events`);
+    source.onmessage = (event) => {
+      if (onUpdate(JSON.parse(event.data))) source.close();
+    };
+    source.onerror = () => {
+      source.close();
+      poll();
+    };
+  });
+}
+
+function jobStatusText(job) {
+  return job.message ? `${job.message} (${job.progress}%)` : `${job.progress}%`;
+}
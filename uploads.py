@@ -0,0 +1,144 @@
+import hashlib
+import io
+import json
+import os
+import threading
+
+from flask import Request
+
+
+class HashingBuffer(io.BytesIO):
+    """In-memory upload buffer that hashes content as it is written"""
+
+    def __init__(self):
+        super().__init__()
+        self._sha256 = hashlib.sha256()
+
+    def write(self, data):
+        self._sha256.update(data)
+        return super().write(data)
+
+    def hexdigest(self):
+        return self._sha256.hexdigest()
+
+
+class UploadRequest(Request):
+    """Request that keeps uploaded files in memory and hashes them while the
+    body is parsed, instead of spooling them to a temporary file."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingBuffer()
+
+
+def upload_digest(file_storage):
+    """SHA-256 of an uploaded file, reusing the digest computed while streaming"""
+    stream = file_storage.stream
+    if isinstance(stream, HashingBuffer):
+        return stream.hexdigest()
+    stream.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(64 * 1024), b''):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """Disk-backed cache of ParseExtract results keyed by content hash and prompt.
+
+    Entries are JSON files; reads refresh the file's mtime so eviction drops
+    the least recently used entries once the directory exceeds max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes=100 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._size = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(content_digest, prompt):
+        return hashlib.sha256(f"{content_digest}:{prompt}".encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        payload = json.dumps(data).encode('utf-8')
+        if len(payload) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+
+        with self._lock:
+            # An overwritten entry gives its bytes back
+            try:
+                replaced = os.path.getsize(path)
+            except OSError:
+                replaced = 0
+            os.replace(tmp_path, path)
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(payload) - replaced
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        # Drop least recently used entries down to 90% of the budget
+        entries = sorted(self._entries())
+        size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, entry_size, path in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= entry_size
+        self._size = size
+
+    def stats(self):
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            lookups = self.hits + self.misses
+            return {
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+            }